@@ -9,10 +9,13 @@ import schedule
 import win32gui
 import win32process
 import psutil
+from durable_io import atomic_write_json
 
 class AdvancedScheduler:
-    def __init__(self, main_monitor):
+    def __init__(self, main_monitor, storage=None):
         self.main_monitor = main_monitor
+        # Verilirse task'lar ortak depolama arka ucunda (JSON/SQLite) tutulur
+        self.storage = storage
         self.scheduled_tasks = []
         self.active_sessions = {}
         self.target_windows = {}
@@ -747,10 +750,11 @@ Test sonuçları:""")
     def save_tasks(self):
         """Task'ları kaydet"""
         try:
-            os.makedirs(os.path.dirname(self.tasks_file), exist_ok=True)
+            if self.storage is not None:
+                self.storage.save_schedules("advanced_schedules", self.scheduled_tasks)
+                return
             
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(self.scheduled_tasks, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self.tasks_file, self.scheduled_tasks)
                 
         except Exception as e:
             messagebox.showerror("Hata", f"Task kaydetme hatası: {e}")
@@ -758,7 +762,9 @@ Test sonuçları:""")
     def load_tasks(self):
         """Task'ları yükle"""
         try:
-            if os.path.exists(self.tasks_file):
+            if self.storage is not None:
+                self.scheduled_tasks = self.storage.load_schedules("advanced_schedules")
+            elif os.path.exists(self.tasks_file):
                 with open(self.tasks_file, 'r', encoding='utf-8') as f:
                     self.scheduled_tasks = json.load(f)
         except Exception as e:
@@ -12,6 +12,7 @@ from collections import deque
 import tkinter as tk
 from tkinter import scrolledtext
 import psutil
+from pattern_engine import get_pattern_engine
 
 class AdvancedTextMonitor:
     def __init__(self, main_monitor):
@@ -31,6 +32,8 @@ class AdvancedTextMonitor:
             'token_usage': r'.*(token.*usage|usage.*token|tokens.*used).*',
             'error_message': r'.*(error|failed|unable|sorry.*cannot).*'
         }
+        self.pattern_engine = get_pattern_engine()
+        self.pattern_engine.register_group('text_monitor', self.patterns, re.IGNORECASE | re.DOTALL)
     
     def get_window_text_advanced(self, hwnd):
         """Pencere metnini gelişmiş yöntemlerle al"""
@@ -75,18 +78,16 @@ class AdvancedTextMonitor:
         if previous_text and len(current_text) > len(previous_text):
             new_text = current_text[len(previous_text):]
             
-            # Pattern'leri kontrol et
-            for pattern_name, pattern in self.patterns.items():
-                matches = re.findall(pattern, new_text, re.IGNORECASE | re.DOTALL)
-                if matches:
-                    for match in matches:
-                        finding = {
-                            'type': pattern_name,
-                            'content': match.strip() if isinstance(match, str) else str(match),
-                            'window_id': window_id,
-                            'timestamp': datetime.datetime.now().isoformat()
-                        }
-                        findings.append(finding)
+            # Pattern'leri tek taramada kontrol et; aboneler aynı parçanın eşleşmelerini alır
+            for match in self.pattern_engine.scan(new_text, ('text_monitor',), context={'window_id': window_id}):
+                value = match.value
+                finding = {
+                    'type': match.key,
+                    'content': value.strip() if isinstance(value, str) else str(value),
+                    'window_id': window_id,
+                    'timestamp': datetime.datetime.now().isoformat()
+                }
+                findings.append(finding)
         
         return findings
     
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Artımlı Yedekleme Motoru
+Her yedekte tüm durumu yeniden yazmak yerine belirli aralıklarla tam bir taban (base)
+yedek alınır; aradaki yedeklerde yalnızca değişiklikler (delta) yazılır:
+  - liste alanları (prompt_logs, alerts) yalnızca eklenen kayıtlarla,
+  - sözlük alanları (sessions) yalnızca değişen/silinen anahtarlarla.
+Böylece yedek I/O'su toplam durumla değil değişim hızıyla orantılı olur.
+
+Dizin düzeni (bir zincir = taban + delta günlüğü):
+  session_backup_20240101_120000_000000.json           -> tam durum + timestamp (eski biçimle aynı)
+  session_backup_20240101_120000_000000.deltas.jsonl   -> her satır bir delta
+
+Eski session_backup_YYYYmmdd_HHMMSS.json dosyaları deltası olmayan zincirler olarak okunur.
+Listelerde ekleme dışı bir değişiklik (silme/temizleme) olursa yeni taban alınır.
+"""
+
+import datetime
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import durable_io
+from durable_io import atomic_write_json
+
+BACKUP_PATTERN = re.compile(r"^session_backup_(\d{8}_\d{6}(?:_\d{6})?)\.json$")
+
+
+def to_jsonable(obj: Any) -> Any:
+    """Datetime objelerini ISO metne çevirerek JSON'a uygun kopya üretir"""
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    elif isinstance(obj, dict):
+        # Monitor thread'leri yazarken dolaşım hatası olmasın diye önce kopyalanır
+        return {k: to_jsonable(v) for k, v in list(obj.items())}
+    elif isinstance(obj, (list, tuple, set)):
+        return [to_jsonable(item) for item in list(obj)]
+    else:
+        return obj
+
+
+def _fingerprint(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def _parse_stamp(stamp: str) -> datetime.datetime:
+    fmt = "%Y%m%d_%H%M%S_%f" if stamp.count("_") == 2 else "%Y%m%d_%H%M%S"
+    return datetime.datetime.strptime(stamp, fmt)
+
+
+class IncrementalBackup:
+    """Taban + delta zincirleriyle yedekleme, zamana göre geri yükleme ve saklama politikası"""
+
+    def __init__(self, directory: str = "claude_session_data/backups", full_interval_hours: float = 24,
+                 max_deltas: int = 288, keep_chains: int = 7, max_age_days: int = 30):
+        self.directory = directory
+        self.full_interval = datetime.timedelta(hours=full_interval_hours)
+        self.max_deltas = max_deltas
+        self.keep_chains = max(1, keep_chains)
+        self.max_age = datetime.timedelta(days=max_age_days)
+
+        self._lock = threading.Lock()
+        self._chain = None        # aktif zincirin taban dosyası yolu
+        self._chain_started = None
+        self._chain_deltas = 0
+        self._lists = None        # alan -> (uzunluk, son kaydın parmak izi)
+        self._maps = None         # alan -> {anahtar: parmak izi}
+
+        self.stats = {"bases": 0, "deltas": 0, "skipped": 0, "bytes_written": 0, "removed_files": 0}
+
+    # ------------------------------------------------------------------
+    # Zincirler
+    # ------------------------------------------------------------------
+
+    def chains(self) -> List[Dict[str, Any]]:
+        """Diskteki zincirler (eskiden yeniye): {time, base, deltas}"""
+        if not os.path.exists(self.directory):
+            return []
+        chains = []
+        for name in os.listdir(self.directory):
+            match = BACKUP_PATTERN.match(name)
+            if not match:
+                continue
+            base = os.path.join(self.directory, name)
+            chains.append({
+                "time": _parse_stamp(match.group(1)),
+                "base": base,
+                "deltas": base[:-len(".json")] + ".deltas.jsonl",
+            })
+        return sorted(chains, key=lambda chain: chain["time"])
+
+    def _read_deltas(self, path: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return []
+        deltas = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    deltas.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Çökme sırasında yarım kalmış satır; sonrasındaki deltalar yine okunur
+                    continue
+        return deltas
+
+    @staticmethod
+    def _truncate_torn_tail(path: str):
+        """Delta dosyası yarım bir satırla bitiyorsa son tam satıra kadar kısaltır"""
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            f.truncate(data.rfind(b"\n") + 1)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _apply(state: Dict[str, Any], delta: Dict[str, Any]):
+        for field, items in delta.get("append", {}).items():
+            state.setdefault(field, []).extend(items)
+        for field, changed in delta.get("update", {}).items():
+            state.setdefault(field, {}).update(changed)
+        for field, keys in delta.get("remove", {}).items():
+            for key in keys:
+                state.get(field, {}).pop(key, None)
+        state["timestamp"] = delta["timestamp"]
+
+    def restore(self, until: Optional[datetime.datetime] = None) -> Optional[Dict[str, Any]]:
+        """Verilen zamandaki (varsayılan: en son) durumu taban + deltalardan yeniden kurar"""
+        chains = [chain for chain in self.chains() if until is None or chain["time"] <= until]
+        if not chains:
+            return None
+        chain = chains[-1]
+        with open(chain["base"], 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        for delta in self._read_deltas(chain["deltas"]):
+            if until is not None and datetime.datetime.fromisoformat(delta["timestamp"]) > until:
+                break
+            self._apply(state, delta)
+        return state
+
+    def restore_points(self) -> List[str]:
+        """Geri yüklenebilecek zaman damgaları (taban ve delta yazımları)"""
+        points = []
+        for chain in self.chains():
+            points.append(chain["time"].isoformat())
+            points.extend(delta["timestamp"] for delta in self._read_deltas(chain["deltas"]))
+        return points
+
+    # ------------------------------------------------------------------
+    # Yedekleme
+    # ------------------------------------------------------------------
+
+    def _remember(self, state: Dict[str, Any]):
+        self._lists = {}
+        self._maps = {}
+        for field, value in state.items():
+            if isinstance(value, list):
+                self._lists[field] = (len(value), _fingerprint(value[-1]) if value else None)
+            elif isinstance(value, dict):
+                self._maps[field] = {key: _fingerprint(item) for key, item in value.items()}
+
+    def _resume(self, now: datetime.datetime):
+        """Yeniden başlatmada yeterince yeni son zinciri devam ettirir (her açılışta tam yedek alınmaz)"""
+        chains = self.chains()
+        if not chains or now - chains[-1]["time"] >= self.full_interval:
+            return
+        # Yeni deltalar yarım satırın arkasına yazılırsa okunamaz hale gelir
+        self._truncate_torn_tail(chains[-1]["deltas"])
+        state = self.restore()
+        state.pop("timestamp", None)
+        self._chain = chains[-1]["base"]
+        self._chain_started = chains[-1]["time"]
+        self._chain_deltas = len(self._read_deltas(chains[-1]["deltas"]))
+        self._remember(state)
+
+    def _diff(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Son yedekten bu yana delta; ekleme dışı liste değişikliğinde None (yeni taban gerekir)"""
+        delta = {"append": {}, "update": {}, "remove": {}}
+        for field, value in state.items():
+            if isinstance(value, list):
+                length, last = self._lists.get(field, (0, None))
+                if len(value) < length or (length and _fingerprint(value[length - 1]) != last):
+                    return None
+                if len(value) > length:
+                    delta["append"][field] = value[length:]
+            elif isinstance(value, dict):
+                known = self._maps.get(field, {})
+                changed = {key: item for key, item in value.items() if known.get(key) != _fingerprint(item)}
+                removed = [key for key in known if key not in value]
+                if changed:
+                    delta["update"][field] = changed
+                if removed:
+                    delta["remove"][field] = removed
+        return {kind: fields for kind, fields in delta.items() if fields}
+
+    def backup(self, state: Dict[str, Any], now: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+        """Durumu yedekler; gerekirse taban, değilse yalnızca delta yazar"""
+        now = now or datetime.datetime.now()
+        state = to_jsonable(state)
+        with self._lock:
+            if self._lists is None:
+                self._resume(now)
+
+            delta = None
+            if (self._chain is not None and now - self._chain_started < self.full_interval
+                    and self._chain_deltas < self.max_deltas):
+                delta = self._diff(state)
+
+            if delta is None:
+                result = self._write_base(state, now)
+                removed = self.apply_retention(now)
+                result["removed"] = removed
+                return result
+            if not delta:
+                self.stats["skipped"] += 1
+                return {"kind": "none", "bytes": 0}
+            return self._write_delta(state, delta, now)
+
+    def _write_base(self, state: Dict[str, Any], now: datetime.datetime) -> Dict[str, Any]:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"session_backup_{now.strftime('%Y%m%d_%H%M%S_%f')}.json")
+        data = dict(state, timestamp=now.isoformat())
+        atomic_write_json(path, data)
+        self._chain = path
+        self._chain_started = now
+        self._chain_deltas = 0
+        self._remember(state)
+        size = os.path.getsize(path)
+        self.stats["bases"] += 1
+        self.stats["bytes_written"] += size
+        return {"kind": "base", "bytes": size, "path": path}
+
+    def _write_delta(self, state: Dict[str, Any], delta: Dict[str, Any], now: datetime.datetime) -> Dict[str, Any]:
+        delta["timestamp"] = now.isoformat()
+        line = (json.dumps(delta, ensure_ascii=False) + "\n").encode("utf-8")
+        path = self._chain[:-len(".json")] + ".deltas.jsonl"
+        with open(path, 'ab') as f:
+            f.write(line)
+            f.flush()
+            if durable_io.get_fsync_policy() != "never":
+                os.fsync(f.fileno())
+        self._chain_deltas += 1
+        self._remember(state)
+        self.stats["deltas"] += 1
+        self.stats["bytes_written"] += len(line)
+        return {"kind": "delta", "bytes": len(line), "path": path}
+
+    # ------------------------------------------------------------------
+    # Saklama politikası
+    # ------------------------------------------------------------------
+
+    def apply_retention(self, now: Optional[datetime.datetime] = None) -> int:
+        """En yeni keep_chains zinciri tutar, max_age'den eskileri siler; son zincir hiç silinmez"""
+        now = now or datetime.datetime.now()
+        chains = self.chains()
+        removed = 0
+        for position, chain in enumerate(chains[:-1]):
+            too_many = position < len(chains) - self.keep_chains
+            too_old = now - chain["time"] > self.max_age
+            if not (too_many or too_old):
+                continue
+            for path in (chain["base"], chain["deltas"]):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Eski yedek silinemedi ({path}): {e}")
+        self.stats["removed_files"] += removed
+        return removed
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["chain_deltas"] = self._chain_deltas
+        stats["chains"] = len(self.chains())
+        return stats
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Sohbet Geçmişi Arşivi
+Sıcak (bellekteki son N) kayıttan taşan eski sohbet kayıtları silinmek yerine aylık
+segment dosyalarına sıkıştırılmış bloklar halinde eklenir. Her blok bağımsız bir gzip
+üyesidir; küçük bir indeks her bloğun ofsetini, boyutunu, kayıt sayısını ve zaman
+aralığını tutar. Böylece belirli bir zaman aralığı okunurken yalnızca ilgili bloklar
+açılır, tüm arşiv açılmaz.
+
+Dizin düzeni:
+  chat_archive/2024-01.jsonl.gz   -> ardışık gzip blokları (her satır bir JSON kayıt)
+  chat_archive/index.json         -> {"segments": {"2024-01": [{offset, length, count, first, last}, ...]},
+                                      "last_archived": {timestamp, prompt}}
+
+last_archived, sıcak depoda hâlâ duran ama arşive taşınmış kayıtların yeniden
+yüklemede tekrar arşivlenmemesi için son arşivlenen kaydı işaretler.
+"""
+
+import gzip
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from durable_io import atomic_write_json
+
+
+class ChatArchive:
+    """Zaman bölümlü, gzip bloklu sohbet arşivi"""
+
+    def __init__(self, directory: str = "chat_archive", block_entries: int = 200):
+        self.directory = directory
+        self.block_entries = max(1, int(block_entries))
+        self.index_file = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self.index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Any]:
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Sohbet arşivi indeksi okunamadı: {str(e)}")
+        return {"segments": {}}
+
+    @staticmethod
+    def partition_of(entry: Dict[str, Any]) -> str:
+        # ISO zaman damgasının YYYY-MM kısmı; zamanı olmayan kayıtlar ayrı bölüme
+        timestamp = entry.get("timestamp") or ""
+        return timestamp[:7] if len(timestamp) >= 7 else "undated"
+
+    def segment_path(self, partition: str) -> str:
+        return os.path.join(self.directory, f"{partition}.jsonl.gz")
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+
+    def archive(self, entries: List[Dict[str, Any]]):
+        """Kayıtları ilgili aylık segmentlere yeni bloklar olarak ekler"""
+        if not entries:
+            return
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            partitions.setdefault(self.partition_of(entry), []).append(entry)
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            for partition, items in partitions.items():
+                blocks = self.index["segments"].setdefault(partition, [])
+                path = self.segment_path(partition)
+                with open(path, 'ab') as f:
+                    for start in range(0, len(items), self.block_entries):
+                        chunk = items[start:start + self.block_entries]
+                        payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in chunk)
+                        data = gzip.compress(payload.encode("utf-8"))
+                        offset = f.tell()
+                        f.write(data)
+                        blocks.append({
+                            "offset": offset,
+                            "length": len(data),
+                            "count": len(chunk),
+                            "first": min(e.get("timestamp", "") for e in chunk),
+                            "last": max(e.get("timestamp", "") for e in chunk),
+                        })
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.index["last_archived"] = self.marker_of(entries[-1])
+            # Veri diske indikten sonra indeks güncellenir; arada çökme olursa
+            # dosya sonundaki indekslenmemiş blok hiç okunmaz
+            atomic_write_json(self.index_file, self.index)
+
+    def clear(self):
+        """Tüm segmentleri, indeksi ve last_archived işaretini siler"""
+        with self._lock:
+            for partition in self.index["segments"]:
+                try:
+                    os.remove(self.segment_path(partition))
+                except FileNotFoundError:
+                    pass
+            self.index = {"segments": {}}
+            if os.path.exists(self.index_file):
+                os.remove(self.index_file)
+
+    @staticmethod
+    def marker_of(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {"timestamp": entry.get("timestamp"), "prompt": entry.get("prompt")}
+
+    def unarchived_tail(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sıcak depodan yüklenen kayıtlardan arşive zaten taşınmış olanları çıkarır"""
+        with self._lock:
+            marker = self.index.get("last_archived")
+        if not marker:
+            return entries
+        for position in range(len(entries) - 1, -1, -1):
+            if self.marker_of(entries[position]) == marker:
+                return entries[position + 1:]
+        return entries
+
+    # ------------------------------------------------------------------
+    # Okuma
+    # ------------------------------------------------------------------
+
+    def read_block(self, partition: str, block: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with open(self.segment_path(partition), 'rb') as f:
+            f.seek(block["offset"])
+            data = f.read(block["length"])
+        lines = gzip.decompress(data).decode("utf-8").splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def _blocks(self, since: Optional[str], until: Optional[str], reverse: bool = False):
+        with self._lock:
+            segments = {name: list(blocks) for name, blocks in self.index["segments"].items()}
+        for partition in sorted(segments, reverse=reverse):
+            blocks = segments[partition]
+            for block in (reversed(blocks) if reverse else blocks):
+                # Aralığın dışında kalan bloklar açılmaz
+                if since and block["last"] < since:
+                    continue
+                if until and block["first"] > until:
+                    continue
+                yield partition, block
+
+    def iter_entries(self, since: Optional[str] = None, until: Optional[str] = None,
+                     reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """Verilen zaman aralığındaki kayıtları blok blok okuyarak döndürür"""
+        for partition, block in self._blocks(since, until, reverse):
+            entries = self.read_block(partition, block)
+            for entry in (reversed(entries) if reverse else entries):
+                timestamp = entry.get("timestamp", "")
+                if since and timestamp < since:
+                    continue
+                if until and timestamp > until:
+                    continue
+                yield entry
+
+    def read_page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """En yeniden eskiye sıralı sayfa; atlanan bloklar indeksteki sayılarla geçilir, açılmaz"""
+        page: List[Dict[str, Any]] = []
+        for partition, block in self._blocks(None, None, reverse=True):
+            if len(page) >= limit:
+                break
+            if offset >= block["count"]:
+                offset -= block["count"]
+                continue
+            entries = self.read_block(partition, block)[::-1]
+            page.extend(entries[offset:offset + limit - len(page)])
+            offset = 0
+        return page
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(block["count"] for blocks in self.index["segments"].values() for block in blocks)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            segments = self.index["segments"]
+            blocks = [block for items in segments.values() for block in items]
+            return {
+                "segments": len(segments),
+                "blocks": len(blocks),
+                "entries": sum(block["count"] for block in blocks),
+                "compressed_bytes": sum(block["length"] for block in blocks),
+                "oldest": min((block["first"] for block in blocks), default=None),
+                "newest": max((block["last"] for block in blocks), default=None),
+            }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Sohbet Geçmişi Arama İndeksi
+Sohbet kayıtlarını SQLite FTS5 tam metin indeksinde tutar. Kayıtlar eklendikçe indeks
+artımlı olarak güncellenir ve 1000 kayıtlık bellek sınırından bağımsız olarak tüm geçmiş
+aranabilir. Sorgular önek (kelime*), tam ifade ("..."), tür ve tarih filtrelerini destekler;
+sonuçlar bm25 sıralamasıyla ve vurgulanmış parçalarla (snippet) döner.
+
+Sorgu sözdizimi:
+  kelime          -> önek araması (yazarken eşleşsin diye)
+  "tam ifade"     -> ifade araması
+  type:batch      -> kayıt türü filtresi (manual, scheduled, auto, batch)
+  since:2024-01-01 / until:2024-01-31 -> tarih aralığı
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+TOKEN_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+FILTER_PATTERN = re.compile(r'^(type|tip|since|until):(.+)$', re.IGNORECASE)
+FILTER_NAMES = {"tip": "type"}
+
+
+class ChatSearchIndex:
+    """SQLite FTS5 tabanlı sohbet geçmişi arama indeksi"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            type TEXT,
+            success INTEGER,
+            prompt TEXT,
+            response TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_type ON entries(type, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            prompt, response,
+            content='entries', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3 4 5 6'
+        );
+    """
+
+    # Puanlanacak en yeni eşleşme sayısı
+    CANDIDATE_LIMIT = 2000
+
+    def __init__(self, path: str = "chat_search.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # İndeks bakımı
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def add(self, entries: List[Dict[str, Any]]):
+        """Yeni kayıtları tek işlemde indekse ekler"""
+        if not entries:
+            return
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                for entry in entries:
+                    cursor = self.conn.execute(
+                        "INSERT INTO entries (timestamp, type, success, prompt, response) VALUES (?, ?, ?, ?, ?)",
+                        (entry.get("timestamp", ""), entry.get("type", "manual"),
+                         int(bool(entry.get("success", True))), entry.get("prompt", ""), entry.get("response", ""))
+                    )
+                    self.conn.execute(
+                        "INSERT INTO entries_fts (rowid, prompt, response) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, entry.get("prompt", ""), entry.get("response", ""))
+                    )
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def rebuild(self, entries: List[Dict[str, Any]]):
+        """İndeksi verilen kayıtlarla baştan kurar (ör. geçmiş temizlendiğinde)"""
+        with self._lock:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('delete-all')")
+            self.conn.execute("COMMIT")
+        self.add(entries)
+
+    # ------------------------------------------------------------------
+    # Arama
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def parse_query(text: str) -> tuple:
+        """Arama kutusu metnini (FTS5 sorgusu, filtreler) çiftine çevirir"""
+        terms = []
+        filters = {}
+        for phrase, token in TOKEN_PATTERN.findall(text):
+            if phrase:
+                terms.append('"' + phrase + '"')
+                continue
+            match = FILTER_PATTERN.match(token)
+            if match:
+                name = match.group(1).lower()
+                filters[FILTER_NAMES.get(name, name)] = match.group(2)
+                continue
+            # Kapanmamış tırnak veya elle yazılmış * önek işaretiyle aynı anlama gelir
+            word = token.replace('"', '').rstrip("*")
+            if word:
+                terms.append(f'"{word}"*')
+        return " ".join(terms), filters
+
+    def search(self, text: str = "", limit: int = 100, entry_type: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """Sıralı eşleşmeleri ve snippet'leri döndürür"""
+        started = time.perf_counter()
+        match_query, filters = self.parse_query(text or "")
+        entry_type = entry_type or filters.get("type")
+        since = since or filters.get("since")
+        until = until or filters.get("until")
+
+        conditions = []
+        params: list = []
+        if entry_type:
+            conditions.append("e.type = ?")
+            params.append(entry_type.lower())
+        if since:
+            conditions.append("e.timestamp >= ?")
+            params.append(since)
+        if until:
+            # Sadece tarih verildiyse o günü de kapsa
+            conditions.append("e.timestamp <= ?")
+            params.append(until if "T" in until else until + "T99")
+
+        where = "".join(" AND " + c for c in conditions)
+        with self._lock:
+            try:
+                if match_query:
+                    # Önce tam kelime eşleşmeleri: önek listeleri birleştirmekten çok daha ucuz
+                    exact_query = match_query.replace('"*', '"')
+                    rows = self._ranked_matches(exact_query, where, params, limit)
+                    if len(rows) < limit and exact_query != match_query:
+                        rows = self._ranked_matches(match_query, where, params, limit)
+                else:
+                    rows = self.conn.execute(
+                        "SELECT e.id, e.timestamp, e.type, e.success, e.prompt, e.response, NULL, NULL "
+                        "FROM entries e WHERE 1" + where + " ORDER BY e.id DESC LIMIT ?",
+                        params + [limit]
+                    ).fetchall()
+                error = None
+            except sqlite3.OperationalError as e:
+                rows = []
+                error = str(e)
+
+        hits = [{
+            "id": row[0],
+            "timestamp": row[1],
+            "type": row[2],
+            "success": bool(row[3]),
+            "prompt": row[4],
+            "response": row[5],
+            "prompt_snippet": row[6],
+            "response_snippet": row[7],
+        } for row in rows]
+        return {
+            "query": match_query,
+            "filters": {"type": entry_type, "since": since, "until": until},
+            "hits": hits,
+            "error": error,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _ranked_matches(self, match_query: str, where: str, params: list, limit: int) -> list:
+        # Sık geçen terimlerde tüm eşleşmeleri puanlamak yerine en yeni adaylar bm25 ile sıralanır
+        ranked = self.conn.execute(
+            "SELECT id FROM ("
+            "  SELECT e.id AS id, bm25(entries_fts, 2.0, 1.0) AS score FROM entries_fts"
+            "  JOIN entries e ON e.id = entries_fts.rowid"
+            "  WHERE entries_fts MATCH ?" + where +
+            "  ORDER BY entries_fts.rowid DESC LIMIT ?"
+            ") ORDER BY score, id DESC LIMIT ?",
+            [match_query] + params + [self.CANDIDATE_LIMIT, limit]
+        ).fetchall()
+        ids = [row[0] for row in ranked]
+        if not ids:
+            return []
+
+        # Snippet'ler yalnızca gösterilecek kayıtlar için üretilir
+        rows = self.conn.execute(
+            "SELECT e.id, e.timestamp, e.type, e.success, e.prompt, e.response, "
+            "snippet(entries_fts, 0, '[', ']', '…', 12), snippet(entries_fts, 1, '[', ']', '…', 16) "
+            "FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+            f"WHERE entries_fts MATCH ? AND entries_fts.rowid IN ({','.join('?' * len(ids))})",
+            [match_query] + ids
+        ).fetchall()
+        by_id = {row[0]: row for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Sohbet Geçmişi Günlük Deposu
+Her kayıt, sıra numarasıyla (seq) birlikte JSONL günlüğüne (journal) tek satır olarak eklenir.
+Günlük büyüdükçe arka planda saklama sınırına göre sıkıştırılmış bir anlık görüntü (snapshot)
+yazılır ve günlük sıfırlanır. Yarım yazılmış son satır yüklemede yok sayılır, böylece
+yazma sırasında çökme önceki kayıtları bozmaz.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List
+
+from durable_io import atomic_write_text
+
+
+class ChatJournalStore:
+    """JSONL günlük + anlık görüntü tabanlı sohbet geçmişi deposu"""
+
+    def __init__(self, base_path: str = "chat_history", max_entries: int = 1000,
+                 compact_after: int = 500, legacy_file: str = None):
+        self.snapshot_file = f"{base_path}.snapshot.jsonl"
+        self.journal_file = f"{base_path}.journal.jsonl"
+        self.legacy_file = legacy_file
+        self.max_entries = max_entries
+        self.compact_after = compact_after
+
+        # Saklama sınırındaki kayıtlar, seq alanıyla birlikte
+        self.records: List[Dict[str, Any]] = []
+        self.last_seq = 0
+        self.journal_lines = 0
+
+        self._lock = threading.RLock()
+        self._compact_requested = threading.Event()
+        self._compactor = None
+        self._journal = None
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Yükleme
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def read_jsonl(path: str) -> List[Dict[str, Any]]:
+        """Okunamayan (ör. yarım yazılmış) satırları atlayarak JSONL dosyasını okur"""
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and "seq" in record:
+                    records.append(record)
+        return records
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Anlık görüntü + günlük kuyruğunu okur; eski JSON dosyası varsa bir kez taşır"""
+        with self._lock:
+            if (self.legacy_file and os.path.exists(self.legacy_file)
+                    and not os.path.exists(self.snapshot_file) and not os.path.exists(self.journal_file)):
+                self.migrate_legacy()
+
+            snapshot = self.read_jsonl(self.snapshot_file)
+            snapshot_seq = snapshot[-1]["seq"] if snapshot else 0
+            journal = self.read_jsonl(self.journal_file)
+
+            # Sıkıştırma sırasında çökme olduysa günlükte anlık görüntüye girmiş kayıtlar kalabilir
+            tail = [r for r in journal if r["seq"] > snapshot_seq]
+            records = snapshot + tail
+
+            self.last_seq = records[-1]["seq"] if records else 0
+            self.journal_lines = len(journal)
+            self.records = records[-self.max_entries:]
+            self._loaded = True
+            return [self._strip(r) for r in self.records]
+
+    def migrate_legacy(self):
+        """chat_history.json içeriğini anlık görüntüye taşır, eski dosyayı .bak olarak saklar"""
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            legacy = []
+
+        records = [dict(entry, seq=seq) for seq, entry in enumerate(legacy, 1)]
+        self._write_snapshot(records)
+        os.replace(self.legacy_file, self.legacy_file + ".bak")
+
+    @staticmethod
+    def _strip(record: Dict[str, Any]) -> Dict[str, Any]:
+        entry = dict(record)
+        entry.pop("seq", None)
+        return entry
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+
+    def append(self, entries: List[Dict[str, Any]]):
+        """Kayıtları günlüğün sonuna ekler (dosya boyutundan bağımsız maliyet)"""
+        if not entries:
+            return
+        with self._lock:
+            if not self._loaded:
+                # Geçmiş tembel yüklendiğinde seq ve saklama listesi ilk eklemeden önce kurulur
+                self.load()
+            records = []
+            for entry in entries:
+                self.last_seq += 1
+                records.append(dict(entry, seq=self.last_seq))
+
+            if self._journal is None:
+                self._journal = self._open_journal()
+            # Tek write çağrısı: çökmede en fazla son satır yarım kalır
+            self._journal.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+            self._journal.flush()
+
+            self.journal_lines += len(records)
+            self.records.extend(records)
+            if len(self.records) > self.max_entries:
+                self.records = self.records[-self.max_entries:]
+
+            if self.journal_lines >= self.compact_after:
+                self.request_compaction()
+
+    def _open_journal(self):
+        # Önceki çökmeden kalan yarım satır yeni kayıtla birleşmesin
+        needs_newline = False
+        if os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > 0:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        journal = open(self.journal_file, 'a', encoding='utf-8')
+        if needs_newline:
+            journal.write("\n")
+        return journal
+
+    def replace_all(self, entries: List[Dict[str, Any]]):
+        """Tüm geçmişi verilen kayıtlarla değiştirir (ör. geçmişi temizleme)"""
+        with self._lock:
+            records = []
+            for entry in entries[-self.max_entries:]:
+                self.last_seq += 1
+                records.append(dict(entry, seq=self.last_seq))
+            self.records = records
+            self._write_snapshot(records)
+            self._reset_journal()
+
+    # ------------------------------------------------------------------
+    # Sıkıştırma
+    # ------------------------------------------------------------------
+
+    def request_compaction(self):
+        if self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(target=self._compaction_loop, name="chat-compactor", daemon=True)
+            self._compactor.start()
+        self._compact_requested.set()
+
+    def _compaction_loop(self):
+        while self._compact_requested.wait(timeout=60):
+            self._compact_requested.clear()
+            try:
+                self.compact()
+            except OSError as e:
+                print(f"Sohbet geçmişi sıkıştırma hatası: {str(e)}")
+
+    def compact(self):
+        """Saklama sınırındaki kayıtları anlık görüntüye yazar ve günlüğü sıfırlar"""
+        with self._lock:
+            self._write_snapshot(self.records)
+            self._reset_journal()
+
+    def _write_snapshot(self, records: List[Dict[str, Any]]):
+        # Geçici dosyaya yazıp atomik olarak değiştir: eski anlık görüntü ya tam ya yeni
+        # Ardından günlük sıfırlandığı için grup commit'e bırakılmaz
+        atomic_write_text(self.snapshot_file,
+                          "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records),
+                          deferrable=False)
+
+    def _reset_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_file, 'w', encoding='utf-8').close()
+        self.journal_lines = 0
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Claude CLI Sağlık Denetçisi
+Arka planda Claude executable'ının varlığını, sürümünü ve yanıt verip vermediğini
+uyarlanabilir aralıklarla kontrol eder. Son durum önbellekte tutulur; durum sorguları
+beklemeden döner, dispatcher CLI çalışmıyorsa zaman aşımını beklemeden hata verebilir.
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional, Union
+
+
+class ClaudeUnavailableError(Exception):
+    """Son sağlık kontrolüne göre Claude CLI kullanılamıyorsa fırlatılır"""
+
+
+class ClaudeHealthProber:
+    """Claude executable'ını sağlıklıyken seyrek, hata sonrası sık kontrol eden arka plan thread'i"""
+
+    def __init__(self, executable: Union[str, Callable[[], str]], min_interval: float = 15,
+                 max_interval: float = 300, probe_timeout: float = 10):
+        # executable sabit bir yol ya da güncel ayarı döndüren bir fonksiyon olabilir
+        self._executable = executable if callable(executable) else (lambda: executable)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.probe_timeout = probe_timeout
+
+        self.interval = min_interval
+        self.status = None
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def executable(self) -> str:
+        return self._executable()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="claude-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.probe_now()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def request_probe(self):
+        """Bir sonraki kontrolü hemen başlatır (ör. çağrı hatası sonrası)"""
+        self._wake.set()
+
+    def probe_now(self) -> dict:
+        """Executable'ı hemen kontrol eder ve önbellekteki durumu günceller"""
+        with self._probe_lock:
+            executable = self.executable
+            status = {
+                "executable": executable,
+                "present": shutil.which(executable) is not None,
+                "available": False,
+                "version": None,
+                "latency_ms": None,
+                "error": None,
+                "last_probe": datetime.now().isoformat(),
+            }
+
+            start = time.monotonic()
+            try:
+                result = subprocess.run([executable, "--version"], capture_output=True,
+                                        text=True, timeout=self.probe_timeout)
+                status["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+                if result.returncode == 0:
+                    status["available"] = True
+                    status["version"] = result.stdout.strip()
+                else:
+                    status["error"] = result.stderr.strip() or f"Çıkış kodu {result.returncode}"
+            except subprocess.TimeoutExpired:
+                status["error"] = f"{self.probe_timeout}s içinde yanıt vermedi"
+            except FileNotFoundError:
+                status["error"] = "Executable bulunamadı"
+            except OSError as e:
+                status["error"] = str(e)
+
+            with self._lock:
+                previous_failures = self.status["consecutive_failures"] if self.status else 0
+                if status["available"]:
+                    # Sağlıklıyken aralığı iki katına çıkar
+                    status["consecutive_failures"] = 0
+                    self.interval = min(self.max_interval, self.interval * 2) if self.status else self.min_interval
+                else:
+                    # Hata sonrası sık kontrol et
+                    status["consecutive_failures"] = previous_failures + 1
+                    self.interval = self.min_interval
+                status["next_probe_in"] = self.interval
+                self.status = status
+            return dict(status)
+
+    def get_status(self) -> Optional[dict]:
+        """Önbellekteki son durumu döndürür (hiç kontrol yapılmadıysa None)"""
+        with self._lock:
+            return dict(self.status) if self.status else None
+
+    def is_available(self) -> Optional[bool]:
+        """Bilinmiyorsa None; executable ayarı değiştiyse de durum bilinmiyor sayılır"""
+        status = self.get_status()
+        if status is None or status["executable"] != self.executable:
+            return None
+        return status["available"]
@@ -3,11 +3,12 @@ from tkinter import ttk, scrolledtext
 import psutil
 import time
 import threading
-import json
 import datetime
 import os
 import re
 from collections import defaultdict
+from event_log import get_event_log
+from pattern_engine import get_pattern_engine
 import win32gui
 import win32process
 import win32con
@@ -29,6 +30,18 @@ class ClaudeMonitor:
         os.makedirs(f"{self.data_dir}/logs", exist_ok=True)
         os.makedirs(f"{self.data_dir}/sessions", exist_ok=True)
         
+        # Prompt/yanıt pattern'leri
+        self.prompt_patterns = {
+            'user_prompt': r'Human: (.+?)(?=Assistant:|$)',
+            'claude_response': r'Assistant: (.+?)(?=Human:|$)',
+            'confirmation': r'(yes|no|1|2|3|continue|abort|proceed)',
+            'approach_limit': r'approaching.*5.*hour.*limit',
+            'time_limit': r'until.*\d{1,2}:\d{2}.*limit',
+            'token_usage': r'token.*usage|usage.*token'
+        }
+        self.pattern_engine = get_pattern_engine()
+        self.pattern_engine.register_group('claude_prompt', self.prompt_patterns, re.IGNORECASE | re.DOTALL)
+        
         self.create_widgets()
         self.start_monitoring()
         
@@ -128,20 +141,9 @@ class ClaudeMonitor:
     
     def detect_claude_prompts(self, window_text):
         """Claude promptlarını ve yanıtlarını tespit et"""
-        patterns = {
-            'user_prompt': r'Human: (.+?)(?=Assistant:|$)',
-            'claude_response': r'Assistant: (.+?)(?=Human:|$)',
-            'confirmation': r'(yes|no|1|2|3|continue|abort|proceed)',
-            'approach_limit': r'approaching.*5.*hour.*limit',
-            'time_limit': r'until.*\d{1,2}:\d{2}.*limit',
-            'token_usage': r'token.*usage|usage.*token'
-        }
-        
         results = {}
-        for pattern_name, pattern in patterns.items():
-            matches = re.findall(pattern, window_text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                results[pattern_name] = matches
+        for match in self.pattern_engine.scan(window_text, ('claude_prompt',)):
+            results.setdefault(match.key, []).append(match.value)
         
         return results
     
@@ -157,11 +159,8 @@ class ClaudeMonitor:
         
         self.prompt_logs.append(log_entry)
         
-        # Dosyaya kaydet
-        log_file = f"{self.data_dir}/logs/prompts_{timestamp.strftime('%Y%m%d')}.json"
-        with open(log_file, 'a', encoding='utf-8') as f:
-            json.dump(log_entry, f, ensure_ascii=False)
-            f.write('\n')
+        # Olay günlüğüne kaydet
+        get_event_log().append("prompt", log_entry)
         
         # GUI'yi güncelle
         self.update_prompt_display()
@@ -1,17 +1,48 @@
 #!/usr/bin/env python3
+import concurrent.futures
+import copy
+import itertools
 import subprocess
 import threading
 import time
 import json
 import os
 import re
+import sqlite3
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import schedule
 from dataclasses import dataclass
-import tempfile
+from claude_worker_pool import ClaudeWorkerPool
+from prompt_dispatcher import AsyncPromptDispatcher
+from response_cache import ResponseCache
+from conversation_engine import AutoResponseConversation
+from code_executor import CodeBlockExecutor
+from python_fork_server import PythonForkServer
+from claude_health import ClaudeHealthProber, ClaudeUnavailableError
+from storage import open_storage
+from chat_search import ChatSearchIndex
+from chat_archive import ChatArchive
+from write_behind import get_writer
+from config_service import ConfigService, ConfigSnapshot
+from retention_service import RetentionService
+import durable_io
+from record_codec import CODECS
+
+# Yanıt analizinde kullanılan seçenek (1, 2, 3 / yes, no vb.) ve kod bloğu pattern'leri
+CHOICE_PATTERNS = [
+    r'(?:^|\n)\s*([1-3])[.)]\s*(.+?)(?=\n|$)',
+    r'(?:^|\n)\s*(yes|no|y|n)\s*[:-]?\s*(.+?)(?=\n|$)',
+    r'(?:^|\n)\s*([abc])[.)]\s*(.+?)(?=\n|$)'
+]
+
+CODE_PATTERNS = [
+    r'```(\w+)?\n(.*?)\n```',
+    r'`([^`\n]+)`',
+    r'(?:^|\n)\s*(\$|>)\s*(.+?)(?=\n|$)'
+]
 
 @dataclass
 class ScheduledCommand:
@@ -19,6 +50,89 @@ class ScheduledCommand:
     command: str
     description: str
     enabled: bool = True
+    use_cache: bool = True
+
+class StreamingResponseAnalyzer:
+    """Akış halindeki yanıtı satır satır izler; seçenekleri ve kod bloklarını yanıt bitmeden bildirir"""
+    
+    def __init__(self, on_event=None):
+        self.on_event = on_event
+        self.pending_line = ""
+        self.choice_matches = [[] for _ in CHOICE_PATTERNS]
+        self.choices_reported = False
+        self.code_language = None
+        self.code_lines = None
+    
+    def feed(self, chunk: str):
+        self.pending_line += chunk
+        *lines, self.pending_line = self.pending_line.split("\n")
+        for line in lines:
+            self.consume_line(line)
+    
+    def finish(self):
+        if self.pending_line:
+            self.consume_line(self.pending_line)
+            self.pending_line = ""
+    
+    def consume_line(self, line: str):
+        stripped = line.strip()
+        
+        # Kod bloğu sınırları
+        if stripped.startswith("```"):
+            if self.code_lines is None:
+                self.code_language = stripped[3:].strip() or "unknown"
+                self.code_lines = []
+            else:
+                self.emit("code_block", {"language": self.code_language, "code": "\n".join(self.code_lines).strip()})
+                self.code_language = None
+                self.code_lines = None
+            return
+        if self.code_lines is not None:
+            self.code_lines.append(line)
+            return
+        
+        # Seçenek satırları
+        if self.choices_reported:
+            return
+        for index, pattern in enumerate(CHOICE_PATTERNS):
+            for match in re.findall(pattern, line, re.IGNORECASE | re.MULTILINE):
+                self.choice_matches[index].append((match[0], match[1].strip()))
+            if len(self.choice_matches[index]) >= 2:
+                self.choices_reported = True
+                self.emit("choices", list(self.choice_matches[index]))
+                break
+    
+    def emit(self, kind: str, data):
+        if self.on_event:
+            try:
+                self.on_event(kind, data)
+            except Exception as e:
+                print(f"Akış analiz callback hatası: {str(e)}")
+
+def _is_clock_time(value: str) -> bool:
+    try:
+        datetime.strptime(value, "%H:%M")
+        return True
+    except ValueError:
+        return False
+
+
+# Tip denetiminin (varsayılan değerin tipi) ötesindeki değer kuralları
+CONFIG_VALIDATORS = {
+    "start_time": _is_clock_time,
+    "session_interval_hours": lambda v: v > 0,
+    "worker_pool_size": lambda v: v > 0,
+    "worker_max_requests": lambda v: v > 0,
+    "max_in_flight_prompts": lambda v: v > 0,
+    "stream_output_format": lambda v: v in ("stream-json", "json", "text"),
+    "storage_backend": lambda v: v in ("json", "sqlite"),
+    "durable_fsync_policy": lambda v: v in durable_io.FSYNC_POLICIES,
+    "chat_hot_entries": lambda v: v > 0,
+    "chat_archive_block_entries": lambda v: v > 0,
+    "retention_interval_hours": lambda v: v > 0,
+    "event_log_codec": lambda v: v in CODECS,
+}
+
 
 class ClaudeSessionManager:
     def __init__(self):
@@ -27,20 +141,81 @@ class ClaudeSessionManager:
         self.scheduled_commands_file = "scheduled_commands.json"
         self.usage_log_file = "usage_log.json"
         self.chat_history_file = "chat_history.json"
-        self.config = self.load_config()
+        # Tüm kalıcı veriler config.json'daki storage_backend ayarına göre JSON dosyalarında veya SQLite'ta
+        self.storage = open_storage(self.config_file)
+        self.state_lock = threading.RLock()
+        # config.json elle veya başka süreçten değiştirildiğinde yeniden yüklenir (bkz. config_service)
+        self.config_service = ConfigService(
+            self.config_file, self.default_config(),
+            loader=lambda: self.storage.load_document("config"),
+            saver=lambda config: self.storage.save_document("config", config),
+            validators=CONFIG_VALIDATORS,
+            exists=lambda: self.storage.has_document("config")
+        )
+        self.load_config()
+        # save_* çağrıları kaydı kirli işaretler, yazımı arka plandaki tek yazıcı yapar
+        durable_io.set_fsync_policy(self.config.get("durable_fsync_policy", "batch"))
+        self.writer = get_writer()
+        self.writer.configure(
+            debounce_seconds=self.config.get("write_behind_debounce_seconds", 2),
+            max_delay_seconds=self.config.get("write_behind_max_delay_seconds", 10),
+            max_pending=self.config.get("write_behind_max_pending", 20)
+        )
         self.session_data = self.load_session_data()
         self.scheduled_commands = self.load_scheduled_commands()
         self.usage_log = self.load_usage_log()
-        self.chat_history = self.load_chat_history()
+        self.chat_archive = ChatArchive(
+            self.config.get("chat_archive_dir", "chat_archive"),
+            block_entries=self.config.get("chat_archive_block_entries", 200)
+        )
+        # Sıcak sohbet geçmişi ilk erişimde yüklenir (bkz. chat_history özelliği)
+        self._chat_history = None
+        self._unloaded_chat_count = None
+        self.chat_index = self.open_chat_index()
         self.is_running = False
         self.scheduler_thread = None
+        # schedule'ın iş listesi yalnızca zamanlayıcı thread'inde değiştirilir; diğer thread'ler
+        # (ör. ayar izleyicisi) yeniden kurulum ister
+        self.schedule_rearm = threading.Event()
         self.current_session_id = None
         self.tokens_remaining = None
         self.session_end_time = None
         self.last_usage_check = None
-        
-    def load_config(self) -> Dict[str, Any]:
-        default_config = {
+        self.worker_pool = None
+        self.dispatcher = None
+        self.python_server = None
+        self.health_prober = None
+        self.followup_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="claude-followup"
+        )
+        self.live_responses = {}
+        self.live_response_ids = itertools.count(1)
+        self.response_cache = ResponseCache(
+            max_entries=self.config.get("response_cache_size", 128),
+            ttls=self.config.get("response_cache_ttls", {}),
+            default_ttl=self.config.get("response_cache_prompt_ttl", 600)
+        )
+        # claude_session_data altındaki yedek, günlük ve dışa aktarımların temizliği (arka planda).
+        # Olay segmentlerini günlüğe yazan ClaudeSessionApp kaldırır; burada EventLog açılmaz
+        self.retention = RetentionService(
+            policies=self.config.get("retention_policies", {}),
+            interval_hours=self.config.get("retention_interval_hours", 24),
+            include_events=False
+        )
+        if self.config.get("retention_enabled", True):
+            self.retention.start()
+        self.config_service.subscribe(self.on_config_changed)
+        if self.config["storage_backend"] == "json":
+            # SQLite'ta ayarlar veritabanında; izlenecek dosya yok
+            self.config_service.start()
+        
+    @property
+    def config(self) -> ConfigSnapshot:
+        """Geçerli, değiştirilemez ayar görüntüsü; değişiklikler save_config ile yapılır"""
+        return self.config_service.snapshot
+    
+    def default_config(self) -> Dict[str, Any]:
+        return {
             "auto_prompt": "x",
             "session_interval_hours": 5,
             "enable_auto_session": True,
@@ -50,6 +225,44 @@ class ClaudeSessionManager:
             "default_choice": "1",
             "auto_execute_code": True,
             "allowed_languages": ["python", "bash", "cmd", "powershell"],
+            "worker_pool_enabled": False,
+            "worker_pool_size": 2,
+            "worker_max_requests": 1,
+            "max_in_flight_prompts": 4,
+            "prompt_timeout_seconds": 60,
+            "stream_output_format": "stream-json",
+            "stream_partial_messages": True,
+            "response_cache_enabled": True,
+            "response_cache_size": 128,
+            "response_cache_ttls": {"/status": 30, "/usage": 60, "/cost": 300},
+            "response_cache_prompt_ttl": 600,
+            "auto_response_max_hops": 5,
+            "auto_response_time_budget_seconds": 120,
+            "auto_response_use_session": True,
+            "code_max_parallel": 4,
+            "code_language_limits": {"python": 2, "bash": 2, "cmd": 1, "powershell": 1},
+            "code_block_timeout_seconds": 10,
+            "code_total_timeout_seconds": 30,
+            "code_max_output_chars": 4000,
+            "python_fork_server_enabled": True,
+            "health_probe_min_interval": 15,
+            "health_probe_max_interval": 300,
+            "storage_backend": "json",  # json veya sqlite
+            "storage_path": "claude_session.db",
+            "chat_search_index_file": os.path.join("claude_session_data", "chat_search.db"),
+            "chat_hot_entries": 1000,
+            "chat_archive_dir": "chat_archive",
+            "chat_archive_block_entries": 200,
+            "write_behind_debounce_seconds": 2,
+            "write_behind_max_delay_seconds": 10,
+            "write_behind_max_pending": 20,
+            "durable_fsync_policy": "batch",  # always, batch, never
+            "event_log_codec": "jsonl",  # jsonl veya binary; token/prompt günlüklerini yazan ClaudeSessionApp uygular
+            "retention_enabled": True,
+            "retention_interval_hours": 24,
+            # Veri sınıfı başına (backups, events, daily_logs, exports, archives) max_age_days,
+            # keep_last, max_bytes, archive değerleri; verilmeyenler varsayılan politikadan gelir
+            "retention_policies": {},
             "work_protocols": """● 🔧 ÇALIŞMA PROTOKOLLERI
 
 📝 NOT DEFTERLERİ PROTOKOLÜ
@@ -112,25 +325,42 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
 4. Sistem sesi protokolü: Görev tamamlandığında 3 kere beep sesi çıkar
 5. Otomatik onay protokolü: Kullanıcıdan onay almadan işlemlere devam et"""
         }
-        
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    for key, value in default_config.items():
-                        if key not in config:
-                            config[key] = value
-                    return config
-            except:
-                return default_config
-        else:
-            self.save_config(default_config)
-            return default_config
+    
+    def load_config(self) -> ConfigSnapshot:
+        return self.config_service.load()
     
     def save_config(self, config: Dict[str, Any]):
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
-        self.config = config
+        """Ayarları doğrulayıp kaydeder; aboneler (scheduler vb.) yeni görüntüyle bilgilendirilir"""
+        self.config_service.update(config)
+    
+    def on_config_changed(self, old: ConfigSnapshot, new: ConfigSnapshot, changed: set):
+        """Ayar değişikliklerini çalışan bileşenlere yeniden başlatmadan uygular"""
+        if changed & {"durable_fsync_policy"}:
+            durable_io.set_fsync_policy(new["durable_fsync_policy"])
+        if changed & {"write_behind_debounce_seconds", "write_behind_max_delay_seconds", "write_behind_max_pending"}:
+            self.writer.configure(
+                debounce_seconds=new["write_behind_debounce_seconds"],
+                max_delay_seconds=new["write_behind_max_delay_seconds"],
+                max_pending=new["write_behind_max_pending"]
+            )
+        if changed & {"response_cache_ttls", "response_cache_prompt_ttl"}:
+            self.response_cache.ttls = dict(new["response_cache_ttls"])
+            self.response_cache.default_ttl = new["response_cache_prompt_ttl"]
+        if changed & {"start_time", "session_interval_hours"}:
+            with self.state_lock:
+                self.calculate_next_session_time()
+            self.save_session_data()
+        if self.is_running and changed & {"start_time", "session_interval_hours", "enable_auto_session"}:
+            self.schedule_rearm.set()
+        if changed & {"retention_policies", "retention_interval_hours"}:
+            self.retention.configure(new["retention_policies"], new["retention_interval_hours"])
+        if changed & {"retention_enabled"}:
+            if new["retention_enabled"]:
+                self.retention.start()
+            else:
+                self.retention.stop()
+        if changed & {"storage_backend", "storage_path", "chat_search_index_file", "chat_archive_dir"}:
+            print("Depolama ayarları değişti; yeni değerler yeniden başlatmada uygulanacak")
     
     def load_session_data(self) -> Dict[str, Any]:
         default_data = {
@@ -139,102 +369,227 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
             "session_count": 0
         }
         
-        if os.path.exists(self.session_file):
-            try:
-                with open(self.session_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return default_data
-        return default_data
+        return self.storage.load_document("session_data", default_data) or default_data
     
     def save_session_data(self):
-        with open(self.session_file, 'w', encoding='utf-8') as f:
-            json.dump(self.session_data, f, indent=2, ensure_ascii=False)
+        self.writer.mark_dirty(self.write_session_data)
+    
+    def write_session_data(self):
+        with self.state_lock:
+            data = copy.deepcopy(self.session_data)
+        self.storage.save_document("session_data", data)
     
     def load_scheduled_commands(self) -> list[ScheduledCommand]:
-        if os.path.exists(self.scheduled_commands_file):
-            try:
-                with open(self.scheduled_commands_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return [ScheduledCommand(**cmd) for cmd in data]
-            except:
-                return []
-        return []
+        try:
+            return [ScheduledCommand(**cmd) for cmd in self.storage.load_schedules("scheduled_commands")]
+        except TypeError:
+            return []
     
     def save_scheduled_commands(self):
-        with open(self.scheduled_commands_file, 'w', encoding='utf-8') as f:
+        self.writer.mark_dirty(self.write_scheduled_commands)
+    
+    def write_scheduled_commands(self):
+        with self.state_lock:
             data = [{
                 'time': cmd.time,
                 'command': cmd.command,
                 'description': cmd.description,
-                'enabled': cmd.enabled
+                'enabled': cmd.enabled,
+                'use_cache': cmd.use_cache
             } for cmd in self.scheduled_commands]
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self.storage.save_schedules("scheduled_commands", data)
     
     def load_usage_log(self) -> Dict[str, Any]:
-        default_log = {
-            "hourly_reports": [],
-            "daily_summary": {},
-            "last_check_time": None
-        }
-        
-        if os.path.exists(self.usage_log_file):
-            try:
-                with open(self.usage_log_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return default_log
-        return default_log
+        return self.storage.load_usage_log()
     
     def save_usage_log(self):
-        with open(self.usage_log_file, 'w', encoding='utf-8') as f:
-            json.dump(self.usage_log, f, indent=2, ensure_ascii=False)
+        self.writer.mark_dirty(self.write_usage_log)
+    
+    def write_usage_log(self):
+        with self.state_lock:
+            data = copy.deepcopy(self.usage_log)
+        self.storage.save_usage_log(data)
     
     def load_chat_history(self) -> list:
-        if os.path.exists(self.chat_history_file):
-            try:
-                with open(self.chat_history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        try:
+            entries = self.storage.load_chat(limit=self.chat_hot_limit() + 2 * self.chat_archive.block_entries)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Sohbet geçmişi yüklenemedi: {str(e)}")
+            return []
+        return self.chat_archive.unarchived_tail(entries)
+    
+    @property
+    def chat_history(self) -> list:
+        """Sıcak sohbet geçmişi; açılışta değil ilk ihtiyaç duyulduğunda yüklenir"""
+        with self.state_lock:
+            if self._chat_history is None:
+                self._chat_history = self.load_chat_history()
+                self._unloaded_chat_count = None
+                if self.chat_index is not None and self.chat_index.count() == 0 and self._chat_history:
+                    self.chat_index.add(self._chat_history)
+                self.trim_chat_history()
+            return self._chat_history
+    
+    @chat_history.setter
+    def chat_history(self, entries: list):
+        with self.state_lock:
+            self._chat_history = entries
     
     def save_chat_history(self):
-        with open(self.chat_history_file, 'w', encoding='utf-8') as f:
-            json.dump(self.chat_history, f, indent=2, ensure_ascii=False)
+        """Bellekteki geçmişin tamamını yazar (ör. temizleme sonrası); yeni kayıtlar add_chat_entries ile eklenir"""
+        with self.state_lock:
+            if self.chat_index is not None:
+                self.chat_index.rebuild(self.chat_history)
+        self.writer.mark_dirty(self.write_chat_history)
     
-    def add_chat_entry(self, prompt: str, response: str, command_type: str = "manual"):
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "prompt": prompt,
-            "response": response,
-            "type": command_type,  # manual, scheduled, auto
-            "success": True
-        }
-        
-        self.chat_history.append(entry)
-        
-        # Son 1000 sohbet kaydı tut
-        if len(self.chat_history) > 1000:
-            self.chat_history = self.chat_history[-1000:]
-        
+    def clear_chat_history(self):
+        """Sıcak geçmişi ve arşivi birlikte siler; arama indeksi boşaltılır"""
+        with self.state_lock:
+            try:
+                self.chat_archive.clear()
+            except OSError as e:
+                print(f"Sohbet arşivi silinemedi: {str(e)}")
+            self.chat_history = []
         self.save_chat_history()
     
-    def add_chat_error(self, prompt: str, error: str, command_type: str = "manual"):
-        entry = {
+    def write_chat_history(self):
+        with self.state_lock:
+            entries = list(self.chat_history)
+        self.storage.replace_chat(entries)
+    
+    def chat_hot_limit(self) -> int:
+        return self.config.get("chat_hot_entries", 1000)
+    
+    def iter_archived_chat(self, since: Optional[str] = None, until: Optional[str] = None,
+                           reverse: bool = False):
+        """Arşivdeki (sıcak sınırdan taşmış) kayıtları zaman aralığına göre okur"""
+        return self.chat_archive.iter_entries(since, until, reverse)
+    
+    def open_chat_index(self) -> Optional[ChatSearchIndex]:
+        """Arama indeksini açar (boşsa geçmiş yüklendiğinde doldurulur)"""
+        path = self.config.get("chat_search_index_file", os.path.join("claude_session_data", "chat_search.db"))
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # Eski sürümler indeksi çalışma dizinine yazıyordu; arşivdeki kayıtlar yeniden
+            # indekslenmediği için dosya (WAL/SHM ile birlikte) taşınır
+            if not os.path.exists(path) and os.path.exists("chat_search.db"):
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists("chat_search.db" + suffix):
+                        os.replace("chat_search.db" + suffix, path + suffix)
+            return ChatSearchIndex(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Sohbet arama indeksi açılamadı: {str(e)}")
+            return None
+    
+    def search_chat_history(self, query: str, limit: int = 100, **filters) -> Dict[str, Any]:
+        """Tüm geçmişte tam metin arama; indeks yoksa bellekteki kayıtlarda düz arama yapar"""
+        if self.chat_index is not None:
+            return self.chat_index.search(query, limit=limit, **filters)
+        
+        term = query.lower()
+        with self.state_lock:
+            hits = [dict(entry, prompt_snippet=None, response_snippet=None)
+                    for entry in reversed(self.chat_history)
+                    if term in entry.get('prompt', '').lower() or term in entry.get('response', '').lower()]
+        return {"query": query, "filters": filters, "hits": hits[:limit], "error": None, "elapsed_ms": None}
+    
+    def make_chat_entry(self, prompt: str, response: str, command_type: str = "manual",
+                        success: bool = True) -> Dict[str, Any]:
+        return {
             "timestamp": datetime.now().isoformat(),
             "prompt": prompt,
-            "response": f"HATA: {error}",
-            "type": command_type,
-            "success": False
+            "response": response if success else f"HATA: {response}",
+            "type": command_type,  # manual, scheduled, auto, batch
+            "success": success
         }
+    
+    def add_chat_entry(self, prompt: str, response: str, command_type: str = "manual"):
+        self.add_chat_entries([self.make_chat_entry(prompt, response, command_type)])
+    
+    def add_chat_error(self, prompt: str, error: str, command_type: str = "manual"):
+        self.add_chat_entries([self.make_chat_entry(prompt, error, command_type, success=False)])
+    
+    def add_chat_entries(self, entries: list):
+        """Birden fazla sohbet kaydını tek dosya yazımıyla ekler"""
+        if not entries:
+            return
         
-        self.chat_history.append(entry)
-        
-        if len(self.chat_history) > 1000:
-            self.chat_history = self.chat_history[-1000:]
-        
-        self.save_chat_history()
+        with self.state_lock:
+            if self._chat_history is None:
+                # Geçmiş henüz yüklenmedi: depodaki arşivlenmemiş kayıt sayısı (yeniden başlatmalar
+                # dahil) bir kez sayılır. Ekleme sıcak sınırı bir bloktan fazla aşacaksa geçmiş
+                # önce yüklenir; böylece taşan kayıtlar depo penceresinden düşmeden arşive taşınır
+                if self._unloaded_chat_count is None:
+                    self._unloaded_chat_count = len(self.load_chat_history())
+                if self._unloaded_chat_count + len(entries) > self.chat_hot_limit() + self.chat_archive.block_entries:
+                    self.chat_history
+            
+            # Sadece yeni kayıtlar günlüğe eklenir, dosya baştan yazılmaz
+            self.storage.append_chat(entries)
+            
+            # Arama indeksi sıcak kayıt sınırından bağımsız olarak tüm geçmişi tutar
+            if self.chat_index is not None:
+                try:
+                    self.chat_index.add(entries)
+                except sqlite3.Error as e:
+                    print(f"Sohbet arama indeksi güncellenemedi: {str(e)}")
+            
+            if self._chat_history is None:
+                # Kayıtlar depoda, yüklemede gelecek
+                self._unloaded_chat_count += len(entries)
+                return
+            
+            self._chat_history.extend(entries)
+            self.trim_chat_history()
+    
+    def trim_chat_history(self):
+        """Sıcak sınırı bir blok kadar aşınca en eski kayıtları sıkıştırılmış arşive taşır"""
+        hot_limit = self.chat_hot_limit()
+        if len(self._chat_history) <= hot_limit + self.chat_archive.block_entries:
+            return
+        overflow = self._chat_history[:-hot_limit]
+        try:
+            self.chat_archive.archive(overflow)
+            self._chat_history = self._chat_history[-hot_limit:]
+        except OSError as e:
+            print(f"Sohbet arşivine yazılamadı: {str(e)}")
+    
+    def get_chat_page(self, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """En yeniden eskiye sayfalı geçmiş: önce sıcak kayıtlar, sonra arşiv blokları"""
+        with self.state_lock:
+            hot = self.chat_history[::-1]
+        entries = hot[offset:offset + limit]
+        if len(entries) < limit:
+            archive_offset = max(0, offset - len(hot))
+            entries += self.chat_archive.read_page(archive_offset, limit - len(entries))
+        total = len(hot) + self.chat_archive.count()
+        return {
+            "entries": entries,
+            "offset": offset,
+            "total": total,
+            "has_more": offset + len(entries) < total,
+        }
+    
+    def export_chat_history(self, export_file: str) -> int:
+        """Tüm geçmişi (arşiv + sıcak) eskiden yeniye blok blok dosyaya yazar; kayıt sayısını döndürür"""
+        with self.state_lock:
+            hot = list(self.chat_history)
+        
+        count = 0
+        with open(export_file, 'w', encoding='utf-8') as f:
+            f.write("Claude Session Manager - Sohbet Geçmişi\n")
+            f.write(f"Export Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write("="*80 + "\n\n")
+            
+            for entry in itertools.chain(self.chat_archive.iter_entries(), hot):
+                f.write(f"Zaman: {entry.get('timestamp', '')}\n")
+                f.write(f"Tip: {entry.get('type', 'manual').upper()}\n")
+                f.write(f"Prompt: {entry.get('prompt', '')}\n")
+                f.write(f"Yanıt: {entry.get('response', '')}\n")
+                f.write(f"Başarılı: {entry.get('success', True)}\n")
+                f.write("-"*80 + "\n\n")
+                count += 1
+        return count
     
     def analyze_claude_response(self, response: str) -> Dict[str, Any]:
         """Claude yanıtını analiz eder ve otomatik aksiyonlar önerir"""
@@ -248,13 +603,7 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         }
         
         # Seçenek kontrolü (1, 2, 3 / yes, no vb.)
-        choice_patterns = [
-            r'(?:^|\n)\s*([1-3])[.)]\s*(.+?)(?=\n|$)',
-            r'(?:^|\n)\s*(yes|no|y|n)\s*[:-]?\s*(.+?)(?=\n|$)',
-            r'(?:^|\n)\s*([abc])[.)]\s*(.+?)(?=\n|$)'
-        ]
-        
-        for pattern in choice_patterns:
+        for pattern in CHOICE_PATTERNS:
             matches = re.findall(pattern, response, re.IGNORECASE | re.MULTILINE)
             if len(matches) >= 2:
                 analysis["has_choices"] = True
@@ -264,13 +613,7 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
                 break
         
         # Kod bloğu kontrolü
-        code_patterns = [
-            r'```(\w+)?\n(.*?)\n```',
-            r'`([^`\n]+)`',
-            r'(?:^|\n)\s*(\$|>)\s*(.+?)(?=\n|$)'
-        ]
-        
-        for pattern in code_patterns:
+        for pattern in CODE_PATTERNS:
             matches = re.findall(pattern, response, re.DOTALL | re.MULTILINE)
             if matches:
                 for match in matches:
@@ -296,195 +639,463 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         
         return None
     
+    def run_auto_response_chain(self, analysis: Dict[str, Any], session_id: Optional[str] = None) -> str:
+        """Seçim bekleyen yanıtları aynı CLI konuşmasında sırayla yanıtlar; eklenecek metni döndürür"""
+        use_session = self.config.get("auto_response_use_session", True)
+        conversation = AutoResponseConversation(
+            run_prompt=lambda prompt, timeout, resume: self.run_claude_cli(
+                prompt, timeout, resume=resume if use_session else None
+            ),
+            analyze=self.analyze_claude_response,
+            choose=self.auto_respond_to_claude,
+            max_hops=self.config.get("auto_response_max_hops", 5),
+            time_budget=self.config.get("auto_response_time_budget_seconds", 120),
+            hop_timeout=self.config.get("prompt_timeout_seconds", 60)
+        )
+        chain = conversation.run(analysis, session_id)
+        
+        text = ""
+        for hop in chain["hops"]:
+            if hop["success"]:
+                text += f"\n\n[AUTO-RESPONSE: {hop['prompt']} | {hop['latency']:.1f}s]\n{hop['response']}"
+                hop_analysis = hop["analysis"]
+                if hop_analysis["has_code"] and hop_analysis["code_blocks"]:
+                    text += f"\n\n[CODE EXECUTION]\n{self.execute_code_from_response(hop_analysis['code_blocks'])}"
+            else:
+                text += f"\n\n[AUTO-RESPONSE FAILED: {hop['prompt']} | {hop['latency']:.1f}s]\n{hop['response']}"
+        
+        if chain["stopped_reason"] == "max_hops":
+            text += f"\n\n[AUTO-RESPONSE STOPPED: {len(chain['hops'])} adım sınırına ulaşıldı]"
+        elif chain["stopped_reason"] == "time_budget":
+            text += f"\n\n[AUTO-RESPONSE STOPPED: {chain['total_time']:.1f}s süre sınırına ulaşıldı]"
+        
+        with self.state_lock:
+            self.session_data["last_auto_response_chain"] = {
+                "timestamp": datetime.now().isoformat(),
+                "session_id": chain["session_id"],
+                "stopped_reason": chain["stopped_reason"],
+                "total_time": chain["total_time"],
+                "hop_latencies": [hop["latency"] for hop in chain["hops"]]
+            }
+            self.save_session_data()
+        
+        return text
+    
     def execute_code_from_response(self, code_blocks: list) -> str:
-        """Claude yanıtındaki kod bloklarını çalıştırır"""
+        """Claude yanıtındaki kod bloklarını paralel çalıştırır, sonuçları blok sırasıyla raporlar"""
         if not self.config.get("auto_execute_code", False):
             return "Otomatik kod çalıştırma devre dışı"
         
-        results = []
-        allowed_langs = self.config.get("allowed_languages", [])
+        executor = CodeBlockExecutor(
+            self.config.get("allowed_languages", []),
+            max_parallel=self.config.get("code_max_parallel", 4),
+            language_limits=self.config.get("code_language_limits"),
+            block_timeout=self.config.get("code_block_timeout_seconds", 10),
+            total_timeout=self.config.get("code_total_timeout_seconds", 30),
+            max_output_chars=self.config.get("code_max_output_chars", 4000),
+            python_runner=self.get_python_server()
+        )
+        return executor.format_results(executor.run_blocks(code_blocks))
+    
+    def get_python_server(self) -> Optional[PythonForkServer]:
+        """Destekleniyorsa ön ısıtılmış Python fork sunucusunu döndürür (Windows'ta None)"""
+        if not self.config.get("python_fork_server_enabled", True) or not PythonForkServer.is_supported():
+            return None
         
-        for block in code_blocks:
-            lang = block["language"].lower()
-            code = block["code"]
-            
-            if lang not in allowed_langs:
-                results.append(f"❌ {lang} dili otomatik çalıştırma için izinli değil")
-                continue
-            
+        with self.state_lock:
+            if self.python_server is None:
+                self.python_server = PythonForkServer()
+        return self.python_server
+    
+    def send_claude_prompt(self, prompt: str = None, on_chunk=None) -> tuple[bool, str]:
+        if prompt is None:
+            prompt = self.config["auto_prompt"]
+        
+        if prompt.startswith("/"):
+            return self.handle_special_command(prompt)
+        
+        tap, close_stream = self.open_response_stream(prompt, on_chunk) if on_chunk else (None, None)
+        try:
+            result = self.run_claude_cli(prompt, on_chunk=tap)
+        except Exception as e:
+            return self.describe_prompt_error(e)
+        finally:
+            if close_stream:
+                close_stream()
+        
+        return self.process_claude_result(prompt, result)
+    
+    def submit_prompt(self, prompt: str = None, timeout: float = None,
+                      on_chunk=None, on_analysis=None, use_cache: bool = False,
+                      record_history: bool = True) -> concurrent.futures.Future:
+        """Prompt'u dispatcher'a verir; (başarı, yanıt) ile tamamlanan bir Future döndürür.
+        on_chunk/on_analysis verilirse yanıt akış modunda parça parça iletilir.
+        use_cache verilirse aynı prompt'un TTL süresi içindeki yanıtı önbellekten döner."""
+        if prompt is None:
+            prompt = self.config["auto_prompt"]
+        
+        outer = concurrent.futures.Future()
+        
+        if prompt.startswith("/"):
+            outer.set_result(self.handle_special_command(prompt))
+            return outer
+        
+        cache_key = self.get_cache_key(prompt) if use_cache else None
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                outer.set_result(cached)
+                return outer
+        
+        streaming = on_chunk is not None or on_analysis is not None
+        tap, close_stream = self.open_response_stream(prompt, on_chunk, on_analysis) if streaming else (None, None)
+        raw = self.get_dispatcher().submit(prompt, timeout, tap)
+        
+        def finish(raw_future):
+            if not outer.set_running_or_notify_cancel():
+                return
             try:
-                if lang in ["python", "py"]:
-                    result = self.execute_python_code(code)
-                elif lang in ["bash", "sh"]:
-                    result = self.execute_bash_code(code)
-                elif lang in ["cmd", "bat"]:
-                    result = self.execute_cmd_code(code)
-                elif lang in ["powershell", "ps1"]:
-                    result = self.execute_powershell_code(code)
-                else:
-                    result = f"❓ {lang} dili için executor bulunamadı"
-                
-                results.append(f"✅ {lang}: {result}")
+                result = raw_future.result()
+            except BaseException as e:
+                outer.set_result(self.describe_prompt_error(e))
+                return
+            try:
+                response = self.process_claude_result(prompt, result, record_history)
             except Exception as e:
-                results.append(f"❌ {lang} hatası: {str(e)}")
+                response = (False, f"Hata: {str(e)}")
+            if cache_key is not None and response[0]:
+                self.response_cache.put(cache_key, response, self.response_cache.ttl_for(prompt))
+            outer.set_result(response)
+        
+        def on_raw_done(raw_future):
+            if close_stream:
+                close_stream()
+            if raw_future.cancelled():
+                outer.cancel()
+                return
+            # Yanıt işleme (analiz, otomatik yanıt, kod) event loop'u bloklamasın
+            self.followup_executor.submit(finish, raw_future)
         
-        return "\n".join(results) if results else "Çalıştırılabilir kod bulunamadı"
+        raw.add_done_callback(on_raw_done)
+        outer.add_done_callback(lambda f: raw.cancel() if f.cancelled() else None)
+        return outer
     
-    def execute_python_code(self, code: str) -> str:
-        """Python kodunu güvenli şekilde çalıştırır"""
-        try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            result = subprocess.run(
-                ['python', temp_file],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+    def submit_batch(self, prompts: list, max_parallel: int = None, on_result=None,
+                     timeout: float = None) -> concurrent.futures.Future:
+        """Prompt listesini eşzamanlı çalıştırır.
+        on_result her sonuç için tamamlanma sırasıyla çağrılır; sonuçlar gönderim index'ini taşır.
+        Dönen Future tüm sonuçlar, toplam süre ve gecikme toplamını içeren raporla tamamlanır."""
+        prompts = list(prompts)
+        max_parallel = max(1, int(max_parallel or self.config.get("max_in_flight_prompts", 4)))
+        
+        batch = concurrent.futures.Future()
+        results = [None] * len(prompts)
+        pending = iter(enumerate(prompts))
+        running = {}
+        lock = threading.Lock()
+        remaining = [len(prompts)]
+        started = time.monotonic()
+        
+        def finish_batch():
+            wall_time = time.monotonic() - started
+            self.add_chat_entries([
+                self.make_chat_entry(r["prompt"], r["response"], "batch", r["success"]) for r in results
+            ])
+            total_latency = sum(r["latency"] for r in results)
+            if not batch.done():
+                batch.set_result({
+                    "results": results,
+                    "wall_time": round(wall_time, 3),
+                    "total_latency": round(total_latency, 3),
+                    "speedup": round(total_latency / wall_time, 2) if results and wall_time > 0 else None
+                })
+        
+        def launch_next():
+            if batch.cancelled():
+                return
+            with lock:
+                item = next(pending, None)
+            if item is None:
+                return
+            index, prompt = item
+            submitted = time.monotonic()
+            try:
+                # Sohbet geçmişi sonda tek seferde yazılır
+                future = self.submit_prompt(prompt, timeout, record_history=False)
+            except Exception as e:
+                future = concurrent.futures.Future()
+                future.set_result((False, str(e)))
+            with lock:
+                running[index] = future
+            future.add_done_callback(lambda f: on_done(index, prompt, submitted, f))
+        
+        def on_done(index, prompt, submitted, future):
+            with lock:
+                running.pop(index, None)
+            success, response = (False, "İptal edildi") if future.cancelled() else future.result()
+            result = {
+                "index": index,
+                "prompt": prompt,
+                "success": success,
+                "response": response,
+                "latency": round(time.monotonic() - submitted, 3)
+            }
+            results[index] = result
             
-            os.unlink(temp_file)
+            if on_result:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    print(f"Toplu prompt callback hatası: {str(e)}")
             
-            if result.returncode == 0:
-                return result.stdout or "Kod başarıyla çalıştırıldı"
-            else:
-                return f"Hata: {result.stderr}"
-                
-        except Exception as e:
-            return f"Python execution hatası: {str(e)}"
+            launch_next()
+            with lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished and not batch.cancelled():
+                finish_batch()
+        
+        def cancel_running(f):
+            if f.cancelled():
+                with lock:
+                    futures = list(running.values())
+                for future in futures:
+                    future.cancel()
+        
+        batch.add_done_callback(cancel_running)
+        
+        if not prompts:
+            finish_batch()
+            return batch
+        
+        for _ in range(min(max_parallel, len(prompts))):
+            launch_next()
+        return batch
     
-    def execute_bash_code(self, code: str) -> str:
-        """Bash kodunu çalıştırır"""
-        try:
-            result = subprocess.run(
-                code,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                return result.stdout or "Komut başarıyla çalıştırıldı"
-            else:
-                return f"Hata: {result.stderr}"
-                
-        except Exception as e:
-            return f"Bash execution hatası: {str(e)}"
+    def open_response_stream(self, prompt: str, on_chunk=None, on_analysis=None):
+        """Akan yanıt parçalarını canlı sohbet kaydına, yanıt analizcisine ve callback'e dağıtır.
+        (tap, close) çifti döndürür."""
+        stream_id = next(self.live_response_ids)
+        analyzer = StreamingResponseAnalyzer(on_analysis)
+        
+        with self.state_lock:
+            self.live_responses[stream_id] = {
+                "timestamp": datetime.now().isoformat(),
+                "prompt": prompt,
+                "chunks": []
+            }
+        
+        def tap(chunk: str):
+            with self.state_lock:
+                live = self.live_responses.get(stream_id)
+                if live is not None:
+                    live["chunks"].append(chunk)
+            analyzer.feed(chunk)
+            if on_chunk:
+                on_chunk(chunk)
+        
+        def close():
+            analyzer.finish()
+            with self.state_lock:
+                self.live_responses.pop(stream_id, None)
+        
+        return tap, close
     
-    def execute_cmd_code(self, code: str) -> str:
-        """CMD kodunu çalıştırır"""
-        try:
-            result = subprocess.run(
-                code,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=10,
-                cwd=os.getcwd()
-            )
-            
-            if result.returncode == 0:
-                return result.stdout or "Komut başarıyla çalıştırıldı"
-            else:
-                return f"Hata: {result.stderr}"
-                
-        except Exception as e:
-            return f"CMD execution hatası: {str(e)}"
+    def get_live_responses(self) -> list:
+        """Henüz tamamlanmamış (akış halindeki) yanıtları döndürür"""
+        with self.state_lock:
+            return [{
+                "timestamp": live["timestamp"],
+                "prompt": live["prompt"],
+                "response": "".join(live["chunks"])
+            } for live in self.live_responses.values()]
     
-    def execute_powershell_code(self, code: str) -> str:
-        """PowerShell kodunu çalıştırır"""
-        try:
-            ps_command = f'powershell -Command "{code}"'
-            result = subprocess.run(
-                ps_command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                return result.stdout or "PowerShell komutu başarıyla çalıştırıldı"
-            else:
-                return f"Hata: {result.stderr}"
-                
-        except Exception as e:
-            return f"PowerShell execution hatası: {str(e)}"
+    def describe_prompt_error(self, error: BaseException) -> tuple[bool, str]:
+        if isinstance(error, subprocess.TimeoutExpired):
+            return False, "Claude komutu zaman aşımına uğradı"
+        if isinstance(error, concurrent.futures.CancelledError):
+            return False, "Claude komutu iptal edildi"
+        if isinstance(error, ClaudeUnavailableError):
+            return False, str(error)
+        if isinstance(error, OSError) and self.health_prober is not None:
+            # Süreç başlatılamadı: sağlık durumunu hemen yenile
+            self.health_prober.request_probe()
+        return False, f"Hata: {str(error)}"
     
-    def send_claude_prompt(self, prompt: str = None) -> tuple[bool, str]:
-        if prompt is None:
-            prompt = self.config["auto_prompt"]
-        
+    def process_claude_result(self, prompt: str, result: subprocess.CompletedProcess,
+                              record_history: bool = True) -> tuple[bool, str]:
+        """Tamamlanan CLI çağrısının çıktısını işler ve sohbet geçmişine yazar"""
         try:
-            if prompt.startswith("/"):
-                return self.handle_special_command(prompt)
-            
-            cmd = [self.config["claude_executable"], "--print", prompt]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
             if result.returncode == 0:
-                self.session_data["last_session_start"] = datetime.now().isoformat()
-                self.session_data["session_count"] += 1
-                self.calculate_next_session_time()
-                self.save_session_data()
+                with self.state_lock:
+                    self.session_data["last_session_start"] = datetime.now().isoformat()
+                    self.session_data["session_count"] += 1
+                    self.calculate_next_session_time()
+                    self.save_session_data()
                 
                 response = result.stdout
                 
                 # Claude yanıtını analiz et
                 analysis = self.analyze_claude_response(response)
                 
-                # Otomatik yanıt kontrolü
-                auto_response = self.auto_respond_to_claude(analysis)
-                if auto_response:
-                    # Otomatik yanıt gönder
-                    follow_up_success, follow_up_response = self.send_claude_prompt(auto_response)
-                    if follow_up_success:
-                        response += f"\n\n[AUTO-RESPONSE: {auto_response}]\n{follow_up_response}"
-                    else:
-                        response += f"\n\n[AUTO-RESPONSE FAILED: {auto_response}]\n{follow_up_response}"
-                
                 # Kod çalıştırma kontrolü
                 if analysis["has_code"] and analysis["code_blocks"]:
                     execution_result = self.execute_code_from_response(analysis["code_blocks"])
                     response += f"\n\n[CODE EXECUTION]\n{execution_result}"
                 
+                # Otomatik yanıt zinciri (aynı konuşma içinde)
+                if self.auto_respond_to_claude(analysis):
+                    response += self.run_auto_response_chain(analysis, getattr(result, "session_id", None))
+                
                 # Sohbet geçmişine ekle
-                self.add_chat_entry(prompt, response, "auto")
+                if record_history:
+                    self.add_chat_entry(prompt, response, "auto")
                 
                 return True, response
             else:
                 # Hata durumunu da kaydet
-                self.add_chat_error(prompt, result.stderr, "auto")
+                if record_history:
+                    self.add_chat_error(prompt, result.stderr, "auto")
                 return False, result.stderr
-        except subprocess.TimeoutExpired:
-            return False, "Claude komutu zaman aşımına uğradı"
         except Exception as e:
             return False, f"Hata: {str(e)}"
     
-    def handle_special_command(self, command: str) -> tuple[bool, str]:
+    def build_claude_command(self, prompt: str, output_format: str = "text", resume=None) -> list:
+        cmd = [self.config["claude_executable"], "--print"]
+        # Otomatik yanıtlar aynı konuşmada devam etsin
+        if resume:
+            cmd += ["--resume", resume]
+        if output_format == "stream-json":
+            cmd += ["--output-format", "stream-json", "--verbose"]
+            if self.config.get("stream_partial_messages", True):
+                cmd.append("--include-partial-messages")
+        return cmd + [prompt]
+    
+    def get_dispatcher(self) -> AsyncPromptDispatcher:
+        if self.dispatcher is None:
+            self.dispatcher = AsyncPromptDispatcher(
+                self.build_claude_command,
+                max_in_flight=self.config.get("max_in_flight_prompts", 4),
+                default_timeout=self.config.get("prompt_timeout_seconds", 60),
+                pool_getter=self.get_worker_pool,
+                stream_format=self.config.get("stream_output_format", "stream-json"),
+                track_sessions=self.config.get("auto_response_use_session", True),
+                health_check=lambda: self.get_health_prober().is_available()
+            )
+        return self.dispatcher
+    
+    def get_health_prober(self) -> ClaudeHealthProber:
+        """Claude CLI sağlık denetçisini (gerekirse başlatarak) döndürür"""
+        with self.state_lock:
+            if self.health_prober is None:
+                self.health_prober = ClaudeHealthProber(
+                    lambda: self.config["claude_executable"],
+                    min_interval=self.config.get("health_probe_min_interval", 15),
+                    max_interval=self.config.get("health_probe_max_interval", 300)
+                )
+                self.health_prober.start()
+        return self.health_prober
+    
+    def get_worker_pool(self) -> Optional[ClaudeWorkerPool]:
+        """Ayarlarda etkinse worker havuzunu (gerekirse oluşturarak) döndürür"""
+        if not self.config.get("worker_pool_enabled", False):
+            return None
+        
+        if self.worker_pool is None or self.worker_pool.executable != self.config["claude_executable"]:
+            if self.worker_pool is not None:
+                self.worker_pool.shutdown()
+            self.worker_pool = ClaudeWorkerPool(
+                self.config["claude_executable"],
+                size=self.config.get("worker_pool_size", 2),
+                max_requests=self.config.get("worker_max_requests", 1),
+                extra_args=["--include-partial-messages"] if self.config.get("stream_partial_messages", True) else []
+            )
+        return self.worker_pool
+    
+    def run_claude_cli(self, prompt: str, timeout: float = None, on_chunk=None,
+                       resume=None) -> subprocess.CompletedProcess:
+        """Prompt'u dispatcher üzerinden Claude CLI'a gönderir ve sonucu bekler"""
+        return self.get_dispatcher().run(prompt, timeout, on_chunk, resume)
+    
+    def shutdown(self):
+        """Arka plan kaynaklarını (scheduler, dispatcher, worker havuzu, fork sunucusu) kapatır"""
+        if self.is_running:
+            self.stop_scheduler()
+        self.config_service.stop()
+        self.retention.stop()
+        # Depolama kapanmadan önce bekleyen yazımları tamamla
+        self.writer.flush()
+        if self.dispatcher is not None:
+            self.dispatcher.shutdown()
+            self.dispatcher = None
+        self.followup_executor.shutdown(wait=False)
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+        if self.python_server is not None:
+            self.python_server.shutdown()
+            self.python_server = None
+        if self.health_prober is not None:
+            self.health_prober.stop()
+            self.health_prober = None
+        if self.chat_index is not None:
+            self.chat_index.close()
+            self.chat_index = None
+        self.storage.close()
+    
+    def handle_special_command(self, command: str, use_cache: bool = True) -> tuple[bool, str]:
         command = command.lower().strip()
         
+        cache_key = self.get_cache_key(command) if use_cache else None
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         if command == "/status":
-            return self.get_claude_status()
+            result = self.get_claude_status()
         elif command == "/usage":
-            return self.get_claude_usage()
+            result = self.get_claude_usage()
         elif command == "/cost":
-            return self.get_claude_cost()
+            result = self.get_claude_cost()
         else:
             return False, f"Bilinmeyen komut: {command}"
+        
+        if cache_key is not None and result[0]:
+            self.response_cache.put(cache_key, result, self.response_cache.ttl_for(command))
+        return result
+    
+    def get_cache_key(self, prompt: str):
+        """Önbellek kapalıysa None döndürür"""
+        if not self.config.get("response_cache_enabled", True):
+            return None
+        return self.response_cache.make_key(prompt, self.config["claude_executable"])
     
     def get_claude_status(self) -> tuple[bool, str]:
         try:
-            cmd = [self.config["claude_executable"], "--help"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            # Arka plandaki sağlık denetçisinin önbellekteki sonucunu kullan
+            prober = self.get_health_prober()
+            health = prober.get_status()
+            if health is None or prober.is_available() is None:
+                health = prober.probe_now()
             
             status_info = {
-                "claude_available": result.returncode == 0,
-                "last_check": datetime.now().isoformat(),
+                "claude_available": health["available"],
+                "last_check": health["last_probe"],
+                "health": health,
                 "session_count": self.session_data.get("session_count", 0),
-                "auto_session_running": self.is_running
+                "auto_session_running": self.is_running,
+                "worker_pool": self.worker_pool.get_health() if self.worker_pool else {
+                    "enabled": self.config.get("worker_pool_enabled", False),
+                    "started": False
+                },
+                "dispatcher": self.get_dispatcher().get_stats(),
+                "response_cache": self.response_cache.get_stats(),
+                "write_behind": self.writer.get_stats(),
+                "durable_io": durable_io.get_stats(),
+                "chat_archive": self.chat_archive.get_stats(),
+                "config": self.config_service.get_stats(),
+                "retention": self.retention.get_stats()
             }
             
             return True, json.dumps(status_info, indent=2, ensure_ascii=False)
@@ -503,7 +1114,10 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
             usage_info = {
                 "last_24_hours": recent_reports,
                 "total_sessions_today": sum(1 for r in recent_reports if r.get("date") == now.strftime("%Y-%m-%d")),
-                "last_update": self.usage_log.get("last_check_time")
+                "last_update": self.usage_log.get("last_check_time"),
+                "response_cache": self.response_cache.get_stats(),
+                "write_behind": self.writer.get_stats(),
+                "retention": self.retention.get_stats()
             }
             
             return True, json.dumps(usage_info, indent=2, ensure_ascii=False)
@@ -539,12 +1153,13 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         if len(self.usage_log["hourly_reports"]) > 168:
             self.usage_log["hourly_reports"] = self.usage_log["hourly_reports"][-168:]
         
-        self.save_usage_log()
+        # Sadece yeni rapor yazılır (JSON arka ucunda dosya yine baştan yazılır)
+        self.storage.append_usage_report(report, keep=168)
     
-    def add_scheduled_command(self, time_str: str, command: str, description: str = ""):
+    def add_scheduled_command(self, time_str: str, command: str, description: str = "", use_cache: bool = True):
         try:
             datetime.strptime(time_str, "%H:%M")
-            new_cmd = ScheduledCommand(time_str, command, description)
+            new_cmd = ScheduledCommand(time_str, command, description, use_cache=use_cache)
             self.scheduled_commands.append(new_cmd)
             self.save_scheduled_commands()
             return True, "Zamanlı komut eklendi"
@@ -616,17 +1231,43 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         if not self.config["enable_auto_session"]:
             return
         
-        success, response = self.send_claude_prompt()
+        # Scheduler thread'ini bloklamadan gönder, sonucu callback ile logla
+        self.submit_prompt().add_done_callback(self.log_auto_session_result)
+    
+    def log_auto_session_result(self, future: concurrent.futures.Future):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if future.cancelled():
+            print(f"[{timestamp}] Otomatik session iptal edildi")
+            return
         
+        success, response = future.result()
         if success:
             print(f"[{timestamp}] Otomatik session başlatıldı")
         else:
             print(f"[{timestamp}] Otomatik session hatası: {response}")
     
-    def scheduled_command_job(self, command: str):
+    def scheduled_command_job(self, command: str, use_cache: bool = True):
+        # Aynı dakikaya denk gelen komutlar sırayla beklemesin, dispatcher'da paralel çalışsın
         try:
-            success, response = self.send_claude_prompt(command)
+            if command.startswith("/"):
+                future = concurrent.futures.Future()
+                future.set_result(self.handle_special_command(command, use_cache))
+            else:
+                future = self.submit_prompt(command, use_cache=use_cache)
+        except Exception as e:
+            error_msg = str(e)
+            print(f"Zamanlı komut çalıştırma hatası: {error_msg}")
+            self.add_chat_error(command, error_msg, "scheduled")
+            return None
+        
+        future.add_done_callback(lambda f: self.log_scheduled_command_result(command, f))
+        return future
+    
+    def log_scheduled_command_result(self, command: str, future: concurrent.futures.Future):
+        try:
+            if future.cancelled():
+                raise concurrent.futures.CancelledError()
+            success, response = future.result()
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             if success:
@@ -641,7 +1282,7 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
                 print(f"[{timestamp}] Zamanlı komut hatası: {response}")
                 self.add_chat_error(command, response, "scheduled")
         except Exception as e:
-            error_msg = str(e)
+            error_msg = str(e) or e.__class__.__name__
             print(f"Zamanlı komut çalıştırma hatası: {error_msg}")
             self.add_chat_error(command, error_msg, "scheduled")
     
@@ -657,6 +1298,21 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
             return
         
         self.is_running = True
+        self.arm_schedule()
+        
+        def run_scheduler():
+            while self.is_running:
+                if self.schedule_rearm.is_set():
+                    self.schedule_rearm.clear()
+                    self.arm_schedule()
+                schedule.run_pending()
+                time.sleep(1)
+        
+        self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
+        self.scheduler_thread.start()
+    
+    def arm_schedule(self):
+        """Zamanlanmış işleri güncel ayar ve komutlarla (yeniden) kurar"""
         schedule.clear()
         
         next_session = self.session_data.get("next_session_time")
@@ -666,17 +1322,9 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         
         for cmd in self.scheduled_commands:
             if cmd.enabled:
-                schedule.every().day.at(cmd.time).do(self.scheduled_command_job, cmd.command)
+                schedule.every().day.at(cmd.time).do(self.scheduled_command_job, cmd.command, cmd.use_cache)
         
         schedule.every().hour.do(self.hourly_usage_report)
-        
-        def run_scheduler():
-            while self.is_running:
-                schedule.run_pending()
-                time.sleep(1)
-        
-        self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        self.scheduler_thread.start()
     
     def stop_scheduler(self):
         self.is_running = False
@@ -684,18 +1332,34 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=1)
     
-    def manual_session_start(self, custom_prompt: str = None):
-        success, response = self.send_claude_prompt(custom_prompt)
-        
-        # Manuel sohbeti kaydet
-        if success:
-            prompt = custom_prompt or self.config["auto_prompt"]
-            self.add_chat_entry(prompt, response, "manual")
-        else:
-            prompt = custom_prompt or self.config["auto_prompt"]
-            self.add_chat_error(prompt, response, "manual")
+    def submit_manual_session(self, custom_prompt: str = None, on_chunk=None,
+                              on_analysis=None) -> concurrent.futures.Future:
+        """Manuel session'ı bloklamadan başlatır; sonuç sohbet geçmişine 'manual' olarak yazılır"""
+        prompt = custom_prompt or self.config["auto_prompt"]
+        outer = concurrent.futures.Future()
+        
+        def record(future):
+            if future.cancelled():
+                outer.cancel()
+                return
+            success, response = future.result()
+            
+            # Manuel sohbeti kaydet
+            if success:
+                self.add_chat_entry(prompt, response, "manual")
+            else:
+                self.add_chat_error(prompt, response, "manual")
+            
+            if outer.set_running_or_notify_cancel():
+                outer.set_result((success, response))
         
-        return success, response
+        inner = self.submit_prompt(custom_prompt, on_chunk=on_chunk, on_analysis=on_analysis)
+        inner.add_done_callback(record)
+        outer.add_done_callback(lambda f: inner.cancel() if f.cancelled() else None)
+        return outer
+    
+    def manual_session_start(self, custom_prompt: str = None):
+        return self.submit_manual_session(custom_prompt).result()
 
 class ClaudeSessionGUI:
     def __init__(self):
@@ -1004,6 +1668,15 @@ class ClaudeSessionGUI:
         
         self.root.after(5000, self.auto_update_status)
         self.root.after(1000, self.update_clock)
+        # Ayar izleyici thread'inden gelen bildirimler Tk thread'ine aktarılır
+        self.manager.config_service.subscribe(
+            lambda old, new, changed: self.root.after(0, self.log_config_reload, new, changed)
+        )
+    
+    def log_config_reload(self, snapshot, changed: set):
+        self.log_message(f"Ayarlar yeniden yüklendi: {', '.join(sorted(changed))}")
+        for error in snapshot.errors:
+            self.log_message(f"Ayar uyarısı: {error}")
     
     def log_message(self, message: str, level="info"):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -1333,7 +2006,7 @@ class ClaudeSessionGUI:
         def add_command():
             add_window = tk.Toplevel(commands_window)
             add_window.title("Komut Ekle")
-            add_window.geometry("400x200")
+            add_window.geometry("400x230")
             add_window.transient(commands_window)
             
             add_frame = ttk.Frame(add_window, padding="10")
@@ -1351,9 +2024,12 @@ class ClaudeSessionGUI:
             desc_var = tk.StringVar()
             ttk.Entry(add_frame, textvariable=desc_var, width=30).grid(row=2, column=1, pady=5)
             
+            cache_var = tk.BooleanVar(value=True)
+            ttk.Checkbutton(add_frame, text="Yanıtı önbellekten kullan", variable=cache_var).grid(row=3, column=1, sticky=tk.W, pady=5)
+            
             def save_command():
                 success, message = self.manager.add_scheduled_command(
-                    time_var.get(), command_var.get(), desc_var.get()
+                    time_var.get(), command_var.get(), desc_var.get(), cache_var.get()
                 )
                 if success:
                     refresh_list()
@@ -1362,8 +2038,8 @@ class ClaudeSessionGUI:
                 else:
                     messagebox.showerror("Hata", message)
             
-            ttk.Button(add_frame, text="Ekle", command=save_command).grid(row=3, column=0, pady=20)
-            ttk.Button(add_frame, text="İptal", command=add_window.destroy).grid(row=3, column=1, pady=20)
+            ttk.Button(add_frame, text="Ekle", command=save_command).grid(row=4, column=0, pady=20)
+            ttk.Button(add_frame, text="İptal", command=add_window.destroy).grid(row=4, column=1, pady=20)
         
         def remove_command():
             selection = tree.selection()
@@ -1435,6 +2111,31 @@ class ClaudeSessionGUI:
                             report_text.insert(tk.END, f"{timestamp}: {session_count} session, Otomatik: {active}\n")
                     else:
                         report_text.insert(tk.END, "Henüz veri yok\n")
+                    
+                    cache_stats = usage_info.get('response_cache', {})
+                    report_text.insert(tk.END, "\n=== YANIT ÖNBELLEĞİ ===\n")
+                    report_text.insert(tk.END, f"İsabet: {cache_stats.get('hits', 0)}, Iska: {cache_stats.get('misses', 0)}")
+                    if cache_stats.get('hit_rate') is not None:
+                        report_text.insert(tk.END, f" (%{cache_stats['hit_rate']})")
+                    report_text.insert(tk.END, f"\nKayıt: {cache_stats.get('entries', 0)}/{cache_stats.get('max_entries', 0)}, Çıkarılan: {cache_stats.get('evictions', 0)}\n")
+                    
+                    writer_stats = usage_info.get('write_behind', {})
+                    report_text.insert(tk.END, "\n=== GECİKTİRMELİ YAZMA ===\n")
+                    report_text.insert(tk.END, f"Kaydetme isteği: {writer_stats.get('marks', 0)}, Disk yazımı: {writer_stats.get('writes', 0)}")
+                    if writer_stats.get('coalescing_ratio') is not None:
+                        report_text.insert(tk.END, f" (birleştirme oranı {writer_stats['coalescing_ratio']})")
+                    report_text.insert(tk.END, f"\nYazım turu: {writer_stats.get('flushes', 0)}, Ortalama: {writer_stats.get('avg_flush_ms', 0)} ms, En uzun: {writer_stats.get('max_flush_ms', 0)} ms\n")
+                    
+                    retention_stats = usage_info.get('retention', {})
+                    report_text.insert(tk.END, "\n=== VERİ SAKLAMA ===\n")
+                    if retention_stats.get('last_run'):
+                        report_text.insert(tk.END, f"Son çalıştırma: {retention_stats['last_run'][:19]}, Süre: {retention_stats.get('last_duration_ms', 0)} ms\n")
+                        report_text.insert(tk.END, f"Geri kazanılan: {retention_stats.get('last_reclaimed_bytes', 0) / 1024 / 1024:.1f} MB (toplam {retention_stats.get('total_reclaimed_bytes', 0) / 1024 / 1024:.1f} MB)\n")
+                        report_text.insert(tk.END, f"Silinen dosya: {retention_stats.get('removed_files', 0)}, Arşivlenen: {retention_stats.get('archived_files', 0)}\n")
+                        for data_class, summary in retention_stats.get('classes', {}).items():
+                            report_text.insert(tk.END, f"  {data_class}: {summary['units']} birim, {summary['bytes'] / 1024 / 1024:.1f} MB, kaldırılan {summary['removed']}\n")
+                    else:
+                        report_text.insert(tk.END, "Henüz çalışmadı\n")
                         
                 except json.JSONDecodeError:
                     report_text.insert(tk.END, f"Veri parse hatası: {usage_data}")
@@ -1464,6 +2165,9 @@ class ClaudeSessionGUI:
         search_var = tk.StringVar()
         search_entry = ttk.Entry(search_frame, textvariable=search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=(0, 10))
+        search_info = ttk.Label(search_frame, text='Örn: kelime "tam ifade" type:batch since:2024-01-01',
+                                foreground="gray")
+        search_info.pack(side=tk.LEFT)
         
         # Sohbet listesi frame
         list_frame = ttk.Frame(frame)
@@ -1485,15 +2189,21 @@ class ClaudeSessionGUI:
         chat_text.tag_configure("type_manual", background="#e6f3ff")
         chat_text.tag_configure("type_scheduled", background="#fff2e6")
         chat_text.tag_configure("type_auto", background="#f0f8f0")
+        chat_text.tag_configure("live", foreground="dark orange")
+        chat_text.tag_configure("match", foreground="purple")
+        
+        # Gösterilen kayıt sayısı; "Daha Eski" ile sayfa sayfa artar
+        page_size = 100
+        shown = {"count": page_size}
         
         def refresh_chat():
             chat_text.delete(1.0, tk.END)
             
-            # Sohbet geçmişini yükle
-            history = self.manager.chat_history
-            search_term = search_var.get().lower()
+            # Sadece gösterilecek sayfa yüklenir (eski kayıtlar arşiv bloklarından)
+            search_term = search_var.get().strip()
+            page = None if search_term else self.manager.get_chat_page(0, shown["count"])
             
-            if not history:
+            if page is not None and not page["entries"] and not self.manager.live_responses:
                 chat_text.insert(tk.END, "Henüz sohbet kaydı bulunmuyor.\n\n")
                 chat_text.insert(tk.END, "Sohbet kayıtları şunları içerir:\n")
                 chat_text.insert(tk.END, "- Manuel session'lar\n")
@@ -1501,12 +2211,31 @@ class ClaudeSessionGUI:
                 chat_text.insert(tk.END, "- Otomatik session'lar\n")
                 return
             
-            # Son kayıtları göster (en yeni üstte)
-            for entry in reversed(history[-100:]):
-                # Arama filtresi
-                if search_term and search_term not in entry.get('prompt', '').lower() and search_term not in entry.get('response', '').lower():
-                    continue
-                
+            # Akış halindeki yanıtlar (en üstte)
+            for live in self.manager.get_live_responses():
+                chat_text.insert(tk.END, f"{'='*80}\n")
+                chat_text.insert(tk.END, f"{live['timestamp'][:19].replace('T', ' ')} [CANLI]\n", "timestamp")
+                chat_text.insert(tk.END, f"\n➜ PROMPT: {live['prompt']}\n", "prompt")
+                chat_text.insert(tk.END, f"\n… CLAUDE: {live['response']}\n\n", "live")
+            
+            if search_term:
+                # İndeks üzerinden tüm geçmişte ara (en ilgili üstte)
+                result = self.manager.search_chat_history(search_term, limit=100)
+                entries = result["hits"]
+                if result["error"]:
+                    search_info.config(text=f"Geçersiz sorgu: {result['error']}")
+                elif result["elapsed_ms"] is not None:
+                    search_info.config(text=f"{len(entries)} sonuç ({result['elapsed_ms']:.1f} ms)")
+                else:
+                    search_info.config(text=f"{len(entries)} sonuç")
+            else:
+                # Son kayıtları göster (en yeni üstte)
+                entries = page["entries"]
+                search_info.config(text=f"{len(entries)}/{page['total']} kayıt gösteriliyor  "
+                                        'Örn: kelime "tam ifade" type:batch since:2024-01-01')
+                older_button.config(state=tk.NORMAL if page["has_more"] else tk.DISABLED)
+            
+            for entry in entries:
                 timestamp = entry.get('timestamp', '')
                 prompt = entry.get('prompt', '')
                 response = entry.get('response', '')
@@ -1525,7 +2254,8 @@ class ClaudeSessionGUI:
                 type_indicator = {
                     'manual': '[MANUEL]',
                     'scheduled': '[ZAMANLI]', 
-                    'auto': '[OTOMATIK]'
+                    'auto': '[OTOMATIK]',
+                    'batch': '[TOPLU]'
                 }.get(cmd_type, '[BELİRSİZ]')
                 
                 # Header
@@ -1535,6 +2265,11 @@ class ClaudeSessionGUI:
                 # Prompt
                 chat_text.insert(tk.END, f"\n➜ PROMPT: {prompt}\n", "prompt")
                 
+                # Arama eşleşmesi
+                snippet = entry.get('response_snippet')
+                if snippet and '[' in snippet:
+                    chat_text.insert(tk.END, f"\n🔎 EŞLEŞME: {snippet}\n", "match")
+                
                 # Response
                 if success:
                     chat_text.insert(tk.END, f"\n✓ CLAUDE: {response}\n\n", "response")
@@ -1555,10 +2290,16 @@ class ClaudeSessionGUI:
         
         ttk.Button(button_frame, text="Yenile", command=refresh_chat).pack(side=tk.LEFT, padx=5)
         
+        def show_older():
+            shown["count"] += page_size
+            refresh_chat()
+        
+        older_button = ttk.Button(button_frame, text="Daha Eski Kayıtlar", command=show_older)
+        older_button.pack(side=tk.LEFT, padx=5)
+        
         def clear_history():
             if messagebox.askyesno("Onay", "Tüm sohbet geçmişini silmek istediğinizden emin misiniz?"):
-                self.manager.chat_history = []
-                self.manager.save_chat_history()
+                self.manager.clear_chat_history()
                 refresh_chat()
                 self.log_message("Sohbet geçmişi temizlendi")
         
@@ -1567,34 +2308,26 @@ class ClaudeSessionGUI:
         def export_history():
             try:
                 export_file = f"chat_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-                with open(export_file, 'w', encoding='utf-8') as f:
-                    f.write("Claude Session Manager - Sohbet Geçmişi\n")
-                    f.write(f"Export Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("="*80 + "\n\n")
-                    
-                    for entry in self.manager.chat_history:
-                        timestamp = entry.get('timestamp', '')
-                        prompt = entry.get('prompt', '')
-                        response = entry.get('response', '')
-                        cmd_type = entry.get('type', 'manual')
-                        success = entry.get('success', True)
-                        
-                        f.write(f"Zaman: {timestamp}\n")
-                        f.write(f"Tip: {cmd_type.upper()}\n")
-                        f.write(f"Prompt: {prompt}\n")
-                        f.write(f"Yanıt: {response}\n")
-                        f.write(f"Başarılı: {success}\n")
-                        f.write("-"*80 + "\n\n")
+                count = self.manager.export_chat_history(export_file)
                 
-                messagebox.showinfo("Başarılı", f"Sohbet geçmişi {export_file} dosyasına aktarıldı")
+                messagebox.showinfo("Başarılı", f"{count} sohbet kaydı {export_file} dosyasına aktarıldı")
                 self.log_message(f"Sohbet geçmişi {export_file} dosyasına aktarıldı")
             except Exception as e:
                 messagebox.showerror("Hata", f"Export hatası: {str(e)}")
         
         ttk.Button(button_frame, text="Export Et", command=export_history).pack(side=tk.LEFT, padx=5)
         
+        # Akış halinde yanıt varken görünümü düzenli yenile
+        def poll_live():
+            if not chat_window.winfo_exists():
+                return
+            if self.manager.live_responses:
+                refresh_chat()
+            chat_window.after(500, poll_live)
+        
         # İlk yükleme
         refresh_chat()
+        chat_window.after(500, poll_live)
     
     def show_work_protocols(self):
         protocols_window = tk.Toplevel(self.root)
@@ -1853,6 +2586,7 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         self.terminal_output.insert(tk.END, f"📁 Mevcut dizin: {self.current_directory}\n", "info")
         self.terminal_output.insert(tk.END, "🚀 Özel komutlar:\n", "info")
         self.terminal_output.insert(tk.END, "  • claude [mesaj]     → AI session başlat\n", "info")
+        self.terminal_output.insert(tk.END, "  • claude-batch [dosya] → Dosyadaki prompt'ları paralel gönder\n", "info")
         self.terminal_output.insert(tk.END, "  • auto on/off/status → Otomatik özellikler\n", "info")
         self.terminal_output.insert(tk.END, "  • cd [dizin]        → Dizin değiştir\n", "info")
         self.terminal_output.insert(tk.END, "\n✨ Otomatik özellikler aktif - Claude kodları çalıştırılacak!\n\n", "info")
@@ -1878,6 +2612,12 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         self.terminal_output.insert(tk.END, f"{command}\n", "command")
         
         # Özel komutları kontrol et
+        if command.lower().startswith("claude-batch"):
+            self.run_claude_batch_from_terminal(command[len("claude-batch"):].strip())
+            self.command_entry.delete(0, tk.END)
+            self.terminal_output.see(tk.END)
+            return
+        
         if command.lower().startswith("claude "):
             # Claude'a özel prompt gönder
             prompt = command[7:].strip()  # "claude " kısmını kaldır
@@ -1902,14 +2642,10 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
             # Otomatik ayarları kontrol et
             auto_command = command[5:].strip()
             if auto_command == "on":
-                self.manager.config["auto_response_enabled"] = True
-                self.manager.config["auto_execute_code"] = True
-                self.manager.save_config(self.manager.config)
+                self.manager.save_config({"auto_response_enabled": True, "auto_execute_code": True})
                 self.terminal_output.insert(tk.END, "✅ Otomatik özellikler AÇILDI\n", "info")
             elif auto_command == "off":
-                self.manager.config["auto_response_enabled"] = False
-                self.manager.config["auto_execute_code"] = False
-                self.manager.save_config(self.manager.config)
+                self.manager.save_config({"auto_response_enabled": False, "auto_execute_code": False})
                 self.terminal_output.insert(tk.END, "❌ Otomatik özellikler KAPATILDI\n", "warning")
             elif auto_command == "status":
                 auto_resp = self.manager.config.get("auto_response_enabled", False)
@@ -1960,16 +2696,70 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         self.command_entry.delete(0, tk.END)
         self.terminal_output.see(tk.END)
     
+    def run_claude_batch_from_terminal(self, file_path):
+        if not file_path:
+            self.terminal_output.insert(tk.END, "❓ Kullanım: claude-batch [dosya] (her satır bir prompt)\n", "warning")
+            return
+        
+        path = os.path.join(self.current_directory, file_path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                prompts = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        except Exception as e:
+            self.terminal_output.insert(tk.END, f"❌ Dosya okunamadı: {str(e)}\n", "error")
+            return
+        
+        if not prompts:
+            self.terminal_output.insert(tk.END, "❓ Dosyada prompt bulunamadı\n", "warning")
+            return
+        
+        total = len(prompts)
+        self.terminal_output.insert(tk.END, f"📦 {total} prompt paralel gönderiliyor...\n", "info")
+        
+        def write(text, tag):
+            # Sonuçlar worker thread'lerinden gelir, Tk çağrıları ana thread'de yapılmalı
+            self.root.after(0, self.terminal_output.insert, tk.END, text, tag)
+            self.root.after(0, self.terminal_output.see, tk.END)
+        
+        def show_result(result):
+            status = "✅" if result["success"] else "❌"
+            response = result["response"].strip().replace("\n", " ")
+            preview = response[:100] + "..." if len(response) > 100 else response
+            write(f"[{result['index'] + 1}/{total}] {status} {result['prompt'][:40]} ({result['latency']:.1f}s)\n   {preview}\n",
+                  "output" if result["success"] else "error")
+        
+        def show_summary(future):
+            if future.cancelled():
+                write("❌ Toplu gönderim iptal edildi\n", "error")
+                return
+            report = future.result()
+            succeeded = sum(1 for r in report["results"] if r["success"])
+            write(f"\n📊 {succeeded}/{total} başarılı | Toplam süre: {report['wall_time']:.1f}s | "
+                  f"Gecikme toplamı: {report['total_latency']:.1f}s | Hızlanma: {report['speedup'] or 0}x\n\n", "info")
+        
+        self.manager.submit_batch(prompts, on_result=show_result).add_done_callback(show_summary)
+    
     def start_claude_session_from_terminal(self, custom_prompt=None):
         def run_claude():
             try:
                 prompt = custom_prompt or "Terminal'den başlatıldı"
-                success, response = self.manager.manual_session_start(prompt)
+                streamed = []
+                
+                # Yanıt parçalarını geldikçe terminale yaz (Tk çağrıları ana thread'de)
+                def show_chunk(chunk):
+                    if not streamed:
+                        self.root.after(0, self.terminal_output.insert, tk.END, "\n📝 Claude Yanıtı:\n", "output")
+                    streamed.append(chunk)
+                    self.root.after(0, self.terminal_output.insert, tk.END, chunk, "output")
+                    self.root.after(0, self.terminal_output.see, tk.END)
+                
+                success, response = self.manager.submit_manual_session(prompt, on_chunk=show_chunk).result()
                 if success:
-                    self.terminal_output.insert(tk.END, "✅ Claude session başarıyla başlatıldı!\n", "info")
+                    self.terminal_output.insert(tk.END, "\n✅ Claude session başarıyla başlatıldı!\n", "info")
                     
-                    # Yanıtı göster
-                    self.terminal_output.insert(tk.END, f"\n📝 Claude Yanıtı:\n{response}\n\n", "output")
+                    # Akış olmadıysa yanıtı tek seferde göster
+                    if not streamed:
+                        self.terminal_output.insert(tk.END, f"\n📝 Claude Yanıtı:\n{response}\n\n", "output")
                     
                     # Yanıtı analiz et ve kod varsa çalıştır
                     analysis = self.manager.analyze_claude_response(response)
@@ -1978,13 +2768,12 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
                         execution_result = self.manager.execute_code_from_response(analysis["code_blocks"])
                         self.terminal_output.insert(tk.END, f"💻 Kod Çalıştırma Sonucu:\n{execution_result}\n\n", "output")
                     
-                    # Seçenekler varsa otomatik yanıtla
+                    # Seçenekler otomatik yanıt zincirinde aynı konuşma içinde yanıtlandı
                     if analysis["has_choices"]:
-                        auto_response = self.manager.auto_respond_to_claude(analysis)
-                        if auto_response:
-                            self.terminal_output.insert(tk.END, f"🤖 Otomatik yanıt gönderiliyor: {auto_response}\n", "info")
-                            # Recursive call - otomatik yanıtı gönder
-                            self.start_claude_session_from_terminal(auto_response)
+                        chain = self.manager.session_data.get("last_auto_response_chain")
+                        if self.manager.auto_respond_to_claude(analysis) and chain:
+                            latencies = ", ".join(f"{latency:.1f}s" for latency in chain["hop_latencies"])
+                            self.terminal_output.insert(tk.END, f"🤖 Otomatik yanıt zinciri: {len(chain['hop_latencies'])} adım ({latencies})\n", "info")
                         else:
                             self.terminal_output.insert(tk.END, "❓ Seçenekler mevcut ama otomatik yanıt kapalı\n", "warning")
                 else:
@@ -2027,8 +2816,7 @@ powershell -c "[Console]::Beep(800,300); [Console]::Beep(800,300); [Console]::Be
         self.root.mainloop()
     
     def on_closing(self):
-        if self.manager.is_running:
-            self.manager.stop_scheduler()
+        self.manager.shutdown()
         self.root.destroy()
 
 if __name__ == "__main__":
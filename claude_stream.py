@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Claude CLI Akış Çıktısı Ayrıştırıcı
+`--output-format stream-json` ile gelen olay satırlarını metin parçalarına çevirir.
+"""
+
+import json
+from typing import Optional
+
+
+class StreamJsonParser:
+    """stream-json olaylarından metin parçalarını ve nihai sonucu çıkarır"""
+
+    def __init__(self):
+        self.chunks = []
+        self.result: Optional[str] = None
+        self.is_error = False
+        self.session_id: Optional[str] = None
+        self._saw_delta = False
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed_line(self, line: str) -> list:
+        """Bir çıktı satırını işler, yeni metin parçalarını döndürür"""
+        line = line.strip()
+        if not line:
+            return []
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            return []
+        if not isinstance(event, dict):
+            return []
+
+        if event.get("session_id"):
+            self.session_id = event["session_id"]
+
+        new_chunks = []
+        event_type = event.get("type")
+
+        if event_type == "stream_event":
+            # --include-partial-messages ile gelen token parçaları
+            inner = event.get("event", {})
+            delta = inner.get("delta", {})
+            if inner.get("type") == "content_block_delta" and delta.get("type") == "text_delta":
+                self._saw_delta = True
+                new_chunks.append(delta.get("text", ""))
+
+        elif event_type == "assistant" and not self._saw_delta:
+            # Parça akışı yoksa tamamlanmış asistan mesajlarını kullan
+            for block in event.get("message", {}).get("content", []):
+                if isinstance(block, dict) and block.get("type") == "text":
+                    new_chunks.append(block.get("text", ""))
+
+        elif event_type == "result":
+            self.is_error = bool(event.get("is_error"))
+            self.result = event.get("result") or "".join(self.chunks)
+            if not self.chunks and not self.is_error:
+                # Hiç parça gelmediyse sonucu tek parça olarak ilet
+                new_chunks.append(self.result)
+
+        new_chunks = [c for c in new_chunks if c]
+        self.chunks.extend(new_chunks)
+        return new_chunks
+
+    def text(self) -> str:
+        return self.result if self.result is not None else "".join(self.chunks)
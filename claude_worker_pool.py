@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Claude CLI Worker Havuzu
+Her prompt için yeni bir `claude --print` süreci başlatmak yerine, stream-json
+girdi modunda çalışan N adet kalıcı CLI sürecini sıcak tutar.
+
+Bir worker'ın aldığı tüm prompt'lar aynı stream-json konuşmasına eklenir; ilgisiz
+prompt'lar (zamanlı, toplu, elle) bağlamı paylaşır ve token maliyeti büyür. Bu yüzden
+varsayılan max_requests=1'dir: her istekten sonra worker yenisiyle değiştirilir, yeni
+süreç bir sonraki istek gelene kadar ısınır. Daha büyük değerler bağlam paylaşımını
+kabul etmek demektir.
+"""
+
+import json
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from claude_stream import StreamJsonParser
+
+
+class WorkerPoolError(Exception):
+    """Havuzdan yanıt alınamadığında fırlatılır"""
+
+
+class ClaudeWorker:
+    """Stream-json girdi modunda çalışan tek bir kalıcı Claude CLI süreci"""
+
+    def __init__(self, executable: str, worker_id: int, extra_args=()):
+        self.executable = executable
+        self.worker_id = worker_id
+        self.extra_args = list(extra_args)
+        self.process = None
+        self.request_count = 0
+        self.started_at = None
+        self.last_used = None
+        self._lines = queue.Queue()
+        self._stderr_tail = deque(maxlen=20)
+
+    def build_command(self) -> list:
+        return [
+            self.executable,
+            "--print",
+            "--input-format", "stream-json",
+            "--output-format", "stream-json",
+            "--verbose",
+        ] + self.extra_args
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.build_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.started_at = datetime.now()
+        self.request_count = 0
+
+        # stdout satırlarını kuyruğa, stderr'i son satırlar tamponuna aktar
+        threading.Thread(target=self._pump_stdout, daemon=True).start()
+        threading.Thread(target=self._pump_stderr, daemon=True).start()
+
+    def _pump_stdout(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)  # EOF işareti
+
+    def _pump_stderr(self):
+        for line in self.process.stderr:
+            self._stderr_tail.append(line)
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stderr_text(self) -> str:
+        return "".join(self._stderr_tail)
+
+    def send(self, prompt: str, timeout: float, on_chunk=None) -> subprocess.CompletedProcess:
+        """Prompt'u gönderir ve `result` olayı gelene kadar bekler"""
+        message = {
+            "type": "user",
+            "message": {"role": "user", "content": [{"type": "text", "text": prompt}]},
+        }
+        self.process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+
+        parser = StreamJsonParser()
+        deadline = time.monotonic() + timeout
+        while not parser.done:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.build_command(), timeout)
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(self.build_command(), timeout)
+
+            if line is None:
+                raise WorkerPoolError(f"Worker {self.worker_id} beklenmedik şekilde kapandı: {self.stderr_text()}")
+
+            for chunk in parser.feed_line(line):
+                if on_chunk:
+                    on_chunk(chunk)
+
+        self.request_count += 1
+        self.last_used = datetime.now()
+        if parser.is_error:
+            result = subprocess.CompletedProcess(self.build_command(), 1, "", parser.text() or self.stderr_text())
+        else:
+            result = subprocess.CompletedProcess(self.build_command(), 0, parser.text(), "")
+        result.session_id = parser.session_id
+        return result
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class ClaudeWorkerPool:
+    """Sıcak Claude CLI worker'larından oluşan havuz"""
+
+    def __init__(self, executable: str, size: int = 2, max_requests: int = 1,
+                 acquire_timeout: float = 30, extra_args=()):
+        self.executable = executable
+        self.extra_args = list(extra_args)
+        self.size = max(1, int(size))
+        self.max_requests = max(1, int(max_requests))
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = queue.Queue()
+        self._workers = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._spawning = 0
+        self._started = False
+        self._closed = False
+
+        self.stats = {
+            "total_requests": 0,
+            "failed_requests": 0,
+            "crashes": 0,
+            "recycles": 0,
+            "spawned": 0,
+            "total_latency": 0.0,
+        }
+
+    def _spawn_worker(self) -> ClaudeWorker:
+        with self._lock:
+            worker = ClaudeWorker(self.executable, self._next_id, self.extra_args)
+            self._next_id += 1
+        worker.start()
+        with self._lock:
+            self._workers[worker.worker_id] = worker
+            self.stats["spawned"] += 1
+        return worker
+
+    def _top_up(self):
+        """Yeniden başlatılamayan worker'lar yüzünden eksik kalan havuzu tamamlar"""
+        while not self._closed:
+            with self._lock:
+                if len(self._workers) + self._spawning >= self.size:
+                    return
+                self._spawning += 1
+            try:
+                self._idle.put(self._spawn_worker())
+            except OSError as e:
+                raise WorkerPoolError(f"Worker başlatılamadı: {e}")
+            finally:
+                with self._lock:
+                    self._spawning -= 1
+
+    def _retire_worker(self, worker: ClaudeWorker):
+        with self._lock:
+            self._workers.pop(worker.worker_id, None)
+        worker.stop()
+
+    def _replace_worker(self, worker: ClaudeWorker):
+        self._retire_worker(worker)
+        if self._closed:
+            return
+        try:
+            self._idle.put(self._spawn_worker())
+        except OSError as e:
+            print(f"Worker yeniden başlatılamadı: {e}")
+
+    def start(self):
+        """Havuzu doldurur; ilk istek geldiğinde otomatik çağrılır"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        try:
+            for _ in range(self.size):
+                self._idle.put(self._spawn_worker())
+        except OSError as e:
+            # Yarım kalan havuzu temizle, sonraki istekte yeniden denensin
+            self.shutdown()
+            self._closed = False
+            with self._lock:
+                self._started = False
+            self._idle = queue.Queue()
+            raise WorkerPoolError(f"Worker başlatılamadı: {e}")
+
+    def execute(self, prompt: str, timeout: float = 60, on_chunk=None) -> subprocess.CompletedProcess:
+        """Prompt'u boştaki bir worker'a gönderir; on_chunk verilirse yanıt parça parça iletilir"""
+        if self._closed:
+            raise WorkerPoolError("Worker havuzu kapatıldı")
+        self.start()
+        try:
+            self._top_up()
+        except WorkerPoolError:
+            # Hiç worker kalmadıysa acquire_timeout beklemeden çağırana bildir
+            with self._lock:
+                if not self._workers:
+                    raise
+
+        try:
+            worker = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise WorkerPoolError("Boşta worker bulunamadı")
+
+        # Çökmüş worker'ı yenisiyle değiştir
+        if not worker.is_alive():
+            self.stats["crashes"] += 1
+            self._retire_worker(worker)
+            try:
+                worker = self._spawn_worker()
+            except OSError as e:
+                raise WorkerPoolError(f"Worker başlatılamadı: {e}")
+
+        start = time.monotonic()
+        try:
+            result = worker.send(prompt, timeout, on_chunk)
+        except (subprocess.TimeoutExpired, WorkerPoolError, OSError, ValueError) as e:
+            # Durumu belirsiz worker'ı öldür, yerine yenisini koy
+            self.stats["failed_requests"] += 1
+            self.stats["crashes"] += 1
+            self._replace_worker(worker)
+            if isinstance(e, (OSError, ValueError)):
+                # Kırık pipe: çağıran tek seferlik sürece dönebilsin
+                raise WorkerPoolError(f"Worker {worker.worker_id} ile iletişim kurulamadı: {e}")
+            raise
+
+        self.stats["total_requests"] += 1
+        self.stats["total_latency"] += time.monotonic() - start
+
+        if worker.request_count >= self.max_requests:
+            self.stats["recycles"] += 1
+            self._replace_worker(worker)
+        else:
+            self._idle.put(worker)
+
+        return result
+
+    def get_health(self) -> dict:
+        """Havuz sağlık bilgisini döndürür"""
+        with self._lock:
+            workers = list(self._workers.values())
+        alive = sum(1 for w in workers if w.is_alive())
+        idle = self._idle.qsize()
+        total = self.stats["total_requests"]
+        return {
+            "enabled": True,
+            "started": self._started,
+            "size": self.size,
+            "alive": alive,
+            "idle": idle,
+            "busy": max(0, len(workers) - idle),
+            "max_requests_per_worker": self.max_requests,
+            "total_requests": total,
+            "failed_requests": self.stats["failed_requests"],
+            "crashes": self.stats["crashes"],
+            "recycles": self.stats["recycles"],
+            "spawned": self.stats["spawned"],
+            "avg_latency_ms": round(self.stats["total_latency"] / total * 1000, 1) if total else None,
+        }
+
+    def shutdown(self):
+        """Tüm worker süreçlerini kapatır"""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
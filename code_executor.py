@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Paralel Kod Bloğu Çalıştırıcı
+Claude yanıtlarından çıkarılan kod bloklarını ayrı süreçlerde eşzamanlı çalıştırır.
+Dil başına eşzamanlılık sınırı, blok ve toplam zaman aşımı ile çıktı boyutu sınırı uygular;
+sonuçlar blok sırasıyla döner.
+"""
+
+import concurrent.futures
+import locale
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from python_fork_server import ForkServerError, ForkServerReplyError
+
+# Dil takma adları -> executor adı
+LANGUAGE_ALIASES = {
+    "python": "python", "py": "python",
+    "bash": "bash", "sh": "bash",
+    "cmd": "cmd", "bat": "cmd",
+    "powershell": "powershell", "ps1": "powershell",
+}
+
+
+@dataclass
+class CodeBlockResult:
+    index: int
+    language: str
+    status: str  # ok, error, timeout, denied, unsupported
+    exit_code: Optional[int] = None
+    output: str = ""
+    wall_time: float = 0.0
+
+
+class CodeBlockExecutor:
+    """Kod bloklarını dil başına sınırlı eşzamanlılıkla ayrı süreçlerde çalıştırır"""
+
+    def __init__(self, allowed_languages: List[str], max_parallel: int = 4,
+                 language_limits: Optional[Dict[str, int]] = None, block_timeout: float = 10,
+                 total_timeout: float = 30, max_output_chars: int = 4000, python_runner=None):
+        self.allowed_languages = [lang.lower() for lang in allowed_languages]
+        self.max_parallel = max(1, int(max_parallel))
+        self.block_timeout = block_timeout
+        self.total_timeout = total_timeout
+        self.max_output_chars = max_output_chars
+        # Verilirse Python blokları yeni yorumlayıcı yerine fork sunucusunda çalışır
+        self.python_runner = python_runner
+
+        limits = language_limits or {}
+        self._language_slots = {
+            name: threading.Semaphore(max(1, int(limits.get(name, self.max_parallel))))
+            for name in set(LANGUAGE_ALIASES.values())
+        }
+        self._processes = set()
+        self._lock = threading.Lock()
+
+    def build_command(self, language: str, code: str, script_path: Optional[str] = None):
+        """(komut, shell) çifti döndürür"""
+        if language == "python":
+            return [sys.executable, script_path], False
+        if language == "powershell":
+            return ["powershell", "-Command", code], False
+        # bash/cmd: sistem kabuğu (Windows'ta cmd, diğerlerinde /bin/sh)
+        return code, True
+
+    def run_blocks(self, code_blocks: list) -> List[CodeBlockResult]:
+        """Tüm blokları çalıştırır; sonuçları blok sırasıyla döndürür"""
+        results: List[Optional[CodeBlockResult]] = [None] * len(code_blocks)
+        deadline = time.monotonic() + self.total_timeout
+        runnable = []
+
+        for index, block in enumerate(code_blocks):
+            lang = block["language"].lower()
+            if lang not in self.allowed_languages:
+                results[index] = CodeBlockResult(index, lang, "denied")
+            elif lang not in LANGUAGE_ALIASES:
+                results[index] = CodeBlockResult(index, lang, "unsupported")
+            else:
+                runnable.append((index, lang, block["code"]))
+
+        if runnable:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(self.max_parallel, len(runnable)), thread_name_prefix="code-block"
+            ) as pool:
+                futures = {
+                    pool.submit(self.run_block, index, lang, code, deadline): (index, lang)
+                    for index, lang, code in runnable
+                }
+                remaining = max(0, deadline - time.monotonic())
+                done, not_done = concurrent.futures.wait(futures, timeout=remaining + 1)
+                if not_done:
+                    # Toplam süre doldu, kalan süreçleri sonlandır
+                    self.kill_all()
+                    for future in not_done:
+                        future.cancel()
+                for future, (index, lang) in futures.items():
+                    try:
+                        results[index] = future.result()
+                    except concurrent.futures.CancelledError:
+                        results[index] = CodeBlockResult(index, lang, "timeout", output="Toplam süre doldu")
+
+        return results
+
+    def run_block(self, index: int, lang: str, code: str, deadline: float) -> CodeBlockResult:
+        language = LANGUAGE_ALIASES[lang]
+        with self._language_slots[language]:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return CodeBlockResult(index, lang, "timeout", output="Toplam süre doldu")
+
+            if language == "python" and self.python_runner is not None:
+                started = time.monotonic()
+                timeout = min(self.block_timeout, remaining)
+                try:
+                    return self._run_forked(index, lang, code, timeout)
+                except ForkServerReplyError as e:
+                    # İstek iletildi, kod çalışmış olabilir: yeniden çalıştırmak yan etkileri tekrarlar
+                    elapsed = time.monotonic() - started
+                    return CodeBlockResult(index, lang, "timeout" if elapsed >= timeout else "error",
+                                           output=str(e), wall_time=round(elapsed, 3))
+                except ForkServerError as e:
+                    print(f"Fork sunucusu kullanılamadı, yeni süreçle çalıştırılıyor: {str(e)}")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return CodeBlockResult(index, lang, "timeout", output="Toplam süre doldu")
+
+            script_path = None
+            if language == "python":
+                with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
+                    f.write(code)
+                    script_path = f.name
+
+            started = time.monotonic()
+            try:
+                cmd, shell = self.build_command(language, code, script_path)
+                return self._run_process(index, lang, cmd, shell, min(self.block_timeout, remaining), started, deadline)
+            except Exception as e:
+                return CodeBlockResult(index, lang, "error", output=str(e),
+                                       wall_time=round(time.monotonic() - started, 3))
+            finally:
+                if script_path:
+                    os.unlink(script_path)
+
+    def _run_process(self, index, lang, cmd, shell, timeout, started, deadline) -> CodeBlockResult:
+        process = subprocess.Popen(
+            cmd, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=os.getcwd(),
+            # Kabuk komutlarının alt süreçleri de birlikte sonlandırılabilsin
+            start_new_session=(os.name != 'nt')
+        )
+        with self._lock:
+            self._processes.add(process)
+
+        # Çıktı parça parça okunur; bayt sınırını aşan süreç (grubu) sonlandırılır,
+        # böylece sonsuz çıktı bellekte birikmez. Karakter sınırı aşıldığını görebilmek
+        # için fork sunucusundaki gibi biraz fazlası tutulur
+        limit = self.max_output_chars * 4 + 4
+        buffers = (bytearray(), bytearray())
+        overflow = threading.Event()
+
+        def pump(stream, buffer):
+            for chunk in iter(lambda: stream.read1(65536), b""):
+                room = limit - len(buffer)
+                buffer += chunk[:room]
+                if len(chunk) > room and not overflow.is_set():
+                    overflow.set()
+                    self._kill(process)
+            stream.close()
+
+        readers = [threading.Thread(target=pump, args=(stream, buffer), daemon=True)
+                   for stream, buffer in zip((process.stdout, process.stderr), buffers)]
+        for reader in readers:
+            reader.start()
+
+        timed_out = False
+        try:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                self._kill(process)
+                process.wait()
+            # Çıktı borusunu açık tutan torunlar da süre dolunca sonlandırılır
+            for reader in readers:
+                reader.join(max(0, timeout - (time.monotonic() - started)))
+            if any(reader.is_alive() for reader in readers):
+                self._kill(process)
+                for reader in readers:
+                    reader.join()
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+        encoding = locale.getpreferredencoding(False)
+        stdout, stderr = (bytes(buffer).decode(encoding, errors="replace") for buffer in buffers)
+        if overflow.is_set():
+            status = "error"
+            output = self.limit_output(stdout + stderr) + "\n... (çıktı sınırı aşıldı, süreç sonlandırıldı)"
+        elif timed_out or (process.returncode != 0 and time.monotonic() >= deadline):
+            # Blok süresi doldu ya da toplam süre dolunca kill_all ile sonlandırıldı
+            status = "timeout"
+            output = self.limit_output(stdout + stderr)
+        else:
+            status = "ok" if process.returncode == 0 else "error"
+            output = self.limit_output(stdout if process.returncode == 0 else (stderr or stdout))
+
+        return CodeBlockResult(index, lang, status, process.returncode,
+                               output, round(time.monotonic() - started, 3))
+
+    def _run_forked(self, index, lang, code, timeout) -> CodeBlockResult:
+        started = time.monotonic()
+        # Sunucu bayt sınırı uygular; karakter sınırı aşıldığını görebilmek için biraz fazlası istenir
+        reply = self.python_runner.run(code, timeout, os.getcwd(), self.max_output_chars * 4 + 4)
+        if reply["timed_out"]:
+            status = "timeout"
+            output = reply["stdout"] + reply["stderr"]
+        else:
+            status = "ok" if reply["exit_code"] == 0 else "error"
+            output = reply["stdout"] if reply["exit_code"] == 0 else (reply["stderr"] or reply["stdout"])
+        return CodeBlockResult(index, lang, status, reply["exit_code"],
+                               self.limit_output(output), round(time.monotonic() - started, 3))
+
+    def limit_output(self, output: str) -> str:
+        if len(output) <= self.max_output_chars:
+            return output
+        return output[:self.max_output_chars] + f"\n... ({len(output) - self.max_output_chars} karakter kısaltıldı)"
+
+    def kill_all(self):
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            self._kill(process)
+
+    @staticmethod
+    def _kill(process):
+        try:
+            if os.name != 'nt':
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except OSError:
+            pass
+
+    @staticmethod
+    def format_results(results: List[CodeBlockResult]) -> str:
+        """[CODE EXECUTION] bölümü için okunabilir rapor"""
+        if not results:
+            return "Çalıştırılabilir kod bulunamadı"
+
+        lines = []
+        for r in results:
+            header = f"#{r.index + 1} {r.language}"
+            if r.status == "denied":
+                lines.append(f"❌ {header}: dil otomatik çalıştırma için izinli değil")
+            elif r.status == "unsupported":
+                lines.append(f"❓ {header}: dil için executor bulunamadı")
+            elif r.status == "timeout":
+                lines.append(f"⏱️ {header} ({r.wall_time:.2f}s): zaman aşımı\n{r.output}".rstrip())
+            else:
+                icon = "✅" if r.status == "ok" else "❌"
+                output = r.output or ("Kod başarıyla çalıştırıldı" if r.status == "ok" else "")
+                lines.append(f"{icon} {header} ({r.wall_time:.2f}s, çıkış kodu {r.exit_code}): {output}".rstrip())
+        return "\n".join(lines)
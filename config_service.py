@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Canlı Yeniden Yüklenen Ayar Servisi
+config.json'u izler (Linux'ta ctypes ile inotify, diğer platformlarda mtime yoklaması),
+değişiklikte dosyayı okuyup varsayılanlara göre doğrular ve değiştirilemez bir anlık
+görüntüye (ConfigSnapshot) dönüştürür. Anlık görüntü tek atamayla değiştirilir; aboneler
+(ör. scheduler) eski/yeni görüntü ve değişen anahtarlarla bilgilendirilir.
+
+Geçersiz değerler varsayılanla değiştirilir ve errors listesine yazılır; dosya hiç
+okunamıyorsa (ör. yarım düzenleme) önceki görüntü korunur.
+"""
+
+import copy
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+class ConfigSnapshot(Mapping):
+    """Doğrulanmış, değiştirilemez ayar görüntüsü; hem config["x"] hem config.x ile okunur"""
+
+    __slots__ = ("_data", "version", "errors")
+
+    def __init__(self, data: Dict[str, Any], version: int = 0, errors: Optional[List[str]] = None):
+        object.__setattr__(self, "_data", MappingProxyType({k: _freeze(v) for k, v in data.items()}))
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "errors", tuple(errors or ()))
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot değiştirilemez; ConfigService.update kullanın")
+
+    def copy(self) -> Dict[str, Any]:
+        """Düzenlenebilir düz sözlük kopyası (save_config'e geri verilmek üzere)"""
+        return _thaw(self._data)
+
+    to_dict = copy
+
+
+def coerce(value: Any, default: Any) -> Any:
+    """Değeri varsayılanın tipine göre doğrular; uymuyorsa ValueError"""
+    if default is None:
+        return value
+    if isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        raise ValueError("bool bekleniyor")
+    if isinstance(default, int):
+        if isinstance(value, bool):
+            raise ValueError("tam sayı bekleniyor")
+        if isinstance(value, int):
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            return int(value)
+        raise ValueError("tam sayı bekleniyor")
+    if isinstance(default, float):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        raise ValueError("sayı bekleniyor")
+    if isinstance(default, str):
+        if isinstance(value, str):
+            return value
+        raise ValueError("metin bekleniyor")
+    if isinstance(default, list):
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        raise ValueError("liste bekleniyor")
+    if isinstance(default, dict):
+        if isinstance(value, Mapping):
+            return dict(value)
+        raise ValueError("sözlük bekleniyor")
+    return value
+
+
+class _Inotify:
+    """ctypes üzerinden minimal inotify sarmalayıcı (yalnızca Linux)"""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 başarısız")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        # Atomik yazımlar dosyayı yeniden adlandırarak değiştirdiği için dizin izlenir
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch başarısız")
+
+    def wait(self, timeout: float) -> List[str]:
+        """Olay gelene kadar bekler; değişen dosya adlarını döndürür"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + 16 <= len(data):
+            _, _, _, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+            names.append(os.fsdecode(name))
+            offset += 16 + length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigService:
+    """config.json'u izleyen, doğrulayan ve abonelere yayınlayan servis"""
+
+    def __init__(self, path: str, defaults: Dict[str, Any],
+                 loader: Callable[[], Any], saver: Callable[[Dict[str, Any]], None],
+                 validators: Optional[Dict[str, Callable[[Any], bool]]] = None,
+                 exists: Optional[Callable[[], bool]] = None, poll_interval: float = 1.0):
+        self.path = path
+        self.defaults = defaults
+        self.validators = validators or {}
+        self.poll_interval = poll_interval
+        self._loader = loader
+        self._saver = saver
+        self._exists = exists or (lambda: os.path.exists(self.path))
+        self._subscribers: List[Callable] = []
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._file_state = None
+        self.watch_mode = None
+        self.stats = {"reloads": 0, "rejected": 0, "notifications": 0}
+        self.snapshot = ConfigSnapshot(dict(defaults))
+
+    # ------------------------------------------------------------------
+    # Doğrulama ve yükleme
+    # ------------------------------------------------------------------
+
+    def validate(self, raw: Dict[str, Any]) -> ConfigSnapshot:
+        data = {}
+        errors = []
+        for key, value in raw.items():
+            default = self.defaults.get(key)
+            try:
+                value = coerce(value, default)
+                validator = self.validators.get(key)
+                if validator is not None and not validator(value):
+                    raise ValueError("geçersiz değer")
+            except ValueError as e:
+                errors.append(f"{key}: {str(e)} ({value!r}), varsayılan kullanılıyor")
+                value = copy.deepcopy(default)
+            data[key] = value
+        for key, default in self.defaults.items():
+            data.setdefault(key, copy.deepcopy(default))
+        return ConfigSnapshot(data, self.snapshot.version + 1, errors)
+
+    def load(self) -> ConfigSnapshot:
+        """İlk yükleme; kayıt yoksa varsayılanları yazar"""
+        raw = self._loader()
+        if not isinstance(raw, dict):
+            # Bozuk kayıt varsayılanlarla ezilmez, yalnızca hiç kayıt yoksa yazılır
+            if not self._exists():
+                self._saver(copy.deepcopy(self.defaults))
+            raw = {}
+        with self._lock:
+            self.snapshot = self.validate(raw)
+            self._file_state = self._stat()
+        for error in self.snapshot.errors:
+            print(f"Ayar hatası: {error}")
+        return self.snapshot
+
+    def reload(self) -> bool:
+        """Dosyayı yeniden okur; içerik değiştiyse görüntüyü değiştirip abonelere bildirir"""
+        raw = self._loader()
+        if not isinstance(raw, dict):
+            # Yarım düzenleme veya bozuk dosya: mevcut görüntü korunur
+            with self._lock:
+                self.stats["rejected"] += 1
+            return False
+        return self._swap(self.validate(raw))
+
+    def update(self, values: Dict[str, Any], persist: bool = True) -> ConfigSnapshot:
+        """Yeni ayarları doğrular, (isteğe bağlı) kaydeder ve yayınlar"""
+        with self._lock:
+            merged = self.snapshot.copy()
+            merged.update(values)
+            snapshot = self.validate(merged)
+            if persist:
+                self._saver(snapshot.copy())
+                self._file_state = self._stat()
+        self._swap(snapshot)
+        return self.snapshot
+
+    def _swap(self, snapshot: ConfigSnapshot) -> bool:
+        with self._lock:
+            old = self.snapshot
+            changed = {key for key in set(old) | set(snapshot) if old.get(key) != snapshot.get(key)}
+            if not changed:
+                return False
+            self.snapshot = snapshot
+            self.stats["reloads"] += 1
+            subscribers = list(self._subscribers)
+
+        for error in snapshot.errors:
+            print(f"Ayar hatası: {error}")
+        for callback in subscribers:
+            try:
+                callback(old, snapshot, changed)
+                with self._lock:
+                    self.stats["notifications"] += 1
+            except Exception as e:
+                print(f"Ayar abonesi hatası: {str(e)}")
+        return True
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot, ConfigSnapshot, set], None]):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    # ------------------------------------------------------------------
+    # İzleme
+    # ------------------------------------------------------------------
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._watch, name="config-watcher", daemon=True)
+        self._thread.start()
+        self._ready.wait(1.0)
+
+    def stop(self):
+        self._stopped.set()
+
+    def _watch(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        name = os.path.basename(self.path)
+        inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                inotify = _Inotify(directory)
+            except (OSError, AttributeError) as e:
+                print(f"inotify kullanılamadı, mtime yoklamasına geçiliyor: {str(e)}")
+        self.watch_mode = "inotify" if inotify else "mtime"
+        # Yükleme ile izlemenin başlaması arasındaki değişiklikler kaçırılmasın
+        self._check_file()
+        self._ready.set()
+
+        try:
+            while not self._stopped.is_set():
+                if inotify is not None:
+                    if name not in inotify.wait(self.poll_interval):
+                        continue
+                    # Düzenleyicilerin art arda olaylarını tek yeniden yüklemeye indir
+                    time.sleep(0.05)
+                    inotify.wait(0)
+                else:
+                    self._stopped.wait(self.poll_interval)
+                self._check_file()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _check_file(self):
+        state = self._stat()
+        with self._lock:
+            if state is None or state == self._file_state:
+                return
+            self._file_state = state
+        self.reload()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, watch_mode=self.watch_mode, version=self.snapshot.version,
+                        errors=list(self.snapshot.errors))
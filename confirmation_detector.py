@@ -6,8 +6,9 @@ from tkinter import messagebox, ttk
 import win32gui
 import win32con
 import datetime
-import json
 import os
+from event_log import get_event_log
+from pattern_engine import get_pattern_engine, group_by_topic
 
 class ConfirmationDetector:
     def __init__(self, main_monitor):
@@ -44,6 +45,12 @@ class ConfirmationDetector:
             r'(?i)available.*at.*(\d{1,2}:\d{2})',
         ]
         
+        # Desenler ortak motorda bir kez derlenir; process_text üç türü tek taramada bulur
+        self.pattern_engine = get_pattern_engine()
+        self.pattern_engine.register_group('confirmation', self.confirmation_patterns, re.MULTILINE | re.DOTALL)
+        self.pattern_engine.register_group('limit_warning', self.limit_patterns, re.MULTILINE | re.DOTALL)
+        self.pattern_engine.register_group('time_info', self.time_patterns, re.MULTILINE | re.DOTALL)
+        
         self.create_confirmation_ui()
     
     def create_confirmation_ui(self):
@@ -117,83 +124,76 @@ class ConfirmationDetector:
         except Exception as e:
             print(f"Focus error: {e}")
     
-    def detect_confirmations(self, text, session_id, window_info):
+    def detect_confirmations(self, text, session_id, window_info, matches=None):
         """Text'te onay soruları tespit et"""
         confirmations = []
         
-        for pattern in self.confirmation_patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
-            for match in matches:
-                # Onay sorusunun etrafındaki bağlamı al
-                start_pos = max(0, match.start() - 200)
-                end_pos = min(len(text), match.end() + 200)
-                context = text[start_pos:end_pos].strip()
-                
-                confirmation = {
-                    'type': 'confirmation',
-                    'content': context,
-                    'session_id': session_id,
-                    'window_info': window_info,
-                    'timestamp': datetime.datetime.now().isoformat(),
-                    'pattern_matched': pattern
-                }
-                confirmations.append(confirmation)
+        if matches is None:
+            matches = self.pattern_engine.scan(text, ('confirmation',))
+        for match in matches:
+            # Onay sorusunun etrafındaki bağlamı al
+            confirmation = {
+                'type': 'confirmation',
+                'content': match.context(200),
+                'session_id': session_id,
+                'window_info': window_info,
+                'timestamp': datetime.datetime.now().isoformat(),
+                'pattern_matched': match.pattern
+            }
+            confirmations.append(confirmation)
         
         return confirmations
     
-    def detect_limit_warnings(self, text, session_id, window_info):
+    def detect_limit_warnings(self, text, session_id, window_info, matches=None):
         """Limit uyarılarını tespit et"""
         warnings = []
         
-        for pattern in self.limit_patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
-            for match in matches:
-                start_pos = max(0, match.start() - 100)
-                end_pos = min(len(text), match.end() + 100)
-                context = text[start_pos:end_pos].strip()
-                
-                warning = {
-                    'type': 'limit_warning',
-                    'content': context,
-                    'session_id': session_id,
-                    'window_info': window_info,
-                    'timestamp': datetime.datetime.now().isoformat(),
-                    'severity': 'high'
-                }
-                warnings.append(warning)
+        if matches is None:
+            matches = self.pattern_engine.scan(text, ('limit_warning',))
+        for match in matches:
+            warning = {
+                'type': 'limit_warning',
+                'content': match.context(100),
+                'session_id': session_id,
+                'window_info': window_info,
+                'timestamp': datetime.datetime.now().isoformat(),
+                'severity': 'high'
+            }
+            warnings.append(warning)
         
         return warnings
     
-    def detect_time_info(self, text, session_id, window_info):
+    def detect_time_info(self, text, session_id, window_info, matches=None):
         """Zaman bilgilerini tespit et"""
         time_infos = []
         
-        for pattern in self.time_patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
-            for match in matches:
-                time_str = match.group(1) if match.groups() else match.group(0)
-                start_pos = max(0, match.start() - 100)
-                end_pos = min(len(text), match.end() + 100)
-                context = text[start_pos:end_pos].strip()
-                
-                time_info = {
-                    'type': 'time_info',
-                    'content': context,
-                    'time_value': time_str,
-                    'session_id': session_id,
-                    'window_info': window_info,
-                    'timestamp': datetime.datetime.now().isoformat()
-                }
-                time_infos.append(time_info)
+        if matches is None:
+            matches = self.pattern_engine.scan(text, ('time_info',))
+        for match in matches:
+            time_str = match.group(1) if match.match.groups() else match.group(0)
+            time_info = {
+                'type': 'time_info',
+                'content': match.context(100),
+                'time_value': time_str,
+                'session_id': session_id,
+                'window_info': window_info,
+                'timestamp': datetime.datetime.now().isoformat()
+            }
+            time_infos.append(time_info)
         
         return time_infos
     
     def process_text(self, text, session_id, window_info):
         """Text'i tüm pattern'ler için işle"""
+        # Üç dedektör türü tek taramada
+        matches = group_by_topic(self.pattern_engine.scan(text, ('confirmation', 'limit_warning', 'time_info')))
         results = {
-            'confirmations': self.detect_confirmations(text, session_id, window_info),
-            'limit_warnings': self.detect_limit_warnings(text, session_id, window_info),
-            'time_infos': self.detect_time_info(text, session_id, window_info)
+            'confirmations': self.detect_confirmations(text, session_id, window_info,
+                                                       matches.get('confirmation', [])),
+            'limit_warnings': self.detect_limit_warnings(text, session_id, window_info,
+                                                         matches.get('limit_warning', [])),
+            'time_infos': self.detect_time_info(text, session_id, window_info,
+                                                matches.get('time_info', []))
         }
         
         # Onay sorularını göster
@@ -259,13 +259,8 @@ class ConfirmationDetector:
         
         self.confirmation_history.append(log_entry)
         
-        # Dosyaya kaydet
-        log_file = f"claude_session_data/confirmations_{datetime.datetime.now().strftime('%Y%m%d')}.json"
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            json.dump(log_entry, f, ensure_ascii=False)
-            f.write('\n')
+        # Olay günlüğüne kaydet
+        get_event_log().append("confirmation", log_entry)
 
 class AutoResponseSystem:
     def __init__(self, confirmation_detector):
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Otomatik Yanıt Konuşma Motoru
+Claude bir seçim beklediğinde, seçimi aynı CLI konuşmasına (--resume) gönderir.
+Oturum kimliği bilinmiyorsa adımlar devam bayrağı olmadan gönderilir; --continue
+cwd'deki en son konuşmaya (başka bir prompt'a ait olabilir) bağlandığı için kullanılmaz. Zincir, adım sayısı ve toplam süre bütçesiyle sınırlandırılır.
+"""
+
+import subprocess
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class AutoResponseConversation:
+    """Otomatik yanıt adımlarını özyineleme yerine döngüyle, tek konuşma içinde yürütür"""
+
+    def __init__(self, run_prompt: Callable, analyze: Callable[[str], Dict[str, Any]],
+                 choose: Callable[[Dict[str, Any]], Optional[str]], max_hops: int = 5,
+                 time_budget: float = 120, hop_timeout: float = 60):
+        # run_prompt(prompt, timeout, resume) -> subprocess.CompletedProcess
+        # resume: oturum kimliği (str) veya oturum bilinmiyorsa None
+        self.run_prompt = run_prompt
+        self.analyze = analyze
+        self.choose = choose
+        self.max_hops = max(0, int(max_hops))
+        self.time_budget = time_budget
+        self.hop_timeout = hop_timeout
+
+    def run(self, analysis: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
+        """İlk yanıtın analizinden başlayarak otomatik yanıt zincirini çalıştırır"""
+        started = time.monotonic()
+        hops = []
+        stopped_reason = "completed"
+        choice = self.choose(analysis)
+
+        while choice:
+            if len(hops) >= self.max_hops:
+                stopped_reason = "max_hops"
+                break
+
+            remaining = self.time_budget - (time.monotonic() - started)
+            if remaining <= 0:
+                stopped_reason = "time_budget"
+                break
+
+            hop_started = time.monotonic()
+            hop = {"prompt": choice, "success": False, "response": "", "analysis": None}
+            try:
+                result = self.run_prompt(choice, min(self.hop_timeout, remaining), session_id)
+            except subprocess.TimeoutExpired:
+                hop["response"] = "Claude komutu zaman aşımına uğradı"
+                result = None
+            except Exception as e:
+                hop["response"] = f"Hata: {str(e)}"
+                result = None
+            hop["latency"] = round(time.monotonic() - hop_started, 3)
+            hops.append(hop)
+
+            if result is None or result.returncode != 0:
+                if result is not None:
+                    hop["response"] = result.stderr
+                stopped_reason = "error"
+                break
+
+            session_id = getattr(result, "session_id", None) or session_id
+            hop["success"] = True
+            hop["response"] = result.stdout
+            hop["analysis"] = self.analyze(result.stdout)
+            choice = self.choose(hop["analysis"])
+
+        return {
+            "hops": hops,
+            "session_id": session_id,
+            "stopped_reason": stopped_reason,
+            "total_time": round(time.monotonic() - started, 3),
+        }
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Çökmeye Dayanıklı Dosya Yazma
+Dosyalar yerinde ('w' ile) yazılmaz: içerik aynı dizindeki geçici dosyaya yazılır ve
+os.replace ile hedefin yerine konur. Böylece yazma sırasında çökme olursa eski dosya
+bozulmadan kalır.
+
+fsync politikası:
+  "always" -> her yazım kendi fsync'ini yapar
+  "batch"  -> group_commit() bloğundaki yazımlar tek fsync turunda diske indirilir
+              (blok dışındaki tekil yazımlar "always" gibi davranır)
+  "never"  -> fsync yapılmaz, yalnızca atomik değiştirme
+"""
+
+import itertools
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any
+
+FSYNC_POLICIES = ("always", "batch", "never")
+
+_policy = "batch"
+_temp_ids = itertools.count(1)
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {"writes": 0, "fsync_cycles": 0, "fsyncs": 0}
+
+
+def set_fsync_policy(policy: str):
+    global _policy
+    if policy not in FSYNC_POLICIES:
+        print(f"Geçersiz fsync politikası: {policy} (always, batch, never)")
+        return
+    _policy = policy
+
+
+def get_fsync_policy() -> str:
+    return _policy
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats, policy=_policy)
+
+
+def _fsync_dir(directory: str):
+    # Yeniden adlandırmanın kalıcı olması için dizin girdisi de diske indirilir (POSIX)
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _commit(pending: list, sync: bool):
+    """Geçici dosyaları (isteğe bağlı tek fsync turuyla) hedeflerinin yerine koyar"""
+    try:
+        if sync:
+            for _, temp in pending:
+                os.fsync(temp.fileno())
+    finally:
+        for _, temp in pending:
+            temp.close()
+
+    directories = set()
+    for path, temp in pending:
+        os.replace(temp.name, path)
+        directories.add(os.path.dirname(os.path.abspath(path)))
+
+    if sync:
+        for directory in directories:
+            _fsync_dir(directory)
+    with _stats_lock:
+        _stats["writes"] += len(pending)
+        if sync:
+            _stats["fsync_cycles"] += 1
+            _stats["fsyncs"] += len(pending) + len(directories)
+
+
+@contextmanager
+def group_commit():
+    """Bloktaki atomik yazımları sonunda tek fsync turuyla kalıcı hale getirir"""
+    if getattr(_local, "pending", None) is not None:
+        # İç içe blok: dıştaki blok commit eder
+        yield
+        return
+
+    _local.pending = {}
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        if pending:
+            _commit(list(pending.values()), _policy != "never")
+
+
+def atomic_write_text(path: str, text: str, encoding: str = 'utf-8', deferrable: bool = True):
+    """Metni geçici dosya + yeniden adlandırma ile yazar
+
+    deferrable=False: group_commit içinde bile hemen commit edilir (ardından başka bir
+    dosyanın değiştirilmesi bu yazımın kalıcı olmasına bağlıysa)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = f"{path}.tmp.{os.getpid()}.{next(_temp_ids)}"
+    temp = open(temp_path, 'w', encoding=encoding)
+    try:
+        temp.write(text)
+        temp.flush()
+    except BaseException:
+        temp.close()
+        os.unlink(temp_path)
+        raise
+
+    pending = getattr(_local, "pending", None)
+    if pending is not None and deferrable and _policy == "batch":
+        previous = pending.pop(path, None)
+        if previous is not None:
+            # Aynı dosya blokta tekrar yazıldı: sadece son hali commit edilir
+            previous[1].close()
+            os.unlink(previous[1].name)
+        pending[path] = (path, temp)
+        return
+
+    _commit([(path, temp)], _policy != "never")
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 2):
+    """JSON verisini atomik olarak yazar (mevcut dosya biçimiyle aynı: indent=2, ensure_ascii=False)"""
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Segmentli Olay Günlüğü
+Onay soruları, limit uyarıları, zamanlı çalıştırmalar, prompt günlüğü ve token kullanımı
+ayrı ayrı günlük JSONL dosyaları yerine tek bir günlükte tutulur. Her kayıt bir olay
+tipiyle ("event" alanı) yazılır ve tipin zorunlu alanları denetlenir.
+
+  - Açık tutulan dosya tanıtıcısına ekleme (her olayda dosya yeniden açılmaz)
+  - Boyut veya süre dolunca yeni segmente geçiş
+  - Her segment için seyrek zaman indeksi (.idx): her index_interval kayıtta bir
+    [o ana kadarki en büyük zaman damgası, bayt ofseti] satırı
+  - segments.json: segment başına ilk/son zaman, tip ve session sayıları
+  - Segment biçimi codec ile seçilir (.jsonl veya sıkı ikili .bin, bkz. record_codec);
+    her segment kendi uzantısına göre okunduğundan biçim değişince eskiler okunur kalır
+
+Aralık sorgusu ("geçen haftaki X session'ının limit uyarıları") önce manifestten ilgisiz
+segmentleri eler, sonra seyrek indeksten başlangıç ofsetine atlayıp oradan okur.
+
+Dizin düzeni:
+  claude_session_data/events/seg_20240101_120000_000000.jsonl   (veya .bin)
+  claude_session_data/events/seg_20240101_120000_000000.idx
+  claude_session_data/events/seg_20240101_120000_000000.jsonl.lines  (recent() satır tablosu)
+  claude_session_data/events/segments.json
+  claude_session_data/events/retired.json    (saklama servisinin kaldırdığı segmentler)
+"""
+
+import atexit
+import bisect
+import datetime
+import glob
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import durable_io
+from durable_io import atomic_write_json
+from jsonl_reader import tail_files
+from record_codec import codec_for_path, get_codec
+
+# Olay tipi -> zorunlu alanlar (timestamp her tipte zorunludur)
+EVENT_TYPES = {
+    "confirmation": ("session_id", "message", "status"),
+    "limit_warning": ("session_id", "type", "message"),
+    "scheduled_execution": ("schedule_id", "prompt", "success"),
+    "prompt": ("session_id", "type", "content"),
+    "token_usage": ("session_id", "message_type", "estimated_tokens"),
+}
+
+# Eski günlük dosyaları (data_dir'e göre glob deseni) -> olay tipi
+LEGACY_PATTERNS = {
+    "confirmations_*.json": "confirmation",
+    "limit_warnings_*.json": "limit_warning",
+    "scheduled_executions_*.json": "scheduled_execution",
+    "logs/prompts_*.json": "prompt",
+    "tokens/token_usage_*.json": "token_usage",
+}
+
+SEGMENT_PATTERN = re.compile(r"^seg_\d{8}_\d{6}_\d{6}(?:_\d+)?\.(?:jsonl|bin)$")
+
+
+def _as_text(value) -> Optional[str]:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _parse_timestamp(value) -> Optional[datetime.datetime]:
+    """ISO zaman damgasını çözer; çözülemeyen değerler için None"""
+    try:
+        return datetime.datetime.fromisoformat(_as_text(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class EventLog:
+    """Tipli kayıtlar, segment rotasyonu ve seyrek zaman indeksiyle olay günlüğü"""
+
+    def __init__(self, directory: str = "claude_session_data/events",
+                 segment_max_bytes: int = 8 * 1024 * 1024, segment_max_hours: float = 24,
+                 index_interval: int = 64, codec: str = "jsonl"):
+        self.directory = directory
+        # Yeni segmentlerin biçimi; okuma her segmentte uzantıdan seçilir
+        self.codec = get_codec(codec)
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age = datetime.timedelta(hours=segment_max_hours)
+        self.index_interval = max(1, index_interval)
+        self.manifest_file = os.path.join(directory, "segments.json")
+        self.retired_file = os.path.join(directory, "retired.json")
+
+        self._lock = threading.RLock()
+        self._active = None         # aktif segment adı
+        self._active_started = None
+        self._handle = None
+        self._index_handle = None
+        self._encoder = None
+        self._since_index = 0
+        self._indexes: Dict[str, List[Tuple[str, int]]] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self.retired = self._load_retired()
+        self._recover()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Manifest ve kurtarma
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Olay günlüğü manifesti okunamadı, segmentler yeniden taranacak: {str(e)}")
+        return {}
+
+    def _load_retired(self) -> Dict[str, str]:
+        if os.path.exists(self.retired_file):
+            try:
+                with open(self.retired_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Kaldırılan segment listesi okunamadı: {str(e)}")
+        return {}
+
+    def _path(self, segment: str) -> str:
+        return os.path.join(self.directory, segment)
+
+    def _index_path(self, segment: str) -> str:
+        return self._path(os.path.splitext(segment)[0] + ".idx")
+
+    def segment_files(self, segment: str) -> List[str]:
+        """Segment ve yan dosyaları (.idx seyrek indeks, .lines satır tablosu)"""
+        return [self._path(segment), self._index_path(segment), self._path(segment) + ".lines"]
+
+    def segments(self) -> List[str]:
+        """Segment adları (eskiden yeniye)"""
+        with self._lock:
+            names = [name for name in os.listdir(self.directory) if SEGMENT_PATTERN.match(name)]
+        # Ad, segmentin açıldığı (aktarılan segmentlerde ilk kaydın) zamanıdır
+        return sorted(names)
+
+    def _recover(self):
+        """Manifestte olmayan veya boyutu uyuşmayan segmentlerin (ör. çökme) özetini ve indeksini yeniden kurar"""
+        changed = False
+        for segment in self.segments():
+            size = os.path.getsize(self._path(segment))
+            if self.manifest.get(segment, {}).get("bytes") == size:
+                continue
+            self.manifest[segment] = self._scan_segment(segment)
+            changed = True
+        for segment in list(self.manifest):
+            if not os.path.exists(self._path(segment)):
+                del self.manifest[segment]
+                changed = True
+        if changed:
+            self._write_manifest()
+
+    def _scan_segment(self, segment: str) -> Dict[str, Any]:
+        codec = codec_for_path(segment)
+        summary = self._new_summary()
+        index = []
+        size = os.path.getsize(self._path(segment))
+        position = len(codec.header) if size >= len(codec.header) else 0
+        with open(self._path(segment), 'rb') as f:
+            for count, (record, end) in enumerate(codec.iter_records(f)):
+                if count % self.index_interval == 0:
+                    index.append((summary["last"] or "", position))
+                self._summarize(summary, record)
+                position = end
+        summary["bytes"] = position
+        if size > position:
+            # Çökmeden kalan yarım son kayıt kesilir; sonraki eklemeler temiz sınırdan başlar
+            os.truncate(self._path(segment), position)
+        with open(self._index_path(segment), 'w', encoding='utf-8') as f:
+            for point in index:
+                f.write(json.dumps(point) + "\n")
+        self._indexes[segment] = index
+        return summary
+
+    @staticmethod
+    def _new_summary() -> Dict[str, Any]:
+        return {"first": None, "last": None, "count": 0, "bytes": 0, "types": {}, "sessions": {}}
+
+    @staticmethod
+    def _summarize(summary: Dict[str, Any], record: Dict[str, Any]):
+        timestamp = record.get("timestamp") or ""
+        if summary["first"] is None or timestamp < summary["first"]:
+            summary["first"] = timestamp
+        if summary["last"] is None or timestamp > summary["last"]:
+            summary["last"] = timestamp
+        summary["count"] += 1
+        event = record.get("event")
+        summary["types"][event] = summary["types"].get(event, 0) + 1
+        session_id = record.get("session_id")
+        if session_id is not None:
+            summary["sessions"][str(session_id)] = summary["sessions"].get(str(session_id), 0) + 1
+
+    def _write_manifest(self):
+        with self._lock:
+            atomic_write_json(self.manifest_file, self.manifest)
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def validate(event_type: str, record: Dict[str, Any]):
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Bilinmeyen olay tipi: {event_type}")
+        missing = [field for field in ("timestamp",) + EVENT_TYPES[event_type] if field not in record]
+        if missing:
+            raise ValueError(f"{event_type} kaydında eksik alanlar: {', '.join(missing)}")
+
+    def _open_segment(self, now: datetime.datetime):
+        stamp = now.strftime('%Y%m%d_%H%M%S_%f')
+        name = f"seg_{stamp}{self.codec.extension}"
+        suffix = 1
+        while os.path.exists(self._path(name)):
+            name = f"seg_{stamp}_{suffix}{self.codec.extension}"
+            suffix += 1
+        self._active = name
+        self._active_started = now
+        self._handle = open(self._path(name), 'ab')
+        self._handle.write(self.codec.header)
+        self._index_handle = open(self._index_path(name), 'a', encoding='utf-8')
+        self._encoder = self.codec.encoder()
+        self._since_index = 0
+        self._indexes[name] = []
+        self.manifest[name] = self._new_summary()
+        self.manifest[name]["bytes"] = len(self.codec.header)
+
+    def _resume_segment(self, now: datetime.datetime) -> bool:
+        """Yeniden başlatmada dolmamış son segmente eklemeye devam eder"""
+        segments = self.segments()
+        if not segments:
+            return False
+        name = segments[-1]
+        summary = self.manifest.get(name)
+        started = datetime.datetime.strptime(name[4:26], "%Y%m%d_%H%M%S_%f")
+        if summary is None or summary["bytes"] >= self.segment_max_bytes or now - started >= self.segment_max_age:
+            return False
+        if codec_for_path(name) is not self.codec or summary["bytes"] < len(self.codec.header):
+            # Biçim değiştirildi: eski segmente devam edilmez
+            return False
+        self._indexes[name] = self._index(name)
+        self._active = name
+        self._active_started = started
+        self._handle = open(self._path(name), 'ab')
+        self._index_handle = open(self._index_path(name), 'a', encoding='utf-8')
+        # İkili biçimde metin/şekil tabloları dosyadan yeniden kurulur
+        self._encoder = self.codec.encoder(self._path(name))
+        self._since_index = summary["count"] % self.index_interval
+        return True
+
+    def _seal_active(self):
+        if self._handle is None:
+            return
+        self._handle.flush()
+        self._index_handle.flush()
+        if durable_io.get_fsync_policy() != "never":
+            os.fsync(self._handle.fileno())
+            os.fsync(self._index_handle.fileno())
+        self._handle.close()
+        self._index_handle.close()
+        self._handle = None
+        self._index_handle = None
+        self._encoder = None
+        self._active = None
+        self._write_manifest()
+
+    def append(self, event_type: str, record: Dict[str, Any]) -> Tuple[str, int]:
+        """Kaydı aktif segmente ekler; (segment adı, satır sonu ofseti) döndürür"""
+        self.validate(event_type, record)
+        record = dict(record, event=event_type, timestamp=_as_text(record["timestamp"]))
+        now = datetime.datetime.now()
+
+        with self._lock:
+            if self._handle is not None:
+                summary = self.manifest[self._active]
+                if (summary["bytes"] >= self.segment_max_bytes and summary["count"]) \
+                        or now - self._active_started >= self.segment_max_age:
+                    self._seal_active()
+            if self._handle is None and not self._resume_segment(now):
+                self._open_segment(now)
+            # Kodlayıcı segmente bağlıdır (ikili biçimde dosya içi tablolar)
+            line = self._encoder.encode(record)
+
+            summary = self.manifest[self._active]
+            offset = summary["bytes"]
+            if self._since_index == 0:
+                point = (summary["last"] or "", offset)
+                self._indexes.setdefault(self._active, []).append(point)
+                self._index_handle.write(json.dumps(point) + "\n")
+                self._index_handle.flush()
+            self._since_index = (self._since_index + 1) % self.index_interval
+
+            self._handle.write(line)
+            # Okuyucular (sorgu, token yükleyici) satırı hemen görsün
+            self._handle.flush()
+            self._summarize(summary, record)
+            summary["bytes"] = offset + len(line)
+            return self._active, summary["bytes"]
+
+    def import_records(self, event_type: str, records: List[Dict[str, Any]]) -> Optional[str]:
+        """Eski kayıtları ayrı, kapalı bir segment olarak ekler (ör. günlük dosyalardan geçiş)"""
+        valid = [dict(r, event=event_type, timestamp=_as_text(r.get("timestamp")))
+                 for r in records if isinstance(r, dict) and _parse_timestamp(r.get("timestamp"))]
+        if len(valid) < len(records):
+            # Zamanı çözülemeyen kayıtlar aralık sorgularında yer alamaz
+            print(f"Zaman damgası okunamayan {len(records) - len(valid)} eski kayıt atlandı ({event_type})")
+        records = valid
+        if not records:
+            return None
+        records.sort(key=lambda r: r["timestamp"])
+        with self._lock:
+            active = (self._active, self._active_started, self._handle, self._index_handle,
+                      self._encoder, self._since_index)
+            self._handle = None
+            try:
+                self._open_segment(_parse_timestamp(records[0]["timestamp"]))
+                name = self._active
+                summary = self.manifest[name]
+                for count, record in enumerate(records):
+                    line = self._encoder.encode(record)
+                    if count % self.index_interval == 0:
+                        point = (summary["last"] or "", summary["bytes"])
+                        self._indexes[name].append(point)
+                        self._index_handle.write(json.dumps(point) + "\n")
+                    self._handle.write(line)
+                    self._summarize(summary, record)
+                    summary["bytes"] += len(line)
+                self._seal_active()
+            finally:
+                # Hata olsa da canlı aktif segment geri bağlanır
+                (self._active, self._active_started, self._handle, self._index_handle,
+                 self._encoder, self._since_index) = active
+        return name
+
+    def set_codec(self, name: str):
+        """Sonraki segmentlerin biçimini değiştirir; aktif segment eski biçimiyle kapatılır"""
+        codec = get_codec(name)
+        with self._lock:
+            if codec is self.codec:
+                return
+            self.codec = codec
+            self._seal_active()
+
+    def flush(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                self._index_handle.flush()
+
+    def close(self):
+        with self._lock:
+            self._seal_active()
+
+    # ------------------------------------------------------------------
+    # Okuma
+    # ------------------------------------------------------------------
+
+    def _index(self, segment: str) -> List[Tuple[str, int]]:
+        with self._lock:
+            if segment in self._indexes:
+                return list(self._indexes[segment])
+        index = []
+        path = self._index_path(segment)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        timestamp, offset = json.loads(line)
+                        index.append((timestamp, offset))
+                    except (ValueError, TypeError):
+                        break
+        with self._lock:
+            self._indexes.setdefault(segment, index)
+        return index
+
+    def read_segment(self, segment: str, offset: int = 0, end: Optional[int] = None,
+                     event_type: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """offset'ten itibaren tam kayıtları (kayıt, kayıt sonu ofseti) olarak döndürür
+
+        event_type verilirse tipi uymayan kayıtlar çözülmeden atlanır; biçim uzantıdan seçilir."""
+        with open(self._path(segment), 'rb') as f:
+            yield from codec_for_path(segment).iter_records(f, offset, end, event_type)
+
+    def segment_size(self, segment: str) -> int:
+        with self._lock:
+            summary = self.manifest.get(segment)
+            if summary is not None:
+                return summary["bytes"]
+        return os.path.getsize(self._path(segment))
+
+    def query(self, event_type: Optional[str] = None, session_id: Optional[str] = None,
+              since=None, until=None) -> Iterator[Dict[str, Any]]:
+        """Tip, session ve zaman aralığına uyan kayıtları segment sırasıyla döndürür"""
+        since, until = _as_text(since), _as_text(until)
+        self.flush()
+        for segment in self.segments():
+            with self._lock:
+                summary = self.manifest.get(segment)
+                summary = dict(summary) if summary else None
+            if summary is None or not summary["count"]:
+                continue
+            # Manifestten elenen segmentler hiç açılmaz
+            if event_type and not summary["types"].get(event_type):
+                continue
+            if session_id is not None and not summary["sessions"].get(str(session_id)):
+                continue
+            if since and summary["last"] < since:
+                continue
+            if until and summary["first"] > until:
+                continue
+
+            start = 0
+            if since:
+                # Önceki tüm kayıtları since'ten küçük olduğu kesin olan son indeks noktası
+                index = self._index(segment)
+                position = bisect.bisect_left([point[0] for point in index], since)
+                if position > 0:
+                    start = index[position - 1][1]
+            for record, _ in self.read_segment(segment, start, summary["bytes"], event_type):
+                timestamp = record.get("timestamp") or ""
+                if since and timestamp < since:
+                    continue
+                if until and timestamp > until:
+                    continue
+                if event_type and record.get("event") != event_type:
+                    continue
+                if session_id is not None and str(record.get("session_id")) != str(session_id):
+                    continue
+                yield record
+
+    def recent(self, limit: int, event_type: Optional[str] = None,
+               session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Son limit kaydı (eskiden yeniye); segmentler sondan mmap ile okunur, yalnızca dönen kayıtlar çözülür"""
+        self.flush()
+        segments = [segment for segment in self.segments()
+                    if event_type is None or self.manifest.get(segment, {}).get("types", {}).get(event_type)]
+        match = json.dumps({"event": event_type}, ensure_ascii=False)[1:-1].encode('utf-8') if event_type else None
+        predicate = None
+        if session_id is not None or event_type is not None:
+            predicate = lambda r: ((event_type is None or r.get("event") == event_type)
+                                   and (session_id is None or str(r.get("session_id")) == str(session_id)))
+        records = []
+        for segment in reversed(segments):
+            if len(records) >= limit:
+                break
+            wanted = limit - len(records)
+            if codec_for_path(segment).header:
+                # İkili segmentlerde satır tablosu yok: akış halinde çözülür, sondakiler tutulur
+                matches = [record for record, _ in self.read_segment(segment, event_type=event_type)
+                           if predicate is None or predicate(record)]
+                records.extend(reversed(matches[-wanted:]))
+            else:
+                records.extend(reversed(tail_files([self._path(segment)], wanted, match, predicate)))
+        return records[::-1]
+
+    # ------------------------------------------------------------------
+    # Saklama
+    # ------------------------------------------------------------------
+
+    def sealed_segments(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Yazılmayan segmentler ve özetleri (eskiden yeniye); aktif segment dahil edilmez"""
+        with self._lock:
+            return [(segment, dict(self.manifest[segment])) for segment in self.segments()
+                    if segment != self._active and segment in self.manifest]
+
+    def retire_segments(self, segments: List[str]) -> int:
+        """Segmentleri yan dosyalarıyla (.idx, .lines) siler ve manifestten çıkarır; silinen baytı döndürür
+
+        Adlar önce retired.json'a yazılır; token checkpoint'i bu listedeki eksik segmentleri
+        silinmiş veri değil saklama sonucu sayar ve toplamları yeniden taramadan korur."""
+        removed = 0
+        with self._lock:
+            segments = [segment for segment in segments if segment != self._active]
+            if not segments:
+                return 0
+            now = datetime.datetime.now().isoformat()
+            for segment in segments:
+                self.retired[segment] = now
+            atomic_write_json(self.retired_file, self.retired)
+            for segment in segments:
+                for path in self.segment_files(segment):
+                    try:
+                        size = os.path.getsize(path)
+                        os.remove(path)
+                        removed += size
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        print(f"Segment dosyası silinemedi ({path}): {str(e)}")
+                if not os.path.exists(self._path(segment)):
+                    self.manifest.pop(segment, None)
+                    self._indexes.pop(segment, None)
+            self._write_manifest()
+        return removed
+
+    def retired_segments(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.retired)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            summaries = list(self.manifest.values())
+            return {
+                "segments": len(summaries),
+                "events": sum(s["count"] for s in summaries),
+                "bytes": sum(s["bytes"] for s in summaries),
+                "active_segment": self._active,
+            }
+
+
+def migrate_legacy_logs(event_log: EventLog, data_dir: str = "claude_session_data") -> int:
+    """Eski günlük JSONL dosyalarını olay günlüğüne aktarır ve .migrated uzantısıyla saklar"""
+    migrated = 0
+    for pattern, event_type in LEGACY_PATTERNS.items():
+        for path in sorted(glob.glob(os.path.join(data_dir, pattern))):
+            records = []
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            try:
+                                records.append(json.loads(line))
+                            except json.JSONDecodeError:
+                                continue
+                event_log.import_records(event_type, records)
+                os.replace(path, path + ".migrated")
+                migrated += len(records)
+            except (OSError, ValueError) as e:
+                print(f"Eski günlük aktarılamadı ({path}): {str(e)}")
+    return migrated
+
+
+_default_log = None
+_default_codec = "jsonl"
+_default_lock = threading.Lock()
+
+
+def get_event_log() -> EventLog:
+    """Uygulama genelinde paylaşılan olay günlüğü"""
+    global _default_log
+    with _default_lock:
+        if _default_log is None:
+            _default_log = EventLog(codec=_default_codec)
+        return _default_log
+
+
+def set_default_codec(name: str):
+    """Paylaşılan günlüğün yeni segment biçimi (jsonl/binary); günlük açıksa hemen uygulanır"""
+    global _default_codec
+    get_codec(name)
+    with _default_lock:
+        _default_codec = name
+        log = _default_log
+    if log is not None:
+        log.set_codec(name)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+mmap Tabanlı JSONL Okuyucu
+Günlük dosyalarını baştan satır satır json.loads etmek yerine dosyayı mmap ile açar ve
+satır sonu ofset tablosunu bir kez çıkarır. Tablo dosyanın yanında (<dosya>.lines)
+saklanır; dosya büyüdükçe yalnızca yeni eklenen kısım taranır. Böylece son N kaydı
+göstermek için yalnızca o N satır çözülür, geri kalan dosya kopyalanmaz ve okunmaz.
+
+Tablo biçimi: "JSONLIDX" + inode + kapsanan bayt + satır sayısı (little-endian uint64),
+ardından her tam satırın bitiş ofseti (uint64). Yarım kalmış son satır tabloya girmez.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+CACHE_MAGIC = b"JSONLIDX"
+CACHE_HEADER = struct.Struct("<8sQQQ")
+
+
+class JsonlReader:
+    """Tek bir JSONL dosyası üzerinde rastgele erişimli, tersine iterasyonlu okuyucu"""
+
+    def __init__(self, path: str, use_cache: bool = True):
+        self.path = path
+        self.cache_path = path + ".lines"
+        self.use_cache = use_cache
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self._inode = stat.st_ino
+        self.size = stat.st_size
+        # Boş dosya mmap edilemez
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.ends = self._load_offsets()
+
+    # ------------------------------------------------------------------
+    # Ofset tablosu
+    # ------------------------------------------------------------------
+
+    def _read_cache(self) -> Optional[array]:
+        if not self.use_cache or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                magic, inode, covered, count = CACHE_HEADER.unpack(f.read(CACHE_HEADER.size))
+                if magic != CACHE_MAGIC or inode != self._inode or covered > self.size:
+                    return None
+                ends = array('Q')
+                ends.fromfile(f, count)
+        except (OSError, struct.error, EOFError):
+            return None
+        # Dosya değiştirilmiş (kısaltılıp yeniden yazılmış) olabilir: kapsanan son bayt satır sonu olmalı
+        if covered and self._map[covered - 1:covered] != b"\n":
+            return None
+        return ends
+
+    def _write_cache(self, ends: array):
+        covered = ends[-1] if ends else 0
+        temp_path = f"{self.cache_path}.tmp.{os.getpid()}"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, self._inode, covered, len(ends)))
+                ends.tofile(f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            # Tablo yalnızca hızlandırıcıdır; yazılamazsa bir sonraki açılışta yeniden çıkarılır
+            print(f"Satır tablosu yazılamadı ({self.cache_path}): {str(e)}")
+
+    def _load_offsets(self) -> array:
+        ends = self._read_cache()
+        cached = ends is not None
+        if ends is None:
+            ends = array('Q')
+        start = ends[-1] if ends else 0
+        if self._map is not None and start < self.size:
+            find = self._map.find
+            position = find(b"\n", start)
+            while position != -1:
+                ends.append(position + 1)
+                position = find(b"\n", position + 1)
+        if self.use_cache and (not cached or (ends and ends[-1] != start)):
+            self._write_cache(ends)
+        return ends
+
+    # ------------------------------------------------------------------
+    # Okuma
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def span(self, index: int):
+        if index < 0:
+            index += len(self.ends)
+        start = self.ends[index - 1] if index > 0 else 0
+        return start, self.ends[index]
+
+    def record(self, index: int) -> Optional[Dict[str, Any]]:
+        """Yalnızca istenen satırı çözer; bozuk satırda None"""
+        start, end = self.span(index)
+        try:
+            return json.loads(self._map[start:end])
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+
+    def contains(self, index: int, needle: bytes) -> bool:
+        """Satırda bayt dizisi var mı (çözmeden, kopyasız)"""
+        start, end = self.span(index)
+        return self._map.find(needle, start, end) != -1
+
+    def iter_reverse(self, match: Optional[bytes] = None,
+                     predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """Kayıtları en yeniden eskiye çözer; match içermeyen satırlar hiç çözülmez"""
+        for index in range(len(self.ends) - 1, -1, -1):
+            if match is not None and not self.contains(index, match):
+                continue
+            record = self.record(index)
+            if record is None or (predicate is not None and not predicate(record)):
+                continue
+            yield record
+
+    def iter_forward(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        for index in range(start, len(self.ends)):
+            record = self.record(index)
+            if record is not None:
+                yield record
+
+    def tail(self, limit: int, match: Optional[bytes] = None) -> List[Dict[str, Any]]:
+        """Son limit kaydı eskiden yeniye sırayla döndürür"""
+        records = []
+        for record in self.iter_reverse(match):
+            if len(records) >= limit:
+                break
+            records.append(record)
+        return records[::-1]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_reverse_files(paths: Sequence[str], match: Optional[bytes] = None,
+                       predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Dict[str, Any]]:
+    """Eskiden yeniye sıralı dosyaları (ör. günlük segmentleri) sondan başa okur"""
+    for path in reversed(list(paths)):
+        if not os.path.exists(path):
+            continue
+        with JsonlReader(path) as reader:
+            yield from reader.iter_reverse(match, predicate)
+
+
+def tail_files(paths: Sequence[str], limit: int, match: Optional[bytes] = None,
+               predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+    """Birden çok dosyanın son limit kaydı (eskiden yeniye)"""
+    records = []
+    iterator = iter_reverse_files(paths, match, predicate)
+    try:
+        for record in iterator:
+            if len(records) >= limit:
+                break
+            records.append(record)
+    finally:
+        # Erken çıkışta açık mmap'ler hemen kapansın
+        iterator.close()
+    return records[::-1]
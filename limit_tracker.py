@@ -8,6 +8,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import win32api
 import winsound
+from write_behind import get_writer
+from durable_io import atomic_write_json
+from event_log import get_event_log
+from pattern_engine import get_pattern_engine
 
 class LimitTracker:
     def __init__(self, main_monitor):
@@ -24,6 +28,17 @@ class LimitTracker:
         self.alarm_enabled = True
         self.notification_sent = set()
         
+        # Claude'un zaman mesajı pattern'leri
+        self.time_patterns = [
+            r'approaching.*5.*hour.*limit',
+            r'until.*(\d{1,2}:\d{2}).*limit',
+            r'reset.*at.*(\d{1,2}:\d{2})',
+            r'(\d+).*minutes?.*remaining',
+            r'(\d+).*hours?.*remaining'
+        ]
+        self.pattern_engine = get_pattern_engine()
+        self.pattern_engine.register_group('claude_time', self.time_patterns, re.IGNORECASE)
+        
         self.load_usage_data()
         self.create_limit_ui()
         
@@ -224,13 +239,8 @@ class LimitTracker:
         self.save_warning_to_file(warning)
     
     def save_warning_to_file(self, warning):
-        """Uyarıyı dosyaya kaydet"""
-        warnings_file = f"claude_session_data/limit_warnings_{datetime.datetime.now().strftime('%Y%m%d')}.json"
-        os.makedirs(os.path.dirname(warnings_file), exist_ok=True)
-        
-        with open(warnings_file, 'a', encoding='utf-8') as f:
-            json.dump(warning, f, ensure_ascii=False)
-            f.write('\n')
+        """Uyarıyı olay günlüğüne kaydet"""
+        get_event_log().append("limit_warning", warning)
     
     def play_alarm(self):
         """Alarm sesi çal"""
@@ -265,18 +275,13 @@ class LimitTracker:
     
     def parse_claude_time_messages(self, text, session_id):
         """Claude'un zaman mesajlarını parse et"""
-        time_patterns = [
-            r'approaching.*5.*hour.*limit',
-            r'until.*(\d{1,2}:\d{2}).*limit',
-            r'reset.*at.*(\d{1,2}:\d{2})',
-            r'(\d+).*minutes?.*remaining',
-            r'(\d+).*hours?.*remaining'
-        ]
-        
-        for pattern in time_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                self.process_claude_time_info(session_id, pattern, matches[0])
+        processed = set()
+        for match in self.pattern_engine.scan(text, ('claude_time',)):
+            # Her desenin yalnızca ilk eşleşmesi işlenir
+            if match.key in processed:
+                continue
+            processed.add(match.key)
+            self.process_claude_time_info(session_id, match.pattern, match.value)
     
     def process_claude_time_info(self, session_id, pattern, time_info):
         """Claude'dan gelen zaman bilgisini işle"""
@@ -346,7 +351,11 @@ class LimitTracker:
             print(f"Usage data load error: {e}")
     
     def save_usage_data(self):
-        """Kullanım verilerini kaydet"""
+        """Kullanım verilerini kaydedilecek olarak işaretle (yazım arka planda birleştirilir)"""
+        get_writer().mark_dirty(self.write_usage_data)
+    
+    def write_usage_data(self):
+        """Kullanım verilerini diske yaz"""
         usage_file = "claude_session_data/usage_data.json"
         os.makedirs(os.path.dirname(usage_file), exist_ok=True)
         
@@ -358,8 +367,7 @@ class LimitTracker:
                 'last_updated': datetime.datetime.now().isoformat()
             }
             
-            with open(usage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(usage_file, data)
         except Exception as e:
             print(f"Usage data save error: {e}")
     
@@ -11,6 +11,13 @@ from limit_tracker import LimitTracker
 from token_tracker import TokenTracker
 from scheduler_system import ScheduledPromptSystem
 from advanced_scheduler import AdvancedScheduler
+from storage import open_storage
+from write_behind import get_writer
+from backup_engine import IncrementalBackup
+from event_log import get_event_log, migrate_legacy_logs, set_default_codec
+from config_service import ConfigService
+from record_codec import CODECS
+from retention_service import RetentionService
 
 class ClaudeSessionApp:
     def __init__(self):
@@ -30,14 +37,36 @@ class ClaudeSessionApp:
         self.confirmation_detector = ConfirmationDetector(self.base_monitor)
         self.limit_tracker = LimitTracker(self.base_monitor)
         self.token_tracker = TokenTracker(self.base_monitor)
-        self.scheduler_system = ScheduledPromptSystem(self.base_monitor)
-        self.advanced_scheduler = AdvancedScheduler(self.base_monitor)
+        self.storage = open_storage()
+        # Token ve prompt günlükleri config.json'daki event_log_codec biçiminde yazılır;
+        # ayar değiştiğinde aktif segment kapatılıp yeni biçime geçilir
+        self.config_service = ConfigService(
+            "config.json", {"storage_backend": "json", "event_log_codec": "jsonl"},
+            loader=lambda: self.storage.load_document("config"),
+            # config.json'u ClaudeSessionManager yazar; uygulama yalnızca okur
+            saver=lambda config: None,
+            validators={"event_log_codec": lambda v: v in CODECS},
+            exists=lambda: self.storage.has_document("config")
+        )
+        set_default_codec(self.config_service.load()["event_log_codec"])
+        self.config_service.subscribe(self.on_config_changed)
+        if self.config_service.snapshot["storage_backend"] == "json":
+            self.config_service.start()
+        self.scheduler_system = ScheduledPromptSystem(self.base_monitor, storage=self.storage)
+        self.advanced_scheduler = AdvancedScheduler(self.base_monitor, storage=self.storage)
+        self.backup_engine = IncrementalBackup("claude_session_data/backups")
+        self.retention = RetentionService()
         
         # UI bileşenleri
         self.create_main_ui()
         self.create_status_bar()
         self.create_menu_bar()
         
+        # Eski günlük JSONL dosyalarını (ilk açılışta) olay günlüğüne aktar
+        migrated = migrate_legacy_logs(get_event_log())
+        if migrated:
+            self.log_to_live_monitor(f"{migrated:,} eski günlük kaydı olay günlüğüne aktarıldı", "info")
+        
         # Monitoring başlat
         self.start_all_monitoring()
         
@@ -346,6 +375,7 @@ class ClaudeSessionApp:
         self.clipboard_monitor.start_monitoring()
         self.limit_tracker.start_monitoring()
         self.token_tracker.start_monitoring()
+        self.retention.start()
         
         # GUI güncelleme döngüsü
         self.update_gui()
@@ -456,8 +486,10 @@ Aktif Uyarılar: {len([a for a in self.base_monitor.alerts[-10:]])}
         """Otomatik kaydetme ayarla"""
         def auto_save():
             try:
-                self.save_session_data()
-                self.log_to_live_monitor("Veriler otomatik kaydedildi", "success")
+                result = self.save_session_data()
+                if result["kind"] != "none":
+                    kind = "tam yedek" if result["kind"] == "base" else "artımlı yedek"
+                    self.log_to_live_monitor(f"Veriler otomatik kaydedildi ({kind}, {result['bytes']:,} bayt)", "success")
             except Exception as e:
                 self.log_to_live_monitor(f"Otomatik kaydetme hatası: {e}", "error")
         
@@ -469,30 +501,12 @@ Aktif Uyarılar: {len([a for a in self.base_monitor.alerts[-10:]])}
         schedule_auto_save()
     
     def save_session_data(self):
-        """Session verilerini kaydet"""
-        def serialize_datetime(obj):
-            """Datetime objelerini serialize et"""
-            if isinstance(obj, datetime.datetime):
-                return obj.isoformat()
-            elif isinstance(obj, dict):
-                return {k: serialize_datetime(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [serialize_datetime(item) for item in obj]
-            else:
-                return obj
-        
-        data = {
-            'sessions': serialize_datetime(self.base_monitor.sessions),
-            'prompt_logs': serialize_datetime(self.base_monitor.prompt_logs),
-            'alerts': serialize_datetime(self.base_monitor.alerts),
-            'timestamp': datetime.datetime.now().isoformat()
-        }
-        
-        os.makedirs("claude_session_data/backups", exist_ok=True)
-        filename = f"claude_session_data/backups/session_backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """Session verilerini yedekle (tam taban veya yalnızca değişiklikler)"""
+        return self.backup_engine.backup({
+            'sessions': self.base_monitor.sessions,
+            'prompt_logs': self.base_monitor.prompt_logs,
+            'alerts': self.base_monitor.alerts
+        })
     
     # Event handler'lar
     def on_session_select(self, event):
@@ -533,6 +547,13 @@ Uyarı Sayısı: {len(session.get('warnings', []))}"""
         # Placeholder
         ttk.Label(settings_window, text="Ayarlar (Geliştirme aşamasında)").pack(pady=20)
     
+    def on_config_changed(self, old, new, changed):
+        """config.json değişikliklerinden uygulamayı ilgilendirenleri uygular"""
+        if changed & {"event_log_codec"}:
+            set_default_codec(new["event_log_codec"])
+            # İzleyici thread'inden çağrılır; Tk güncellemesi ana döngüye bırakılır
+            self.root.after(0, self.log_to_live_monitor, f"Olay günlüğü biçimi: {new['event_log_codec']}", "info")
+    
     def on_closing(self):
         """Uygulama kapatılırken"""
         try:
@@ -541,6 +562,12 @@ Uyarı Sayısı: {len(session.get('warnings', []))}"""
         except Exception as e:
             print(f"Kapanış hatası: {e}")
         
+        # Bekleyen geciktirmeli yazımları depolama kapanmadan tamamla
+        self.retention.stop()
+        self.config_service.stop()
+        get_writer().flush()
+        get_event_log().close()
+        self.storage.close()
         self.root.destroy()
     
     # Placeholder metodlar
@@ -26,6 +26,7 @@ import os
 import requests
 import threading
 import time
+from durable_io import atomic_write_json, group_commit
 
 class MobileClaudeMonitor:
     def __init__(self):
@@ -65,17 +66,11 @@ class MobileClaudeMonitor:
     def save_data(self):
         """Veri dosyalarını kaydet"""
         try:
-            # Sessions
-            with open(f"{self.data_dir}/sessions.json", 'w', encoding='utf-8') as f:
-                json.dump(self.sessions, f, ensure_ascii=False, indent=2)
-            
-            # Prompts
-            with open(f"{self.data_dir}/prompts.json", 'w', encoding='utf-8') as f:
-                json.dump(self.prompt_logs, f, ensure_ascii=False, indent=2)
-            
-            # Schedules
-            with open(f"{self.data_dir}/schedules.json", 'w', encoding='utf-8') as f:
-                json.dump(self.scheduled_tasks, f, ensure_ascii=False, indent=2)
+            # Üç dosya atomik yazılır ve tek fsync turunda diske indirilir
+            with group_commit():
+                atomic_write_json(f"{self.data_dir}/sessions.json", self.sessions)
+                atomic_write_json(f"{self.data_dir}/prompts.json", self.prompt_logs)
+                atomic_write_json(f"{self.data_dir}/schedules.json", self.scheduled_tasks)
                 
         except Exception as e:
             print(f"Data save error: {e}")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Ortak Desen Tarama Motoru
+Dedektörler (onay soruları, limit uyarıları, zaman bilgisi, token sayıları, prompt/yanıt
+ayrıştırma) desenlerini kendi döngülerinde tek tek re.finditer/re.findall ile çalıştırmak
+yerine bu motora adlandırılmış olarak kaydeder. Motor desenleri bir kez derler ve her
+desenden "en az biri metinde geçmek zorunda" olan anahtar kelime kümesini çıkarır.
+Bütün anahtar kelimeler ortak önekleri paylaşan tek bir büyük/küçük harf duyarsız
+regex'te (anahtar kelime ağacı) toplanır.
+
+Bir metin parçası bu regex ile tek geçişte taranır. Anahtar kelimesi metinde
+geçmeyen desenler hiç çalıştırılmaz; yalnızca adaylar kendi derlenmiş regex'leriyle
+doğrulanır. Sonuç, kayıt sırasına ve konuma göre sıralı PatternMatch listesidir.
+Bir konuya abone olan geri çağrılar, o konu için bulunan eşleşmeleri aynı taramadan alır.
+
+Desenler tek bir alternation'da birleştirilip doğrudan eşleştirilmez: Python regex'i en
+soldaki ilk alternatifi seçip metni tükettiği için çakışan eşleşmeler kaybolur. Mevcut
+".*...*" biçimli DOTALL desenleri de tek başına bütün parçayı yutar. Anahtar kelime ön
+filtresi her desenin kendi finditer sonucunu aynen korur.
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Tek bir desen için anahtar kelime kümesi en fazla bu kadar dizgiye açılır
+MAX_EXPANSION = 16
+
+_REPEATS = tuple(op for op in (getattr(sre_parse, name, None)
+                               for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'))
+                 if op is not None)
+
+
+def _exact(items) -> Optional[set]:
+    """Alt desenin birebir eşleşebileceği sonlu dizgi kümesi; değişken kısım varsa None"""
+    strings = {''}
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            options = {chr(av)}
+        elif op is sre_parse.IN and all(kind is sre_parse.LITERAL for kind, _ in av):
+            options = {chr(value) for _, value in av}
+        elif op is sre_parse.SUBPATTERN:
+            options = _exact(av[-1])
+        elif op is sre_parse.BRANCH:
+            options = set()
+            for branch in av[1]:
+                branch_options = _exact(branch)
+                if branch_options is None:
+                    return None
+                options |= branch_options
+        else:
+            return None
+        if options is None:
+            return None
+        strings = {prefix + option for prefix in strings for option in options}
+        if len(strings) > MAX_EXPANSION:
+            return None
+    return strings
+
+
+def _best(factors: List[set]) -> Optional[set]:
+    """En seçici küme: en kısa dizgisi en uzun olan, eşitlikte daha az dizgili olan"""
+    if not factors:
+        return None
+    return max(factors, key=lambda factor: (min(len(s) for s in factor), -len(factor)))
+
+
+def _factors(items) -> List[set]:
+    """Desenin her eşleşmesinde en az bir elemanı geçmek zorunda olan dizgi kümeleri"""
+    factors = []
+    run = {''}
+    for op, av in items:
+        options = _exact([(op, av)])
+        if options is not None and '' not in options:
+            joined = {prefix + option for prefix in run for option in options}
+            if len(joined) <= MAX_EXPANSION:
+                run = joined
+                continue
+        if run != {''}:
+            factors.append(run)
+        run = {''}
+        if options is not None and '' not in options:
+            run = options
+            continue
+        if op is sre_parse.SUBPATTERN:
+            factors.extend(_factors(av[-1]))
+        elif op is sre_parse.BRANCH:
+            union = set()
+            for branch in av[1]:
+                branch_best = _best(_factors(branch))
+                if branch_best is None:
+                    break
+                union |= branch_best
+            else:
+                if len(union) <= MAX_EXPANSION:
+                    factors.append(union)
+        elif op in _REPEATS and av[0] >= 1:
+            factors.extend(_factors(av[2]))
+    if run != {''}:
+        factors.append(run)
+    return factors
+
+
+def _trie_pattern(node: dict) -> str:
+    """Anahtar kelime ağacını regex'e çevir; ortak önekler bir kez denenir ve en uzun anahtar seçilir"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        body = ('(?:' + body + ')' if len(branches) == 1 else body) + '?'
+    return body
+
+
+def keyword_regex(keywords: Iterable[str]):
+    """Anahtar kelimelerin herhangi birini bulan büyük/küçük harf duyarsız tek regex"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return re.compile(_trie_pattern(trie), re.IGNORECASE) if trie else None
+
+
+def required_keywords(pattern: str, flags: int = 0) -> Optional[frozenset]:
+    """Desenin eşleşmesi için metinde bulunması gereken anahtar kelimeler (küçük harf).
+    Güvenilir bir küme çıkarılamazsa None döner; o desen her taramada çalıştırılır."""
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+    best = _best(_factors(parsed))
+    if best is None:
+        return None
+    return frozenset(keyword.lower() for keyword in best)
+
+
+class PatternMatch:
+    """Tek bir desen eşleşmesi: hangi konu/desen, eşleşme nesnesi ve findall uyumlu değer"""
+    __slots__ = ('topic', 'key', 'pattern', 'match')
+
+    def __init__(self, topic: str, key: str, pattern: str, match):
+        self.topic = topic
+        self.key = key
+        self.pattern = pattern
+        self.match = match
+
+    @property
+    def name(self) -> str:
+        return f"{self.topic}.{self.key}"
+
+    @property
+    def value(self) -> Union[str, tuple]:
+        """re.findall ile aynı biçim: grup yoksa tüm eşleşme, tek grupta grup, çokluda tuple"""
+        groups = self.match.groups()
+        if not groups:
+            return self.match.group(0)
+        if len(groups) == 1:
+            return groups[0] or ''
+        return tuple(group or '' for group in groups)
+
+    def start(self) -> int:
+        return self.match.start()
+
+    def end(self) -> int:
+        return self.match.end()
+
+    def group(self, *args):
+        return self.match.group(*args)
+
+    def context(self, radius: int) -> str:
+        """Eşleşmenin çevresindeki metin (her iki yanda radius karakter)"""
+        text = self.match.string
+        return text[max(0, self.match.start() - radius):min(len(text), self.match.end() + radius)].strip()
+
+    def __repr__(self):
+        return f"PatternMatch({self.name!r}, {self.match.group(0)[:40]!r})"
+
+
+class _PatternSpec:
+    __slots__ = ('topic', 'key', 'pattern', 'flags', 'regex', 'keywords')
+
+    def __init__(self, topic: str, key: str, pattern: str, flags: int):
+        self.topic = topic
+        self.key = key
+        self.pattern = pattern
+        self.flags = flags
+        self.regex = re.compile(pattern, flags)
+        self.keywords = required_keywords(pattern, flags)
+
+
+class _CompiledSet:
+    """Derlenmiş desen kümesinin değişmez anlık görüntüsü (taramalar kilitsiz okur)"""
+
+    def __init__(self, specs: Sequence[_PatternSpec]):
+        self.specs = tuple(specs)
+        keywords = set()
+        for spec in self.specs:
+            if spec.keywords:
+                keywords |= spec.keywords
+        self.keywords = frozenset(keywords)
+        self.trigger = keyword_regex(keywords)
+        # Tetikleyici bir konumda en uzun anahtarı bulur; aynı konumda başlayan kısa anahtarlar
+        # onun önekleri olarak sayılır
+        self.prefixes = {keyword: frozenset(other for other in keywords if keyword.startswith(other))
+                         for keyword in keywords}
+        self._by_topics: Dict[Any, tuple] = {}
+
+    def specs_for(self, topics: Optional[frozenset]) -> tuple:
+        cached = self._by_topics.get(topics)
+        if cached is None:
+            cached = tuple(spec for spec in self.specs if topics is None or spec.topic in topics)
+            self._by_topics[topics] = cached
+        return cached
+
+    def present_keywords(self, text: str) -> Optional[set]:
+        """Metinde geçen anahtar kelimeler (tek geçiş); eşlenemeyen bir büyük/küçük harf
+        dönüşümünde None döner ve tüm desenler çalıştırılır"""
+        present = set()
+        if self.trigger is None:
+            return present
+        search = self.trigger.search
+        prefixes = self.prefixes
+        match = search(text)
+        while match is not None:
+            found = prefixes.get(match.group(0).lower())
+            if found is None:
+                return None
+            present |= found
+            if len(present) == len(prefixes):
+                break
+            # Bir sonraki karakterden devam: çakışan anahtar kelimeler de bulunur
+            match = search(text, match.start() + 1)
+        return present
+
+
+class PatternEngine:
+    """Adlandırılmış desenleri tek ön filtre geçişiyle tarayan ve abonelere dağıtan motor"""
+
+    def __init__(self):
+        self._specs: Dict[str, _PatternSpec] = {}
+        self._subscribers: Dict[str, List[Callable]] = {}
+        self._compiled: Optional[_CompiledSet] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'scans': 0,
+            'patterns_run': 0,
+            'patterns_skipped': 0,
+            'matches': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Kayıt ve abonelik
+    # ------------------------------------------------------------------
+
+    def register(self, topic: str, key: Any, pattern: str, flags: int = 0) -> str:
+        """Deseni "konu.anahtar" adıyla kaydet; aynı ad aynı desenle tekrar gelirse değişiklik yok"""
+        key = str(key)
+        name = f"{topic}.{key}"
+        with self._lock:
+            existing = self._specs.get(name)
+            if existing is not None and existing.pattern == pattern and existing.flags == flags:
+                return name
+            self._specs[name] = _PatternSpec(topic, key, pattern, flags)
+            self._compiled = None
+        return name
+
+    def register_group(self, topic: str, patterns: Union[Mapping[Any, str], Iterable[str]],
+                       flags: int = 0) -> List[str]:
+        """Bir dedektörün desen listesini (anahtar = sıra) veya sözlüğünü tek konu altında kaydet"""
+        items = patterns.items() if isinstance(patterns, Mapping) else enumerate(patterns)
+        names = [self.register(topic, key, pattern, flags) for key, pattern in items]
+        # Listeden çıkarılan eski desenler de konudan silinsin
+        with self._lock:
+            stale = [name for name, spec in self._specs.items() if spec.topic == topic and name not in names]
+            for name in stale:
+                del self._specs[name]
+            if stale:
+                self._compiled = None
+        return names
+
+    def subscribe(self, topic: str, callback: Callable[[List[PatternMatch], Any], None]):
+        """Konunun eşleşmelerini her taramada callback(eşleşmeler, bağlam) ile al"""
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+        return callback
+
+    def unsubscribe(self, topic: str, callback: Callable) -> bool:
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            if callback not in callbacks:
+                return False
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._subscribers[topic]
+            return True
+
+    def patterns(self, topic: Optional[str] = None) -> Dict[str, str]:
+        return {name: spec.pattern for name, spec in self._specs.items()
+                if topic is None or spec.topic == topic}
+
+    def _compile(self) -> _CompiledSet:
+        with self._lock:
+            if self._compiled is None:
+                self._compiled = _CompiledSet(list(self._specs.values()))
+            return self._compiled
+
+    # ------------------------------------------------------------------
+    # Tarama
+    # ------------------------------------------------------------------
+
+    def scan(self, text: str, topics: Optional[Iterable[str]] = None, context: Any = None) -> List[PatternMatch]:
+        """Metni tek ön filtre geçişiyle tara; topics verilmezse tüm konular.
+        Abonesi olan konular da aynı geçişte taranır ve eşleşmeleri abonelere iletilir.
+        Dönen liste yalnızca istenen konuları içerir (kayıt sırası, sonra konum)."""
+        if not text:
+            return []
+        compiled = self._compiled or self._compile()
+        requested = None if topics is None else frozenset(topics)
+        subscribed = dict(self._subscribers)
+        scan_topics = requested if requested is None or not subscribed else requested | frozenset(subscribed)
+
+        present = compiled.present_keywords(text)
+        results = []
+        delivered: Dict[str, List[PatternMatch]] = {}
+        run = skipped = 0
+        for spec in compiled.specs_for(scan_topics):
+            if present is not None and spec.keywords is not None and not (spec.keywords & present):
+                skipped += 1
+                continue
+            run += 1
+            matches = [PatternMatch(spec.topic, spec.key, spec.pattern, match)
+                       for match in spec.regex.finditer(text)]
+            if not matches:
+                continue
+            if requested is None or spec.topic in requested:
+                results.extend(matches)
+            if spec.topic in subscribed:
+                delivered.setdefault(spec.topic, []).extend(matches)
+
+        self.stats['scans'] += 1
+        self.stats['patterns_run'] += run
+        self.stats['patterns_skipped'] += skipped
+        self.stats['matches'] += len(results)
+
+        for topic, matches in delivered.items():
+            for callback in subscribed[topic]:
+                try:
+                    callback(matches, context)
+                except Exception as e:
+                    print(f"Desen abonesi hatası ({topic}): {str(e)}")
+        return results
+
+    def first(self, text: str, topic: str) -> Optional[PatternMatch]:
+        """Konudaki ilk eşleşen desenin ilk eşleşmesi (eski "ilk findall sonucu" davranışı)"""
+        matches = self.scan(text, (topic,))
+        return matches[0] if matches else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        compiled = self._compiled or self._compile()
+        stats = dict(self.stats)
+        stats['patterns'] = len(compiled.specs)
+        stats['keywords'] = len(compiled.keywords)
+        stats['unfiltered_patterns'] = sum(1 for spec in compiled.specs if spec.keywords is None)
+        stats['topics'] = sorted({spec.topic for spec in compiled.specs})
+        return stats
+
+
+def group_by_topic(matches: Iterable[PatternMatch]) -> Dict[str, List[PatternMatch]]:
+    """Tarama sonucunu konu -> eşleşmeler sözlüğüne ayır"""
+    grouped: Dict[str, List[PatternMatch]] = {}
+    for match in matches:
+        grouped.setdefault(match.topic, []).append(match)
+    return grouped
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_pattern_engine() -> PatternEngine:
+    """Uygulama genelinde paylaşılan desen motoru"""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = PatternEngine()
+        return _default_engine
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Asyncio Tabanlı Prompt Dağıtıcısı
+Claude CLI çağrılarını tek bir arka plan event loop'unda, eşzamanlı çalışan
+prompt sayısını sınırlayarak yürütür. Her çağrı beklenebilir bir future döndürür.
+"""
+
+import asyncio
+import concurrent.futures
+import locale
+import subprocess
+import threading
+from typing import AsyncIterator, Callable, Optional
+
+from claude_health import ClaudeUnavailableError
+from claude_stream import StreamJsonParser
+from claude_worker_pool import WorkerPoolError
+
+
+class AsyncPromptDispatcher:
+    """Sınırlı eşzamanlılıkla Claude CLI prompt'larını çalıştırır"""
+
+    def __init__(self, command_builder: Callable[..., list], max_in_flight: int = 4,
+                 default_timeout: float = 60, pool_getter: Optional[Callable] = None,
+                 stream_format: str = "stream-json", track_sessions: bool = False,
+                 health_check: Optional[Callable[[], Optional[bool]]] = None):
+        # command_builder(prompt, output_format[, resume]) -> komut listesi
+        self.command_builder = command_builder
+        self.stream_format = stream_format
+        # Açıksa tek seferlik çağrılar da akış formatında çalışır, oturum kimliği yakalanır
+        self.track_sessions = track_sessions
+        # health_check() False dönerse prompt süreç başlatılmadan reddedilir
+        self.health_check = health_check
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.default_timeout = default_timeout
+        self.pool_getter = pool_getter
+
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+        self.stats = {
+            "submitted": 0,
+            "in_flight": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "rejected": 0,
+        }
+
+    def start(self):
+        """Event loop thread'ini başlatır; ilk submit'te otomatik çağrılır"""
+        with self._start_lock:
+            if self._loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                self._semaphore = asyncio.Semaphore(self.max_in_flight)
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="claude-dispatcher", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+
+    async def run_prompt(self, prompt: str, timeout: Optional[float] = None,
+                         on_chunk: Optional[Callable[[str], None]] = None,
+                         resume=None) -> subprocess.CompletedProcess:
+        """Prompt'u çalıştıran coroutine; on_chunk verilirse çıktı geldikçe parça parça iletilir.
+        resume verilirse prompt o oturum kimliğinin konuşmasına gönderilir."""
+        timeout = timeout or self.default_timeout
+
+        if self.health_check is not None and self.health_check() is False:
+            self.stats["rejected"] += 1
+            raise ClaudeUnavailableError("Claude CLI şu anda kullanılamıyor (son sağlık kontrolü başarısız)")
+
+        async with self._semaphore:
+            self.stats["in_flight"] += 1
+            try:
+                result = await self._execute(prompt, timeout, on_chunk, resume)
+                self.stats["completed"] += 1
+                return result
+            except subprocess.TimeoutExpired:
+                self.stats["timeouts"] += 1
+                raise
+            except asyncio.CancelledError:
+                self.stats["cancelled"] += 1
+                raise
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+            finally:
+                self.stats["in_flight"] -= 1
+
+    async def _execute(self, prompt: str, timeout: float, on_chunk=None, resume=None) -> subprocess.CompletedProcess:
+        loop = asyncio.get_running_loop()
+        # Devam eden konuşmalar havuzdaki worker'ların kendi oturumlarına karışmasın
+        pool = self.pool_getter() if self.pool_getter and resume is None else None
+        if pool is not None:
+            # Worker thread'inden gelen parçaları event loop thread'ine aktar
+            thread_safe_chunk = (lambda c: loop.call_soon_threadsafe(self._emit, on_chunk, c)) if on_chunk else None
+            try:
+                return await loop.run_in_executor(None, pool.execute, prompt, timeout, thread_safe_chunk)
+            except WorkerPoolError as e:
+                # Havuz kullanılamıyorsa tek seferlik sürece geri dön
+                print(f"Worker havuzu hatası, tek seferlik çağrıya dönülüyor: {str(e)}")
+
+        streaming = on_chunk is not None or self.track_sessions
+        output_format = self.stream_format if streaming else "text"
+        if resume is None:
+            cmd = self.command_builder(prompt, output_format)
+        else:
+            cmd = self.command_builder(prompt, output_format, resume)
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        try:
+            if streaming:
+                result = await asyncio.wait_for(self._stream(process, cmd, output_format, on_chunk), timeout)
+            else:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+                result = subprocess.CompletedProcess(
+                    cmd, process.returncode, self._decode(stdout), self._decode(stderr)
+                )
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+        return result
+
+    async def _stream(self, process, cmd, output_format: str, on_chunk) -> subprocess.CompletedProcess:
+        """stdout'u satır satır okur, her parçayı on_chunk'a iletir (verildiyse)"""
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        parser = StreamJsonParser() if output_format == "stream-json" else None
+        raw_lines = []
+
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            # stream-json her zaman UTF-8, düz metin sistem kodlamasında gelir
+            text = line.decode("utf-8", errors="replace") if parser is not None else self._decode(line)
+            if parser is not None:
+                for chunk in parser.feed_line(text):
+                    self._emit(on_chunk, chunk)
+            else:
+                raw_lines.append(text)
+                self._emit(on_chunk, text)
+
+        await process.wait()
+        stderr = self._decode(await stderr_task)
+
+        if parser is None:
+            return subprocess.CompletedProcess(cmd, process.returncode, "".join(raw_lines), stderr)
+        if parser.is_error:
+            result = subprocess.CompletedProcess(cmd, process.returncode or 1, "", parser.text() or stderr)
+        else:
+            result = subprocess.CompletedProcess(cmd, process.returncode, parser.text(), stderr)
+        result.session_id = parser.session_id
+        return result
+
+    @staticmethod
+    def _emit(on_chunk, chunk: str):
+        if on_chunk is None:
+            return
+        try:
+            on_chunk(chunk)
+        except Exception as e:
+            print(f"Akış callback hatası: {str(e)}")
+
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        return data.decode(locale.getpreferredencoding(False), errors="replace")
+
+    @staticmethod
+    async def _kill(process):
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    def submit(self, prompt: str, timeout: Optional[float] = None,
+               on_chunk: Optional[Callable[[str], None]] = None, resume=None) -> concurrent.futures.Future:
+        """Prompt'u kuyruğa ekler; iptal edilebilir bir Future döndürür.
+        on_chunk event loop thread'inde çağrılır."""
+        self.start()
+        self.stats["submitted"] += 1
+        return asyncio.run_coroutine_threadsafe(self.run_prompt(prompt, timeout, on_chunk, resume), self._loop)
+
+    def run(self, prompt: str, timeout: Optional[float] = None,
+            on_chunk: Optional[Callable[[str], None]] = None, resume=None) -> subprocess.CompletedProcess:
+        """submit() için senkron kısayol"""
+        return self.submit(prompt, timeout, on_chunk, resume).result()
+
+    async def stream(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yanıt parçalarını geldikçe veren async iterator (dispatcher loop'unda kullanılır)"""
+        chunks = asyncio.Queue()
+        finished = object()
+
+        task = asyncio.ensure_future(self.run_prompt(prompt, timeout, chunks.put_nowait))
+        task.add_done_callback(lambda _: chunks.put_nowait(finished))
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is finished:
+                    break
+                yield chunk
+            # Hata varsa çağırana ilet
+            task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["max_in_flight"] = self.max_in_flight
+        stats["running"] = self._loop is not None
+        return stats
+
+    def shutdown(self, timeout: float = 2):
+        """Bekleyen işleri iptal eder ve event loop'u durdurur"""
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+
+        def cancel_all():
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.call_later(0.1, loop.stop)
+
+        loop.call_soon_threadsafe(cancel_all)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
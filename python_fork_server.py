@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Ön Isıtılmış Python Çalıştırma Sunucusu
+Tek bir sıcak Python süreci, her kod parçası için fork ile yalıtılmış bir alt süreç açar.
+Kod pipe üzerinden gönderilir, stdout/stderr bellekte toplanır, zaman aşımını sunucu uygular.
+Böylece her parça için yorumlayıcı başlatma maliyeti ödenmez.
+
+Protokol: stdin/stdout üzerinden satır başına bir JSON mesaj.
+  istek:  {"id": 1, "code": "...", "timeout": 10, "cwd": "...", "max_output": 65536}
+  yanıt:  {"id": 1, "exit_code": 0, "stdout": "...", "stderr": "...", "timed_out": false}
+"""
+
+import itertools
+import json
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+
+class ForkServerError(Exception):
+    """Sunucu başlatılamadığında veya istek iletilemediğinde fırlatılır"""
+
+
+class ForkServerReplyError(ForkServerError):
+    """İstek iletildikten sonra yanıt alınamadığında fırlatılır; kod çalışmış olabilir"""
+
+
+# ---------------------------------------------------------------------------
+# Sunucu tarafı (ayrı süreçte çalışır)
+# ---------------------------------------------------------------------------
+
+def _run_child(request: dict, stdout_w: int, stderr_w: int, protocol_fds: tuple):
+    """Fork edilmiş alt süreçte kodu çalıştırır; asla geri dönmez"""
+    exit_code = 1
+    try:
+        os.setsid()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        for fd in protocol_fds:
+            os.close(fd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(stdout_w, 1)
+        os.dup2(stderr_w, 2)
+        os.close(stdout_w)
+        os.close(stderr_w)
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+
+        try:
+            exec(compile(request["code"], "<snippet>", "exec"), {"__name__": "__main__"})
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def _kill_job(pid: int):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        # Alt süreç henüz kendi grubunu kurmadıysa yalnızca kendisini öldür
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def serve():
+    """İstekleri okur, her biri için fork eder ve sonuçları sırası fark etmeksizin yazar"""
+    # Protokol kanallarını kod parçalarının göreceği 0/1 numaralı fd'lerden ayır
+    protocol_in = os.fdopen(os.dup(0), "rb", buffering=0)
+    protocol_out = os.fdopen(os.dup(1), "wb", buffering=0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    protocol_fds = (protocol_in.fileno(), protocol_out.fileno())
+
+    selector = selectors.DefaultSelector()
+    selector.register(protocol_in, selectors.EVENT_READ, ("request", None))
+    jobs = {}
+    request_buffer = b""
+
+    def reply(job):
+        _, status = os.waitpid(job["pid"], 0)
+        if job["timed_out"]:
+            exit_code = -signal.SIGKILL
+        elif os.WIFEXITED(status):
+            exit_code = os.WEXITSTATUS(status)
+        else:
+            exit_code = -os.WTERMSIG(status)
+        message = {
+            "id": job["id"],
+            "exit_code": exit_code,
+            "stdout": job["out"][1].decode("utf-8", errors="replace"),
+            "stderr": job["out"][2].decode("utf-8", errors="replace"),
+            "timed_out": job["timed_out"],
+        }
+        protocol_out.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def start_job(request):
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(stdout_r)
+            os.close(stderr_r)
+            _run_child(request, stdout_w, stderr_w, protocol_fds)
+        os.close(stdout_w)
+        os.close(stderr_w)
+        job = {
+            "id": request["id"],
+            "pid": pid,
+            "deadline": time.monotonic() + float(request.get("timeout", 10)),
+            "max_output": int(request.get("max_output", 65536)),
+            "out": {1: b"", 2: b""},
+            "open": 2,
+            "timed_out": False,
+        }
+        jobs[request["id"]] = job
+        selector.register(stdout_r, selectors.EVENT_READ, ("output", (job, 1)))
+        selector.register(stderr_r, selectors.EVENT_READ, ("output", (job, 2)))
+
+    while True:
+        now = time.monotonic()
+        deadlines = [job["deadline"] for job in jobs.values() if not job["timed_out"]]
+        timeout = max(0, min(deadlines) - now) if deadlines else None
+
+        for key, _ in selector.select(timeout):
+            kind, data = key.data
+            if kind == "request":
+                chunk = protocol_in.read(65536)
+                if not chunk:
+                    # İstemci kapandı: çalışanları sonlandır ve çık
+                    for job in jobs.values():
+                        _kill_job(job["pid"])
+                    return
+                request_buffer += chunk
+                *lines, request_buffer = request_buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        start_job(json.loads(line))
+            else:
+                job, stream = data
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    # Sınırı aşan çıktı okunup atılır, alt süreç bloklanmaz
+                    room = job["max_output"] - len(job["out"][stream])
+                    if room > 0:
+                        job["out"][stream] += chunk[:room]
+                    continue
+                selector.unregister(key.fd)
+                os.close(key.fd)
+                job["open"] -= 1
+                if job["open"] == 0:
+                    del jobs[job["id"]]
+                    reply(job)
+
+        now = time.monotonic()
+        for job in jobs.values():
+            if not job["timed_out"] and now >= job["deadline"]:
+                job["timed_out"] = True
+                _kill_job(job["pid"])
+
+
+# ---------------------------------------------------------------------------
+# İstemci tarafı
+# ---------------------------------------------------------------------------
+
+class PythonForkServer:
+    """Ön ısıtılmış fork sunucusuna kod parçası gönderen istemci"""
+
+    def __init__(self, python_executable: str = sys.executable):
+        self.python_executable = python_executable
+        self.process = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    @staticmethod
+    def is_supported() -> bool:
+        return hasattr(os, "fork") and os.name != "nt"
+
+    def start(self):
+        with self._start_lock:
+            if self.process is not None and self.process.poll() is None:
+                return
+            if not self.is_supported():
+                raise ForkServerError("Bu platformda fork desteklenmiyor")
+            try:
+                self.process = subprocess.Popen(
+                    [self.python_executable, os.path.abspath(__file__), "--serve"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError as e:
+                raise ForkServerError(f"Fork sunucusu başlatılamadı: {e}")
+            threading.Thread(target=self._read_replies, args=(self.process,), daemon=True).start()
+
+    def _read_replies(self, process):
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            waiter = self._pending.pop(message.get("id"), None)
+            if waiter:
+                waiter["reply"] = message
+                waiter["event"].set()
+
+        # Sunucu kapandı: bekleyenleri uyandır
+        for waiter in list(self._pending.values()):
+            waiter["event"].set()
+        self._pending.clear()
+
+    def run(self, code: str, timeout: float = 10, cwd: Optional[str] = None,
+            max_output: int = 65536) -> dict:
+        """Kodu yalıtılmış bir fork içinde çalıştırır; sonuç sözlüğünü döndürür"""
+        self.start()
+        request_id = next(self._ids)
+        waiter = {"event": threading.Event(), "reply": None}
+        self._pending[request_id] = waiter
+
+        request = {
+            "id": request_id,
+            "code": code,
+            "timeout": timeout,
+            "cwd": cwd or os.getcwd(),
+            "max_output": max_output,
+        }
+        try:
+            with self._write_lock:
+                self.process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+                self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self._pending.pop(request_id, None)
+            raise ForkServerError(f"Fork sunucusuna yazılamadı: {e}")
+
+        # Zaman aşımını sunucu uygular; buradaki bekleme yalnızca güvenlik payı
+        if not waiter["event"].wait(timeout + 5) or waiter["reply"] is None:
+            self._pending.pop(request_id, None)
+            raise ForkServerReplyError("Fork sunucusundan yanıt alınamadı")
+        return waiter["reply"]
+
+    def shutdown(self):
+        with self._start_lock:
+            process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+
+
+if __name__ == "__main__" and "--serve" in sys.argv:
+    serve()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Kayıt Kodlayıcıları (JSONL ve Sıkı İkili Biçim)
+Olay günlüğü segmentleri bir kodlayıcıyla yazılır ve okunur; kodlayıcı dosya uzantısından
+seçildiği için eski .jsonl segmentleri ikili biçime geçildikten sonra da okunabilir kalır.
+
+JSONL her satırda anahtar adlarını, ISO zaman damgasını ve tekrar eden session/tip metinlerini
+yeniden yazar. İkili biçimde:
+  - zaman damgası sabit genişlikte int64 (1970'ten bu yana mikrosaniye, saat dilimsiz),
+  - anahtarlar ve INTERNED_FIELDS değerleri (session_id, message_type, ...) dosya başına
+    bir kez tanımlanıp sonra kimlik numarasıyla,
+  - kaydın şekli (anahtar sırası + değer tipleri) dosya başına bir kez tanımlanır; kayıt
+    yalnızca şekil kimliği, sabit genişlikli alanlar ve uzunluk önekli metinlerden oluşur.
+Sabit genişlikli kısım tek struct.unpack_from ile çözülür; olay tipine göre okurken tipi
+uymayan kayıtların metinleri hiç çözülmez.
+
+İkili dosya düzeni:
+  başlık: b"CSRB" + sürüm (1 bayt)
+  çerçeve: tür (1 bayt) + gövde uzunluğu (varint) + gövde
+    "D" metin tanımı: sıradaki metin kimliğinin UTF-8 metni
+    "S" şekil tanımı: alan sayısı (varint) + her alan için anahtar kimliği (varint) + değer tipi (1 bayt)
+    "R" kayıt: şekil kimliği (varint) + sabit alanlar (little-endian struct) + metin baytları
+
+Çerçeveler uzunluk önekli olduğundan yarım kalmış son çerçeve (çökme) atlanır; dosyanın
+ortasından okumaya başlarken önceki tanım çerçeveleri kayıt gövdeleri çözülmeden taranır.
+
+Dönüştürme (her iki yönde):
+  python record_codec.py seg_x.jsonl seg_x.bin
+"""
+
+import datetime
+import json
+import os
+import struct
+import sys
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Değerleri tekrar eden (kategorik) alanlar; metin tablosuna alınır
+INTERNED_FIELDS = frozenset({"event", "session_id", "message_type", "type", "status", "schedule_id"})
+# Kayıpsız geri üretilebiliyorsa int64 mikrosaniye olarak saklanan alanlar
+TIMESTAMP_FIELDS = frozenset({"timestamp"})
+
+BINARY_MAGIC = b"CSRB\x01"
+FRAME_DEFINE = b"D"
+FRAME_SHAPE = b"S"
+FRAME_RECORD = b"R"
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Değer tipleri ve sabit genişlikli kısımdaki struct karşılıkları
+V_NONE, V_TRUE, V_FALSE, V_INT32, V_INT64, V_FLOAT, V_TIMESTAMP, V_INTERNED, V_TEXT, V_JSON = range(10)
+FIXED_FORMATS = {V_INT32: "i", V_INT64: "q", V_FLOAT: "d", V_TIMESTAMP: "q",
+                 V_INTERNED: "I", V_TEXT: "I", V_JSON: "I"}
+CONSTANTS = {V_NONE: None, V_TRUE: True, V_FALSE: False}
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _timestamp_micros(value: Any) -> Optional[int]:
+    """ISO metni kayıpsız geri üretilebiliyorsa mikrosaniye; değilse None (metin olarak saklanır)"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return None
+    return (parsed - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+class JsonlEncoder:
+    def encode(self, record: Dict[str, Any]) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+class JsonlCodec:
+    """Satır başına bir JSON nesnesi (mevcut biçim)"""
+
+    name = "jsonl"
+    extension = ".jsonl"
+    header = b""
+
+    def encoder(self, path: Optional[str] = None) -> JsonlEncoder:
+        return JsonlEncoder()
+
+    def iter_records(self, f: BinaryIO, offset: int = 0, end: Optional[int] = None,
+                     event_type: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """offset'ten itibaren tam satırları (kayıt, satır sonu ofseti) olarak döndürür"""
+        # Tipi uymayan satırlar json.loads'a hiç girmez
+        needle = (f'"event": {json.dumps(event_type, ensure_ascii=False)}'.encode('utf-8')
+                  if event_type is not None else None)
+        f.seek(offset)
+        position = offset
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Yazılmakta olan yarım satır
+                return
+            position += len(line)
+            if needle is None or needle in line:
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    record = None
+                if record is not None and (event_type is None or record.get("event") == event_type):
+                    yield record, position
+            if end is not None and position >= end:
+                return
+
+
+class _Shape:
+    """Bir kayıt şeklinin alanları ve sabit kısmının struct'ı"""
+
+    __slots__ = ("fields", "layout", "event_slot")
+
+    def __init__(self, fields: Tuple[Tuple[str, int], ...]):
+        self.fields = fields
+        self.layout = struct.Struct("<" + "".join(FIXED_FORMATS.get(kind, "") for _, kind in fields))
+        self.event_slot = None
+        slot = 0
+        for key, kind in fields:
+            if key == "event" and kind == V_INTERNED:
+                self.event_slot = slot
+            if kind in FIXED_FORMATS:
+                slot += 1
+
+
+class _Tables:
+    """Dosya içi metin ve şekil tabloları (tanım çerçevelerinden kurulur)"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        self.shapes: List[_Shape] = []
+
+    def apply(self, kind: bytes, body: bytes):
+        if kind == FRAME_DEFINE:
+            text = bytes(body).decode('utf-8', errors='replace')
+            self.string_ids.setdefault(text, len(self.strings))
+            self.strings.append(text)
+        elif kind == FRAME_SHAPE:
+            count, position = _read_varint(body, 0)
+            fields = []
+            for _ in range(count):
+                key_id, position = _read_varint(body, position)
+                fields.append((self.strings[key_id], body[position]))
+                position += 1
+            self.shapes.append(_Shape(tuple(fields)))
+
+
+class BinaryEncoder:
+    """Dosyanın metin ve şekil tablolarını tutan ikili kodlayıcı; yeni girdiler için önce tanım çerçevesi yazar"""
+
+    def __init__(self, tables: Optional[_Tables] = None):
+        tables = tables or _Tables()
+        self.ids = dict(tables.string_ids)
+        self.shapes = list(tables.shapes)
+        self.shape_ids = {shape.fields: number for number, shape in enumerate(self.shapes)}
+
+    def _intern(self, text: str, out: bytearray) -> int:
+        number = self.ids.get(text)
+        if number is None:
+            number = len(self.ids)
+            self.ids[text] = number
+            body = text.encode('utf-8')
+            out += FRAME_DEFINE + _varint(len(body)) + body
+        return number
+
+    def _shape(self, fields: Tuple[Tuple[str, int], ...], out: bytearray) -> int:
+        number = self.shape_ids.get(fields)
+        if number is None:
+            body = bytearray(_varint(len(fields)))
+            for key, kind in fields:
+                body += _varint(self._intern(key, out))
+                body.append(kind)
+            number = len(self.shapes)
+            self.shape_ids[fields] = number
+            self.shapes.append(_Shape(fields))
+            out += FRAME_SHAPE + _varint(len(body)) + body
+        return number
+
+    def encode(self, record: Dict[str, Any]) -> bytes:
+        out = bytearray()
+        fields = []
+        fixed = []
+        texts = []
+        for key, value in record.items():
+            key = str(key)
+            if value is None:
+                kind = V_NONE
+            elif value is True:
+                kind = V_TRUE
+            elif value is False:
+                kind = V_FALSE
+            elif isinstance(value, int) and -2 ** 31 <= value < 2 ** 31:
+                kind = V_INT32
+                fixed.append(value)
+            elif isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+                kind = V_INT64
+                fixed.append(value)
+            elif isinstance(value, float):
+                kind = V_FLOAT
+                fixed.append(value)
+            elif isinstance(value, str) and key in INTERNED_FIELDS:
+                kind = V_INTERNED
+                fixed.append(self._intern(value, out))
+            else:
+                micros = _timestamp_micros(value) if key in TIMESTAMP_FIELDS else None
+                if micros is not None:
+                    kind = V_TIMESTAMP
+                    fixed.append(micros)
+                else:
+                    kind = V_TEXT if isinstance(value, str) else V_JSON
+                    text = (value if kind == V_TEXT else json.dumps(value, ensure_ascii=False)).encode('utf-8')
+                    fixed.append(len(text))
+                    texts.append(text)
+            fields.append((key, kind))
+        shape_id = self._shape(tuple(fields), out)
+        body = _varint(shape_id) + self.shapes[shape_id].layout.pack(*fixed) + b"".join(texts)
+        out += FRAME_RECORD + _varint(len(body)) + body
+        return bytes(out)
+
+
+class BinaryCodec:
+    """Şekil tablolu, sabit genişlikli alanlar ve uzunluk önekli metinlerle ikili biçim"""
+
+    name = "binary"
+    extension = ".bin"
+    header = BINARY_MAGIC
+    chunk_size = 1024 * 1024
+
+    @staticmethod
+    def _frames(data, position: int) -> Iterator[Tuple[bytes, int, int]]:
+        """(tür, gövde başlangıcı, çerçeve sonu); yarım kalmış son çerçevede durur"""
+        size = len(data)
+        while position < size:
+            kind = data[position:position + 1]
+            length = 0
+            shift = 0
+            cursor = position + 1
+            while True:
+                if cursor >= size:
+                    return
+                byte = data[cursor]
+                cursor += 1
+                length |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            position = cursor + length
+            if position > size:
+                return
+            yield kind, cursor, position
+
+    def read_tables(self, data, until: Optional[int] = None) -> _Tables:
+        """until ofsetine kadarki tanım çerçevelerinden tabloları kurar (kayıt gövdeleri atlanır)"""
+        tables = _Tables()
+        for kind, start, end in self._frames(data, len(self.header)):
+            if until is not None and start > until:
+                break
+            if kind != FRAME_RECORD:
+                tables.apply(kind, data[start:end])
+        return tables
+
+    def encoder(self, path: Optional[str] = None) -> BinaryEncoder:
+        """Var olan dosyaya eklemek için tablolar dosyadan yüklenir"""
+        if path is None or not os.path.exists(path):
+            return BinaryEncoder()
+        with open(path, 'rb') as f:
+            return BinaryEncoder(self.read_tables(f.read()))
+
+    @staticmethod
+    def decode(body: bytes, tables: _Tables, event_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Kayıt gövdesini çözer; event_id verilmişse tipi uymayan kayıtta None (metinler çözülmez)"""
+        shape_id = body[0]
+        position = 1
+        if shape_id >= 0x80:
+            shape_id, position = _read_varint(body, 0)
+        shape = tables.shapes[shape_id]
+        values = shape.layout.unpack_from(body, position)
+        if event_id is not None and (shape.event_slot is None or values[shape.event_slot] != event_id):
+            return None
+        position += shape.layout.size
+        strings = tables.strings
+        record = {}
+        slot = 0
+        for key, kind in shape.fields:
+            if kind in CONSTANTS:
+                record[key] = CONSTANTS[kind]
+                continue
+            value = values[slot]
+            slot += 1
+            if kind == V_INTERNED:
+                value = strings[value]
+            elif kind == V_TEXT or kind == V_JSON:
+                text = body[position:position + value].decode('utf-8')
+                position += value
+                value = text if kind == V_TEXT else json.loads(text)
+            elif kind == V_TIMESTAMP:
+                value = (EPOCH + datetime.timedelta(microseconds=value)).isoformat()
+            record[key] = value
+        return record
+
+    def iter_records(self, f: BinaryIO, offset: int = 0, end: Optional[int] = None,
+                     event_type: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """Akış halinde çözer: offset'ten itibaren (kayıt, çerçeve sonu ofseti)"""
+        f.seek(0)
+        if f.read(len(self.header)) != self.header:
+            return
+        offset = max(offset, len(self.header))
+        if offset > len(self.header):
+            # Ortadan başlarken önceki tanımlar gövdeler çözülmeden toplanır
+            f.seek(0)
+            tables = self.read_tables(f.read(offset), offset)
+        else:
+            tables = _Tables()
+        # Tip metni henüz tanımlanmadıysa -1: hiçbir kayıt eşleşmez (tanım gelince güncellenir)
+        event_id = None if event_type is None else tables.string_ids.get(event_type, -1)
+        chunk_size = self.chunk_size
+        while True:
+            # Segmentler parça parça belleğe alınır; parça sonundaki yarım çerçeve sonraki parçayla tamamlanır
+            f.seek(offset)
+            data = f.read(chunk_size)
+            if not data:
+                return
+            consumed = 0
+            for kind, start, frame_end in self._frames(data, 0):
+                consumed = frame_end
+                if kind != FRAME_RECORD:
+                    try:
+                        tables.apply(kind, data[start:frame_end])
+                    except (IndexError, ValueError):
+                        continue
+                    if event_id == -1:
+                        event_id = tables.string_ids.get(event_type, -1)
+                    continue
+                try:
+                    record = self.decode(data[start:frame_end], tables, event_id)
+                except (IndexError, ValueError, struct.error):
+                    record = None
+                if record is not None:
+                    yield record, offset + frame_end
+                if end is not None and offset + frame_end >= end:
+                    return
+            if not consumed:
+                if len(data) < chunk_size:
+                    # Yazılmakta olan yarım çerçeve
+                    return
+                # Parçadan büyük tek çerçeve
+                chunk_size *= 2
+                continue
+            offset += consumed
+
+
+CODECS = {"jsonl": JsonlCodec(), "binary": BinaryCodec()}
+
+
+def get_codec(name: str):
+    if name not in CODECS:
+        raise ValueError(f"Bilinmeyen kayıt biçimi: {name}")
+    return CODECS[name]
+
+
+def codec_for_path(path: str):
+    """Uzantıya göre kodlayıcı (.bin ikili, diğerleri JSONL)"""
+    return CODECS["binary"] if path.endswith(BinaryCodec.extension) else CODECS["jsonl"]
+
+
+def iter_file(path: str, event_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    codec = codec_for_path(path)
+    with open(path, 'rb') as f:
+        for record, _ in codec.iter_records(f, event_type=event_type):
+            yield record
+
+
+def convert_file(source: str, target: str) -> int:
+    """Kayıtları kaynağın biçiminden hedefin biçimine (uzantıya göre) akış halinde aktarır"""
+    codec = codec_for_path(target)
+    encoder = codec.encoder()
+    temp_path = f"{target}.tmp.{os.getpid()}"
+    count = 0
+    with open(temp_path, 'wb') as out:
+        out.write(codec.header)
+        for record in iter_file(source):
+            out.write(encoder.encode(record))
+            count += 1
+    os.replace(temp_path, target)
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Kullanım: python record_codec.py <kaynak.jsonl|.bin> <hedef.jsonl|.bin>")
+        sys.exit(1)
+    converted = convert_file(sys.argv[1], sys.argv[2])
+    print(f"{converted:,} kayıt dönüştürüldü: {sys.argv[1]} -> {sys.argv[2]}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Claude Yanıt Önbelleği
+Tekrarlanan durum/kullanım sorguları ve zamanlı prompt'lar için süre sınırlı (TTL),
+boyut sınırlı (LRU) yanıt önbelleği.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """Normalleştirilmiş prompt + executable + çalışma dizini anahtarlı LRU/TTL önbellek"""
+
+    def __init__(self, max_entries: int = 128, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Büyük/küçük harf ve boşluk farklarını yok sayar"""
+        return " ".join(prompt.split()).lower()
+
+    def make_key(self, prompt: str, executable: str, cwd: Optional[str] = None) -> tuple:
+        return (self.normalize_prompt(prompt), executable, os.path.abspath(cwd or os.getcwd()))
+
+    def ttl_for(self, prompt: str) -> float:
+        """Komuta özel TTL; tanımlı değilse varsayılan TTL (0 = önbelleğe alma)"""
+        return self.ttls.get(self.normalize_prompt(prompt), self.default_ttl)
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key: tuple, value: Any, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, key: tuple):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups * 100, 1) if lookups else None
+        return stats
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Veri Saklama ve Sıkıştırma Servisi
+claude_session_data altında biriken dosyaları veri sınıfı başına bir politikaya göre temizler:
+  - max_age_days: bu yaştan eski birimler
+  - keep_last:    en yeni N birimin dışındakiler
+  - max_bytes:    sınıfın toplam boyutu bu sınırı aşıyorsa en eskiler
+  - archive:      silinmeden önce aylık sıkıştırılmış arşive (archive/<sınıf>_YYYY-MM.zip) eklenir
+
+Birim, birlikte silinmesi gereken dosya grubudur (ör. yedek tabanı + delta günlüğü, olay
+segmenti + .idx + .lines). Olay segmentleri EventLog.retire_segments ile kaldırılır; böylece
+manifest ve token checkpoint'i tutarlı kalır. Aktif yedek zinciri (en yeni zincir) ile aktif
+ve en yeni olay segmenti hiç silinmez.
+
+Olay segmentlerini yalnızca olay günlüğüne yazan süreç (ClaudeSessionApp) kaldırır. EventLog
+açılışta manifestle uyuşmayan segmentleri onarır (yarım satırı keser, manifesti yazar); başka
+bir sürecin yazmakta olduğu segmente bunu yapmamak için diğer süreçler include_events=False
+ile çalışır. Aynı veri dizininde iki sürecin çalıştırmaları bir kilit dosyasıyla sıraya girer.
+
+Servis GUI thread'inden bağımsız, düşük öncelikli bir arka plan thread'inde çalışır; her
+çalıştırmanın süresi ve geri kazanılan alan kullanım raporunda gösterilir.
+"""
+
+import copy
+import glob
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from event_log import get_event_log
+
+MB = 1024 * 1024
+
+DEFAULT_POLICIES = {
+    "backups": {"max_age_days": 30, "keep_last": 7, "max_bytes": 200 * MB, "archive": False},
+    "events": {"max_age_days": 90, "keep_last": None, "max_bytes": 256 * MB, "archive": True},
+    "daily_logs": {"max_age_days": 7, "keep_last": None, "max_bytes": None, "archive": True},
+    "exports": {"max_age_days": 90, "keep_last": 20, "max_bytes": None, "archive": False},
+    "archives": {"max_age_days": 365, "keep_last": None, "max_bytes": 1024 * MB, "archive": False},
+}
+
+# Olay günlüğüne aktarılmış eski günlük dosyaları (data_dir'e göre)
+DAILY_LOG_PATTERNS = ("*_????????.json.migrated", "logs/*_????????.json.migrated",
+                      "tokens/*_????????.json.migrated")
+
+# Dışa aktarımlar: (data_dir'e göre mi, glob deseni)
+EXPORT_PATTERNS = (
+    (True, "advanced_schedules_export_*.json"),
+    (False, "chat_export_*.txt"),
+    (False, "work_protocols_*.txt"),
+    (False, "logs_export_*.json"),
+)
+
+BACKUP_PATTERN = re.compile(r"^session_backup_\d{8}_\d{6}(?:_\d{6})?\.json$")
+STAMP_PATTERN = re.compile(r"(\d{8})(?:_(\d{6}))?")
+
+
+def merge_policies(overrides: Optional[Mapping]) -> Dict[str, Dict[str, Any]]:
+    """Varsayılan politikaların üzerine ayarlardaki sınıf bazlı değerleri yazar"""
+    policies = copy.deepcopy(DEFAULT_POLICIES)
+    for name, values in (overrides or {}).items():
+        if name in policies and isinstance(values, Mapping):
+            policies[name].update({key: value for key, value in values.items() if key in policies[name]})
+    return policies
+
+
+def _lower_thread_priority():
+    """Çağıran thread'in CPU önceliğini düşürür (desteklenmiyorsa sessizce geçer)"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), -2)  # THREAD_PRIORITY_LOWEST
+        elif hasattr(os, "setpriority") and hasattr(threading, "get_native_id"):
+            # Linux'ta her thread ayrı bir görevdir; yalnızca bu thread etkilenir
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (OSError, AttributeError):
+        pass
+
+
+def _unit_time(path: str) -> datetime:
+    """Dosya adındaki tarih (YYYYMMDD[_HHMMSS]), yoksa değişiklik zamanı"""
+    match = STAMP_PATTERN.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + (match.group(2) or "000000"), "%Y%m%d%H%M%S")
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def _size(paths: List[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+# Aynı anda tek çalıştırma; çöken bir çalıştırmadan kalan kilit bu süreden sonra geçersiz sayılır
+RUN_LOCK_FILE = ".retention.lock"
+STALE_LOCK_SECONDS = 3600
+
+
+class RetentionService:
+    """Veri sınıfı başına yaş / adet / boyut politikası uygulayan arka plan servisi"""
+
+    def __init__(self, data_dir: str = "claude_session_data", export_dir: str = ".",
+                 policies: Optional[Mapping] = None, interval_hours: float = 24,
+                 initial_delay: float = 300, pause_seconds: float = 0.01, event_log=None,
+                 include_events: bool = True):
+        self.data_dir = data_dir
+        self.export_dir = export_dir
+        self.archive_dir = os.path.join(data_dir, "archive")
+        self.policies = merge_policies(policies)
+        self.interval = timedelta(hours=interval_hours)
+        self.initial_delay = initial_delay
+        self.pause_seconds = pause_seconds
+        self._event_log = event_log
+        self.include_events = include_events
+        self.lock_file = os.path.join(data_dir, RUN_LOCK_FILE)
+
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.stats = {"runs": 0, "last_run": None, "last_duration_ms": None, "last_reclaimed_bytes": 0,
+                      "total_reclaimed_bytes": 0, "removed_files": 0, "archived_files": 0,
+                      "errors": 0, "classes": {}}
+
+    def configure(self, policies: Optional[Mapping] = None,
+                  interval_hours: Optional[float] = None):
+        with self._lock:
+            if policies is not None:
+                self.policies = merge_policies(policies)
+            if interval_hours is not None:
+                self.interval = timedelta(hours=interval_hours)
+
+    # ------------------------------------------------------------------
+    # Birimler (veri sınıfı başına, eskiden yeniye)
+    # ------------------------------------------------------------------
+
+    def _file_units(self, paths) -> List[Dict[str, Any]]:
+        units = []
+        for path in paths:
+            try:
+                units.append({"name": os.path.relpath(path, self.data_dir), "time": _unit_time(path),
+                              "files": [path], "archive_files": [path], "bytes": _size([path])})
+            except OSError:
+                continue
+        return units
+
+    def _backup_units(self) -> List[Dict[str, Any]]:
+        directory = os.path.join(self.data_dir, "backups")
+        if not os.path.isdir(directory):
+            return []
+        units = []
+        for name in os.listdir(directory):
+            if not BACKUP_PATTERN.match(name):
+                continue
+            base = os.path.join(directory, name)
+            files = [base, base[:-len(".json")] + ".deltas.jsonl"]
+            units.append({"name": name, "time": _unit_time(base), "files": files,
+                          "archive_files": files, "bytes": _size(files)})
+        return units
+
+    def _event_units(self) -> List[Dict[str, Any]]:
+        if not self.include_events:
+            # Günlüğün sahibi olmayan süreç EventLog açmaz (açılıştaki onarım yazan süreçle çakışır)
+            return []
+        if self._event_log is None and not os.path.isdir(os.path.join(self.data_dir, "events")):
+            # Olay günlüğü hiç oluşturulmamışsa yalnızca saklama için açılmaz
+            return []
+        event_log = self._event_log or get_event_log()
+        # En yeni segment başka bir süreçte hâlâ aktif olabilir (yeniden açılışta devam edilir)
+        newest = event_log.segments()[-1:]
+        units = []
+        for segment, summary in event_log.sealed_segments():
+            if segment in newest:
+                continue
+            files = event_log.segment_files(segment)
+            path = files[0]
+            # Segment adı açılış zamanıdır; yaş son kayda göre hesaplanır
+            try:
+                last = datetime.fromisoformat(summary["last"]) if summary["last"] else _unit_time(path)
+            except ValueError:
+                last = _unit_time(path)
+            if last.tzinfo is not None:
+                last = last.replace(tzinfo=None)
+            units.append({"name": segment, "time": last, "files": files,
+                          "archive_files": [path], "bytes": _size(files),
+                          "retire": lambda segment=segment: event_log.retire_segments([segment])})
+        return units
+
+    def _units(self, data_class: str) -> List[Dict[str, Any]]:
+        if data_class == "backups":
+            units = self._backup_units()
+        elif data_class == "events":
+            units = self._event_units()
+        elif data_class == "daily_logs":
+            units = self._file_units(path for pattern in DAILY_LOG_PATTERNS
+                                     for path in glob.glob(os.path.join(self.data_dir, pattern)))
+        elif data_class == "exports":
+            units = self._file_units(path for in_data_dir, pattern in EXPORT_PATTERNS
+                                     for path in glob.glob(os.path.join(
+                                         self.data_dir if in_data_dir else self.export_dir, pattern)))
+        elif data_class == "archives":
+            units = self._file_units(glob.glob(os.path.join(self.archive_dir, "*_????-??.zip")))
+        else:
+            units = []
+        return sorted(units, key=lambda unit: (unit["time"], unit["name"]))
+
+    # ------------------------------------------------------------------
+    # Seçim ve uygulama
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def select(units: List[Dict[str, Any]], policy: Dict[str, Any], now: datetime,
+               protect_newest: bool = False) -> List[Dict[str, Any]]:
+        """Politikaya göre kaldırılacak birimler (eskiden yeniye)"""
+        candidates = units[:-1] if protect_newest else list(units)
+        selected = set()
+        if policy.get("max_age_days") is not None:
+            limit = now - timedelta(days=policy["max_age_days"])
+            selected.update(id(unit) for unit in candidates if unit["time"] < limit)
+        if policy.get("keep_last") is not None:
+            excess = len(units) - max(policy["keep_last"], 1 if protect_newest else 0)
+            selected.update(id(unit) for unit in candidates[:max(0, excess)])
+        if policy.get("max_bytes") is not None:
+            remaining = sum(unit["bytes"] for unit in units if id(unit) not in selected)
+            for unit in candidates:
+                if remaining <= policy["max_bytes"]:
+                    break
+                if id(unit) not in selected:
+                    selected.add(id(unit))
+                    remaining -= unit["bytes"]
+        return [unit for unit in units if id(unit) in selected]
+
+    def _archive(self, data_class: str, unit: Dict[str, Any]) -> int:
+        """Birimin dosyalarını aylık zip arşivine ekler; arşivde oluşan bayt artışını döndürür"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"{data_class}_{unit['time'].strftime('%Y-%m')}.zip")
+        before = _size([path])
+        with zipfile.ZipFile(path, 'a', compression=zipfile.ZIP_DEFLATED) as archive:
+            existing = set(archive.namelist())
+            for source in unit["archive_files"]:
+                name = os.path.relpath(source, self.data_dir).replace(os.sep, "/")
+                # Önceki çalıştırma arşivleyip silemeden kesildiyse aynı kayıt tekrar eklenmez
+                if os.path.exists(source) and name not in existing:
+                    archive.write(source, name)
+        return _size([path]) - before
+
+    def _remove(self, unit: Dict[str, Any]) -> int:
+        retire = unit.get("retire")
+        if retire is not None:
+            present = [path for path in unit["files"] if os.path.exists(path)]
+            retire()
+            return sum(1 for path in present if not os.path.exists(path))
+        removed = 0
+        for path in unit["files"]:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _apply(self, policies: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        started = time.monotonic()
+        report = {"reclaimed_bytes": 0, "removed_files": 0, "archived_files": 0, "errors": 0, "classes": {}}
+        for data_class, policy in policies.items():
+            units = self._units(data_class)
+            selected = self.select(units, policy, now, protect_newest=data_class == "backups")
+            summary = {"units": len(units), "bytes": sum(unit["bytes"] for unit in units),
+                       "removed": 0, "reclaimed_bytes": 0}
+            for unit in selected:
+                if self._stopped.is_set():
+                    break
+                try:
+                    grown = self._archive(data_class, unit) if policy.get("archive") else 0
+                    summary["reclaimed_bytes"] += unit["bytes"] - grown
+                    report["removed_files"] += self._remove(unit)
+                    if policy.get("archive"):
+                        report["archived_files"] += len(unit["archive_files"])
+                    summary["removed"] += 1
+                except (OSError, zipfile.BadZipFile) as e:
+                    report["errors"] += 1
+                    print(f"Saklama politikası uygulanamadı ({data_class}/{unit['name']}): {str(e)}")
+                # Düşük öncelik: diğer thread'lere ve diske nefes aldır
+                self._stopped.wait(self.pause_seconds)
+            report["classes"][data_class] = summary
+            report["reclaimed_bytes"] += summary["reclaimed_bytes"]
+        report["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return report
+
+    def _acquire_run_lock(self) -> bool:
+        """Veri dizinindeki kilit dosyasını alır; başka bir süreç çalıştırıyorsa False"""
+        try:
+            if time.time() - os.path.getmtime(self.lock_file) > STALE_LOCK_SECONDS:
+                # Çöken bir çalıştırmadan kalmış
+                os.remove(self.lock_file)
+        except OSError:
+            pass
+        try:
+            fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        except OSError:
+            # Veri dizini yoksa temizlenecek bir şey de yoktur
+            return True
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+
+    def _release_run_lock(self):
+        try:
+            os.remove(self.lock_file)
+        except OSError:
+            pass
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Tüm veri sınıflarına politikaları bir kez uygular ve çalıştırma raporunu döndürür"""
+        now = now or datetime.now()
+        with self._lock:
+            policies = copy.deepcopy(self.policies)
+        if not self.include_events:
+            policies.pop("events", None)
+        with self._run_lock:
+            if not self._acquire_run_lock():
+                print("Saklama servisi: başka bir süreç çalıştırıyor, bu tur atlandı")
+                return {"skipped": True, "reclaimed_bytes": 0, "removed_files": 0, "archived_files": 0,
+                        "errors": 0, "classes": {}}
+            try:
+                report = self._apply(policies, now)
+            finally:
+                self._release_run_lock()
+
+        with self._lock:
+            self.stats["runs"] += 1
+            self.stats["last_run"] = now.isoformat()
+            self.stats["last_duration_ms"] = report["duration_ms"]
+            self.stats["last_reclaimed_bytes"] = report["reclaimed_bytes"]
+            self.stats["total_reclaimed_bytes"] += report["reclaimed_bytes"]
+            self.stats["removed_files"] += report["removed_files"]
+            self.stats["archived_files"] += report["archived_files"]
+            self.stats["errors"] += report["errors"]
+            self.stats["classes"] = report["classes"]
+        return report
+
+    # ------------------------------------------------------------------
+    # Arka plan thread'i
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def request_run(self):
+        """Bir sonraki çalıştırmayı beklemeden başlatır"""
+        self._wake.set()
+
+    def _run(self):
+        _lower_thread_priority()
+        # Açılıştaki yoğun yüklemelerle çakışmasın
+        self._wake.wait(self.initial_delay)
+        self._wake.clear()
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Saklama servisi hatası: {str(e)}")
+            with self._lock:
+                interval = self.interval.total_seconds()
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = copy.deepcopy(self.stats)
+            stats["interval_hours"] = self.interval.total_seconds() / 3600
+            stats["running"] = self._thread is not None and self._thread.is_alive()
+        return stats
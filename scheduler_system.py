@@ -10,10 +10,15 @@ import subprocess
 import win32gui
 import win32api
 import win32con
+from write_behind import get_writer
+from durable_io import atomic_write_json
+from event_log import get_event_log
 
 class ScheduledPromptSystem:
-    def __init__(self, main_monitor):
+    def __init__(self, main_monitor, storage=None):
         self.main_monitor = main_monitor
+        # Verilirse schedule'lar ortak depolama arka ucunda (JSON/SQLite) tutulur
+        self.storage = storage
         self.scheduled_prompts = []
         self.running_schedules = {}
         self.scheduler_thread = None
@@ -471,11 +476,7 @@ class ScheduledPromptSystem:
             'type': schedule_data['type']
         }
         
-        log_file = f"claude_session_data/scheduled_executions_{datetime.datetime.now().strftime('%Y%m%d')}.json"
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            json.dump(log_entry, f, ensure_ascii=False)
-            f.write('\n')
+        get_event_log().append("scheduled_execution", log_entry)
     
     def run_scheduler(self):
         """Ana scheduler döngüsü"""
@@ -545,12 +546,17 @@ class ScheduledPromptSystem:
                     schedule.every().day.at(time_str).do(self.execute_scheduled_prompt, schedule_data)
     
     def save_schedules(self):
+        """Schedule'ları kaydedilecek olarak işaretle (yazım arka planda birleştirilir)"""
+        get_writer().mark_dirty(self.write_schedules)
+    
+    def write_schedules(self):
         """Schedule'ları dosyaya kaydet"""
         try:
-            os.makedirs(os.path.dirname(self.schedules_file), exist_ok=True)
+            if self.storage is not None:
+                self.storage.save_schedules("scheduled_prompts", self.scheduled_prompts)
+                return
             
-            with open(self.schedules_file, 'w', encoding='utf-8') as f:
-                json.dump(self.scheduled_prompts, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self.schedules_file, self.scheduled_prompts)
                 
         except Exception as e:
             self.main_monitor.add_alert('scheduler_error', 
@@ -559,7 +565,9 @@ class ScheduledPromptSystem:
     def load_schedules(self):
         """Schedule'ları dosyadan yükle"""
         try:
-            if os.path.exists(self.schedules_file):
+            if self.storage is not None:
+                self.scheduled_prompts = self.storage.load_schedules("scheduled_prompts")
+            elif os.path.exists(self.schedules_file):
                 with open(self.schedules_file, 'r', encoding='utf-8') as f:
                     self.scheduled_prompts = json.load(f)
         except Exception as e:
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Depolama Katmanı
+Ayarlar, session verisi, kullanım logu, zamanlanmış komutlar ve sohbet geçmişi için
+ortak arayüz. JsonFileStorage mevcut JSON dosyalarını kullanır; SQLiteStorage hepsini
+WAL modunda tek bir veritabanında, indeksli tablolarda ve işlemler (transaction) içinde tutar.
+
+Hangi arka ucun kullanılacağı config.json içindeki "storage_backend" anahtarıyla seçilir
+("json" veya "sqlite"). SQLite ilk kez açıldığında mevcut JSON dosyaları bir kez içe aktarılır.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from chat_store import ChatJournalStore
+from durable_io import atomic_write_json
+
+# JSON arka ucunda belge / zamanlama listesi -> dosya eşlemesi
+DOCUMENT_FILES = {
+    "config": "config.json",
+    "session_data": "session_data.json",
+    "usage_log": "usage_log.json",
+}
+
+SCHEDULE_FILES = {
+    "scheduled_commands": "scheduled_commands.json",
+    "scheduled_prompts": os.path.join("claude_session_data", "scheduled_prompts.json"),
+    "advanced_schedules": os.path.join("claude_session_data", "advanced_schedules.json"),
+}
+
+DEFAULT_USAGE_LOG = {"hourly_reports": [], "daily_summary": {}, "last_check_time": None}
+
+
+class StorageBackend(ABC):
+    """Depolama arka uçlarının ortak arayüzü"""
+
+    @abstractmethod
+    def has_document(self, name: str) -> bool:
+        """Belge daha önce kaydedilmiş mi"""
+
+    @abstractmethod
+    def load_document(self, name: str, default: Any = None) -> Any:
+        """Belgeyi yükler; yoksa default döner"""
+
+    @abstractmethod
+    def save_document(self, name: str, data: Any):
+        """Belgeyi tamamen değiştirerek kaydeder"""
+
+    @abstractmethod
+    def load_schedules(self, owner: str) -> List[Dict[str, Any]]:
+        """owner'a ait zamanlanmış kayıtların listesi"""
+
+    @abstractmethod
+    def save_schedules(self, owner: str, schedules: List[Dict[str, Any]]):
+        """owner'ın zamanlanmış kayıtlarını verilen listeyle değiştirir"""
+
+    @abstractmethod
+    def load_usage_log(self) -> Dict[str, Any]:
+        """Kullanım logu (saatlik raporlar ve günlük özet)"""
+
+    @abstractmethod
+    def append_usage_report(self, report: Dict[str, Any], keep: int = 168):
+        """Saatlik raporu ekler; yalnızca son keep rapor tutulur"""
+
+    @abstractmethod
+    def save_usage_log(self, usage_log: Dict[str, Any]):
+        """Kullanım logunun tamamını kaydeder"""
+
+    @abstractmethod
+    def load_chat(self, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Son limit sohbet kaydı (eskiden yeniye)"""
+
+    @abstractmethod
+    def append_chat(self, entries: List[Dict[str, Any]]):
+        """Yeni sohbet kayıtlarını sona ekler"""
+
+    @abstractmethod
+    def replace_chat(self, entries: List[Dict[str, Any]]):
+        """Sohbet geçmişini verilen kayıtlarla değiştirir"""
+
+    def close(self):
+        pass
+
+
+class JsonFileStorage(StorageBackend):
+    """Mevcut JSON dosya düzenini kullanan arka uç"""
+
+    def __init__(self, base_dir: str = ".", chat_limit: int = 1000):
+        self.base_dir = base_dir
+        self.chat_store = ChatJournalStore(
+            os.path.join(base_dir, "chat_history"),
+            max_entries=chat_limit,
+            legacy_file=os.path.join(base_dir, "chat_history.json")
+        )
+        self._lock = threading.Lock()
+
+    def _path(self, relative: str) -> str:
+        return os.path.join(self.base_dir, relative)
+
+    def _read_json(self, path: str, default: Any) -> Any:
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except OSError:
+            return default
+        except json.JSONDecodeError as e:
+            # Bozuk dosya sessizce varsayılanla ezilmesin, incelemek için kopyası saklanır
+            print(f"{path} okunamadı, varsayılanlar kullanılıyor ({str(e)}); kopyası {path}.corrupt")
+            shutil.copyfile(path, path + ".corrupt")
+            return default
+
+    def _write_json(self, path: str, data: Any):
+        with self._lock:
+            atomic_write_json(path, data)
+
+    def has_document(self, name: str) -> bool:
+        return os.path.exists(self._path(DOCUMENT_FILES.get(name, f"{name}.json")))
+
+    def load_document(self, name, default=None):
+        return self._read_json(self._path(DOCUMENT_FILES.get(name, f"{name}.json")), default)
+
+    def save_document(self, name, data):
+        self._write_json(self._path(DOCUMENT_FILES.get(name, f"{name}.json")), data)
+
+    def load_schedules(self, owner):
+        return self._read_json(self._path(SCHEDULE_FILES.get(owner, f"{owner}.json")), [])
+
+    def save_schedules(self, owner, schedules):
+        self._write_json(self._path(SCHEDULE_FILES.get(owner, f"{owner}.json")), schedules)
+
+    def load_usage_log(self):
+        return self.load_document("usage_log", dict(DEFAULT_USAGE_LOG))
+
+    def append_usage_report(self, report, keep=168):
+        usage_log = self.load_usage_log()
+        usage_log["hourly_reports"] = (usage_log.get("hourly_reports", []) + [report])[-keep:]
+        usage_log["last_check_time"] = report.get("timestamp")
+        self.save_usage_log(usage_log)
+
+    def save_usage_log(self, usage_log):
+        self.save_document("usage_log", usage_log)
+
+    def load_chat(self, limit=1000):
+        return self.chat_store.load()[-limit:]
+
+    def append_chat(self, entries):
+        self.chat_store.append(entries)
+
+    def replace_chat(self, entries):
+        self.chat_store.replace_all(entries)
+
+    def close(self):
+        self.chat_store.close()
+
+
+class SQLiteStorage(StorageBackend):
+    """Tüm verileri WAL modunda tek bir SQLite veritabanında tutan arka uç"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS schedules (
+            owner TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            schedule_id TEXT,
+            time TEXT,
+            enabled INTEGER,
+            data TEXT NOT NULL,
+            PRIMARY KEY (owner, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_schedules_id ON schedules(owner, schedule_id);
+        CREATE TABLE IF NOT EXISTS usage_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            date TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage_reports(timestamp);
+        CREATE TABLE IF NOT EXISTS chat_entries (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            type TEXT,
+            success INTEGER,
+            prompt TEXT,
+            response TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON chat_entries(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_chat_type ON chat_entries(type, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_chat_success ON chat_entries(success, timestamp);
+    """
+
+    def __init__(self, path: str = "claude_session.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Tek bağlantı, thread'ler arasında kilitle paylaşılır
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.RLock()
+
+    def transaction(self):
+        return _Transaction(self)
+
+    def has_document(self, name: str) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone() is not None
+
+    def load_document(self, name, default=None):
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM documents WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def save_document(self, name, data):
+        with self.transaction():
+            self.conn.execute(
+                "INSERT INTO documents (name, data, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (name, json.dumps(data, ensure_ascii=False))
+            )
+
+    def load_schedules(self, owner):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT data FROM schedules WHERE owner = ? ORDER BY position", (owner,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def save_schedules(self, owner, schedules):
+        """Sadece değişen satırları yazar"""
+        with self.transaction():
+            existing = dict(self.conn.execute(
+                "SELECT position, data FROM schedules WHERE owner = ?", (owner,)
+            ).fetchall())
+            for position, item in enumerate(schedules):
+                data = json.dumps(item, ensure_ascii=False)
+                if existing.get(position) == data:
+                    continue
+                schedule_id = item.get("id")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO schedules (owner, position, schedule_id, time, enabled, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (owner, position, str(schedule_id) if schedule_id is not None else None,
+                     item.get("time"), int(bool(item.get("enabled", True))), data)
+                )
+            self.conn.execute("DELETE FROM schedules WHERE owner = ? AND position >= ?", (owner, len(schedules)))
+
+    def load_usage_log(self):
+        usage_log = self.load_document("usage_log", dict(DEFAULT_USAGE_LOG))
+        with self._lock:
+            rows = self.conn.execute("SELECT data FROM usage_reports ORDER BY id").fetchall()
+        usage_log["hourly_reports"] = [json.loads(row[0]) for row in rows]
+        return usage_log
+
+    def append_usage_report(self, report, keep=168):
+        with self.transaction():
+            self.conn.execute(
+                "INSERT INTO usage_reports (timestamp, date, data) VALUES (?, ?, ?)",
+                (report.get("timestamp"), report.get("date"), json.dumps(report, ensure_ascii=False))
+            )
+            self.conn.execute(
+                "DELETE FROM usage_reports WHERE id <= (SELECT MAX(id) FROM usage_reports) - ?", (keep,)
+            )
+            meta = self.load_document("usage_log", dict(DEFAULT_USAGE_LOG))
+            meta.pop("hourly_reports", None)
+            meta["last_check_time"] = report.get("timestamp")
+            self.save_document("usage_log", meta)
+
+    def save_usage_log(self, usage_log):
+        with self.transaction():
+            meta = {k: v for k, v in usage_log.items() if k != "hourly_reports"}
+            self.save_document("usage_log", meta)
+            self.conn.execute("DELETE FROM usage_reports")
+            self.conn.executemany(
+                "INSERT INTO usage_reports (timestamp, date, data) VALUES (?, ?, ?)",
+                [(r.get("timestamp"), r.get("date"), json.dumps(r, ensure_ascii=False))
+                 for r in usage_log.get("hourly_reports", [])]
+            )
+
+    def load_chat(self, limit=1000):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT data FROM chat_entries ORDER BY seq DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def append_chat(self, entries):
+        with self.transaction():
+            self.conn.executemany(
+                "INSERT INTO chat_entries (timestamp, type, success, prompt, response, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [(e.get("timestamp"), e.get("type"), int(bool(e.get("success", True))),
+                  e.get("prompt"), e.get("response"), json.dumps(e, ensure_ascii=False)) for e in entries]
+            )
+
+    def replace_chat(self, entries):
+        with self.transaction():
+            self.conn.execute("DELETE FROM chat_entries")
+            self.append_chat(entries)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class _Transaction:
+    """İç içe kullanılabilen BEGIN/COMMIT bloğu"""
+
+    def __init__(self, storage: SQLiteStorage):
+        self.storage = storage
+        self.outermost = False
+
+    def __enter__(self):
+        self.storage._lock.acquire()
+        if not self.storage.conn.in_transaction:
+            self.storage.conn.execute("BEGIN IMMEDIATE")
+            self.outermost = True
+        return self.storage.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.outermost:
+                self.storage.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.storage._lock.release()
+        return False
+
+
+def import_json_storage(source: JsonFileStorage, target: SQLiteStorage) -> Dict[str, int]:
+    """Mevcut JSON dosyalarını tek bir işlemde SQLite'a aktarır"""
+    counts = {"documents": 0, "schedules": 0, "usage_reports": 0, "chat_entries": 0}
+    with target.transaction():
+        for name in DOCUMENT_FILES:
+            if name == "usage_log" or not source.has_document(name):
+                continue
+            target.save_document(name, source.load_document(name))
+            counts["documents"] += 1
+
+        usage_log = source.load_usage_log()
+        target.save_usage_log(usage_log)
+        counts["usage_reports"] = len(usage_log.get("hourly_reports", []))
+
+        for owner in SCHEDULE_FILES:
+            schedules = source.load_schedules(owner)
+            if schedules:
+                target.save_schedules(owner, schedules)
+                counts["schedules"] += len(schedules)
+
+        chat = source.load_chat(limit=source.chat_store.max_entries)
+        target.append_chat(chat)
+        counts["chat_entries"] = len(chat)
+    return counts
+
+
+def open_storage(config_file: str = "config.json", base_dir: Optional[str] = None) -> StorageBackend:
+    """config.json'daki storage_backend ayarına göre depolama arka ucunu açar"""
+    base_dir = base_dir or os.path.dirname(os.path.abspath(config_file))
+    bootstrap = {}
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                bootstrap = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            bootstrap = {}
+
+    # Sohbet deposu, arşive taşınmayı bekleyen kayıtları da tutacak kadar geniş olmalı
+    chat_limit = bootstrap.get("chat_hot_entries", 1000) + 2 * bootstrap.get("chat_archive_block_entries", 200)
+    json_storage = JsonFileStorage(base_dir, chat_limit=chat_limit)
+    if bootstrap.get("storage_backend", "json") != "sqlite":
+        return json_storage
+
+    sqlite_storage = SQLiteStorage(os.path.join(base_dir, bootstrap.get("storage_path", "claude_session.db")))
+    if not sqlite_storage.has_document("config"):
+        counts = import_json_storage(json_storage, sqlite_storage)
+        print(f"JSON verileri SQLite'a aktarıldı: {counts}")
+    json_storage.close()
+    return sqlite_storage
@@ -7,6 +7,8 @@ Yeni eklenen özelliklerin doğru çalışıp çalışmadığını test eder.
 import json
 import os
 import sys
+import tempfile
+import time
 from datetime import datetime
 from claude_session_manager import ClaudeSessionManager, ScheduledCommand
 
@@ -157,6 +159,1156 @@ def test_data_structures():
     
     return True
 
+FAKE_CLAUDE_SCRIPT = '''#!/usr/bin/env python3
+import json, sys
+if "--input-format" not in sys.argv:
+    text = "tek seferlik: " + sys.argv[-1]
+    if "stream-json" not in sys.argv:
+        print(text)
+        sys.exit(0)
+    for word in text.split(" "):
+        delta = {"type": "content_block_delta", "delta": {"type": "text_delta", "text": word + " "}}
+        print(json.dumps({"type": "stream_event", "event": delta}), flush=True)
+    print(json.dumps({"type": "result", "is_error": False, "result": text}), flush=True)
+    sys.exit(0)
+for line in sys.stdin:
+    msg = json.loads(line)
+    text = msg["message"]["content"][0]["text"]
+    print(json.dumps({"type": "result", "is_error": False, "result": "yanit: " + text}), flush=True)
+'''
+
+def create_fake_claude(directory):
+    """Test için sahte `claude` executable'ı oluştur (sadece Linux/macOS)"""
+    path = os.path.join(directory, "claude")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(FAKE_CLAUDE_SCRIPT)
+    os.chmod(path, 0o755)
+    return path
+
+def test_worker_pool():
+    """Sıcak worker havuzunu sahte claude ile test et"""
+    print("Worker havuzu test ediliyor...")
+    
+    if os.name == 'nt':
+        print("   Sahte claude scripti Windows'ta desteklenmiyor, atlandı")
+        return True
+    
+    from claude_worker_pool import ClaudeWorkerPool
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pool = ClaudeWorkerPool(create_fake_claude(tmp_dir), size=2, max_requests=2)
+        try:
+            responses = [pool.execute(f"prompt {i}", timeout=10) for i in range(5)]
+            health = pool.get_health()
+        finally:
+            pool.shutdown()
+    
+    ok = all(r.returncode == 0 and r.stdout == f"yanit: prompt {i}" for i, r in enumerate(responses))
+    print(f"   Yanitlar: {'BASARILI' if ok else 'BASARISIZ'}")
+    print(f"   Havuz: {health['total_requests']} istek, {health['recycles']} geri donusum, {health['spawned']} worker")
+    
+    # Varsayılan: her istek yeni bir oturumda; başlatılamayan worker havuzu kalıcı küçültmez
+    from claude_worker_pool import WorkerPoolError
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        executable = create_fake_claude(tmp_dir)
+        pool = ClaudeWorkerPool(executable, size=1, acquire_timeout=2)
+        try:
+            pool.execute("ilk", timeout=10)
+            pool.execute("ikinci", timeout=10)
+            fresh_ok = pool.get_health()["recycles"] == 2 and pool.get_health()["spawned"] == 3
+            
+            # Boştaki worker ölür ve yerine yenisi başlatılamaz: ham OSError değil WorkerPoolError
+            pool.executable = os.path.join(tmp_dir, "olmayan-claude")
+            with pool._lock:
+                idle_worker = next(iter(pool._workers.values()))
+            idle_worker.process.kill()
+            idle_worker.process.wait()
+            failures = []
+            for _ in range(2):
+                try:
+                    pool.execute("hata", timeout=10)
+                except WorkerPoolError:
+                    failures.append(True)
+            pool.executable = executable
+            recovered = pool.execute("geri geldi", timeout=10)
+            spawn_ok = failures == [True, True] and recovered.stdout == "yanit: geri geldi"
+        finally:
+            pool.shutdown()
+    print(f"   Istek basina yeni oturum: {'BASARILI' if fresh_ok else 'BASARISIZ'}")
+    print(f"   Baslatma hatasi ve yeniden doldurma: {'BASARILI' if spawn_ok else 'BASARISIZ'}")
+    
+    return ok and health['recycles'] >= 2 and fresh_ok and spawn_ok
+
+def test_streaming_output():
+    """Akış modunda yanıtın parça parça geldiğini sahte claude ile test et"""
+    print("Akis modu test ediliyor...")
+    
+    if os.name == 'nt':
+        print("   Sahte claude scripti Windows'ta desteklenmiyor, atlandı")
+        return True
+    
+    from prompt_dispatcher import AsyncPromptDispatcher
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        executable = create_fake_claude(tmp_dir)
+        
+        def build(prompt, output_format):
+            cmd = [executable, "--print"]
+            if output_format == "stream-json":
+                cmd += ["--output-format", "stream-json"]
+            return cmd + [prompt]
+        
+        dispatcher = AsyncPromptDispatcher(build, max_in_flight=2)
+        chunks = []
+        try:
+            streamed = dispatcher.run("merhaba dunya", timeout=10, on_chunk=chunks.append)
+            plain = dispatcher.run("merhaba", timeout=10)
+        finally:
+            dispatcher.shutdown()
+    
+    ok = streamed.stdout == "tek seferlik: merhaba dunya" and len(chunks) == 4
+    print(f"   Akis: {len(chunks)} parca - {'BASARILI' if ok else 'BASARISIZ'}")
+    plain_ok = plain.stdout.strip() == "tek seferlik: merhaba"
+    print(f"   Duz metin: {'BASARILI' if plain_ok else 'BASARISIZ'}")
+    
+    return ok and plain_ok
+
+def test_response_cache():
+    """Yanıt önbelleğinin TTL ve LRU davranışını test et"""
+    print("Yanit onbellegi test ediliyor...")
+    
+    import time
+    from response_cache import ResponseCache
+    
+    cache = ResponseCache(max_entries=2, ttls={"/status": 0.2})
+    status_key = cache.make_key("/STATUS ", "claude")
+    cache.put(status_key, (True, "durum"), cache.ttl_for("/status"))
+    
+    hit_ok = cache.get(cache.make_key("/status", "claude")) == (True, "durum")
+    print(f"   Normallestirilmis anahtar: {'BASARILI' if hit_ok else 'BASARISIZ'}")
+    
+    time.sleep(0.25)
+    ttl_ok = cache.get(status_key) is None
+    print(f"   TTL dolumu: {'BASARILI' if ttl_ok else 'BASARISIZ'}")
+    
+    for prompt in ("a", "b", "c"):
+        cache.put(cache.make_key(prompt, "claude"), (True, prompt), 60)
+    lru_ok = cache.get(cache.make_key("a", "claude")) is None and cache.get(cache.make_key("c", "claude")) == (True, "c")
+    print(f"   LRU cikarma: {'BASARILI' if lru_ok else 'BASARISIZ'}")
+    
+    stats = cache.get_stats()
+    print(f"   Istatistik: {stats['hits']} isabet, {stats['misses']} iska, {stats['evictions']} cikarma")
+    
+    return hit_ok and ttl_ok and lru_ok and stats['evictions'] == 1
+
+def test_batch_submission():
+    """Toplu prompt gönderiminin sıralı sonuç ve tek kayıt yazımını test et"""
+    print("Toplu prompt gonderimi test ediliyor...")
+    
+    if os.name == 'nt':
+        print("   Sahte claude scripti Windows'ta desteklenmiyor, atlandı")
+        return True
+    
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            manager = ClaudeSessionManager()
+            manager.save_config({"claude_executable": create_fake_claude(tmp_dir),
+                                 "auto_response_enabled": False})
+            
+            completed = []
+            prompts = [f"toplu {i}" for i in range(5)]
+            report = manager.submit_batch(prompts, max_parallel=3, on_result=completed.append).result(timeout=30)
+            history = list(manager.chat_history)
+            manager.shutdown()
+        finally:
+            os.chdir(original_dir)
+    
+    ordered = [r["index"] for r in report["results"]] == list(range(5))
+    responses_ok = all(r["success"] and r["response"].strip() == f"tek seferlik: toplu {r['index']}" for r in report["results"])
+    print(f"   Sirali sonuclar: {'BASARILI' if ordered and responses_ok else 'BASARISIZ'}")
+    print(f"   Geri cagirma: {len(completed)} sonuc")
+    history_ok = len(history) == 5 and all(e["type"] == "batch" for e in history)
+    print(f"   Sohbet kaydi: {'BASARILI' if history_ok else 'BASARISIZ'}")
+    print(f"   Toplam sure: {report['wall_time']}s, gecikme toplami: {report['total_latency']}s")
+    
+    return ordered and responses_ok and len(completed) == 5 and history_ok
+
+def test_auto_response_conversation():
+    """Otomatik yanıt zincirinin oturum devamı ve adım sınırını test et"""
+    print("Otomatik yanit zinciri test ediliyor...")
+    
+    import subprocess
+    from conversation_engine import AutoResponseConversation
+    
+    calls = []
+    
+    def run_prompt(prompt, timeout, resume):
+        calls.append(resume)
+        result = subprocess.CompletedProcess([], 0, "1. evet\n2. hayir", "")
+        result.session_id = "oturum-1"
+        return result
+    
+    # Oturum kimliği bilinmeyen ilk adım --continue ile değil, devam bayrağı olmadan gider
+    
+    conversation = AutoResponseConversation(
+        run_prompt,
+        analyze=lambda text: {"has_choices": True},
+        choose=lambda analysis: "1" if analysis.get("has_choices") else None,
+        max_hops=3
+    )
+    chain = conversation.run({"has_choices": True})
+    
+    resume_ok = calls == [None, "oturum-1", "oturum-1"]
+    print(f"   Oturum devami: {'BASARILI' if resume_ok else 'BASARISIZ'}")
+    limit_ok = chain["stopped_reason"] == "max_hops" and len(chain["hops"]) == 3
+    print(f"   Adim siniri: {'BASARILI' if limit_ok else 'BASARISIZ'}")
+    
+    return resume_ok and limit_ok and all("latency" in hop for hop in chain["hops"])
+
+def test_code_executor():
+    """Kod bloklarının paralel ve sıralı sonuçla çalıştırılmasını test et"""
+    print("Paralel kod calistirici test ediliyor...")
+    
+    import time
+    from code_executor import CodeBlockExecutor
+    
+    executor = CodeBlockExecutor(["python"], max_parallel=4, block_timeout=10, total_timeout=20)
+    blocks = [{"language": "python", "code": f"import time\ntime.sleep(0.5)\nprint('blok {i}')"} for i in range(4)]
+    blocks.append({"language": "ruby", "code": "puts 1"})
+    
+    start = time.monotonic()
+    results = executor.run_blocks(blocks)
+    elapsed = time.monotonic() - start
+    
+    ordered = [r.output.strip() for r in results[:4]] == [f"blok {i}" for i in range(4)]
+    print(f"   Sirali sonuclar: {'BASARILI' if ordered else 'BASARISIZ'}")
+    print(f"   Paralel calisma: {elapsed:.2f}s")
+    denied = results[4].status == "denied"
+    print(f"   Izinsiz dil: {'BASARILI' if denied else 'BASARISIZ'}")
+    
+    
+    # Fork sunucusu başlatılamazsa blok yeni süreçte çalışır; istek iletildikten sonra
+    # yanıt gelmezse blok ikinci kez çalıştırılmaz
+    from python_fork_server import ForkServerError, ForkServerReplyError
+    
+    class FailingRunner:
+        def __init__(self, error):
+            self.error = error
+        
+        def run(self, code, timeout, cwd, max_output):
+            raise self.error
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        marker = os.path.join(tmp_dir, "calisti.txt")
+        block = [{"language": "python", "code": f"open({marker!r}, 'a').write('x')\nprint('yedek')"}]
+        fallback = CodeBlockExecutor(["python"], python_runner=FailingRunner(ForkServerError("baslatilamadi")))
+        fallback_result = fallback.run_blocks(block)[0]
+        no_reply = CodeBlockExecutor(["python"], python_runner=FailingRunner(ForkServerReplyError("yanit yok")))
+        no_reply_result = no_reply.run_blocks(block)[0]
+        with open(marker, 'r', encoding='utf-8') as f:
+            runs = f.read()
+    fallback_ok = (fallback_result.status == "ok" and fallback_result.output.strip() == "yedek"
+                   and no_reply_result.status == "error" and runs == "x")
+    print(f"   Fork sunucusu yedegi: {'BASARILI' if fallback_ok else 'BASARISIZ'}")
+    
+    # Sonsuz çıktı üreten blok zaman aşımını beklemeden, bellekte biriktirilmeden durdurulur
+    flood = CodeBlockExecutor(["python"], block_timeout=20, total_timeout=30, max_output_chars=1000)
+    start = time.monotonic()
+    flood_result = flood.run_blocks([{"language": "python", "code": "while True:\n    print('x' * 100)"}])[0]
+    flood_ok = (flood_result.status == "error" and time.monotonic() - start < 10
+                and len(flood_result.output) < 1200 and "sınırı aşıldı" in flood_result.output)
+    print(f"   Cikti siniri: {'BASARILI' if flood_ok else 'BASARISIZ'} ({flood_result.wall_time}s)")
+    
+    return ordered and denied and elapsed < 2.0 and fallback_ok and flood_ok
+
+def test_python_fork_server():
+    """Fork sunucusunda Python kod parçası çalıştırmayı test et"""
+    print("Python fork sunucusu test ediliyor...")
+    
+    from python_fork_server import PythonForkServer
+    
+    if not PythonForkServer.is_supported():
+        print("   Fork bu platformda desteklenmiyor, atlandı")
+        return True
+    
+    server = PythonForkServer()
+    try:
+        ok_reply = server.run("print('merhaba')", timeout=5)
+        error_reply = server.run("import sys\nsys.exit(3)", timeout=5)
+        timeout_reply = server.run("import time\ntime.sleep(5)", timeout=0.5)
+    finally:
+        server.shutdown()
+    
+    ok = ok_reply["exit_code"] == 0 and ok_reply["stdout"] == "merhaba\n"
+    print(f"   Cikti: {'BASARILI' if ok else 'BASARISIZ'}")
+    exit_ok = error_reply["exit_code"] == 3
+    print(f"   Cikis kodu: {'BASARILI' if exit_ok else 'BASARISIZ'}")
+    timeout_ok = timeout_reply["timed_out"]
+    print(f"   Zaman asimi: {'BASARILI' if timeout_ok else 'BASARISIZ'}")
+    
+    return ok and exit_ok and timeout_ok
+
+def test_health_prober():
+    """Sağlık denetçisinin uyarlanabilir aralığını ve önbelleğini test et"""
+    print("Claude saglik denetcisi test ediliyor...")
+    
+    if os.name == 'nt':
+        print("   Sahte claude scripti Windows'ta desteklenmiyor, atlandı")
+        return True
+    
+    from claude_health import ClaudeHealthProber
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        executable = [create_fake_claude(tmp_dir)]
+        prober = ClaudeHealthProber(lambda: executable[0], min_interval=1, max_interval=4)
+        
+        prober.probe_now()
+        prober.probe_now()
+        healthy_ok = prober.is_available() is True and prober.interval == 2
+        print(f"   Saglikli araligi: {prober.interval}s - {'BASARILI' if healthy_ok else 'BASARISIZ'}")
+        
+        executable[0] = os.path.join(tmp_dir, "olmayan-claude")
+        unknown_ok = prober.is_available() is None
+        status = prober.probe_now()
+        failure_ok = not status["available"] and prober.interval == 1 and prober.is_available() is False
+        print(f"   Hata sonrasi: {status['error']} - {'BASARILI' if unknown_ok and failure_ok else 'BASARISIZ'}")
+    
+    return healthy_ok and unknown_ok and failure_ok
+
+def test_chat_journal_store():
+    """Sohbet günlüğünün taşıma, yarım satır ve sıkıştırma davranışını test et"""
+    print("Sohbet gunlugu test ediliyor...")
+    
+    from chat_store import ChatJournalStore
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base = os.path.join(tmp_dir, "chat_history")
+        legacy = base + ".json"
+        with open(legacy, 'w', encoding='utf-8') as f:
+            json.dump([{"prompt": f"eski {i}", "response": "yanit"} for i in range(3)], f)
+        
+        store = ChatJournalStore(base, max_entries=5, compact_after=100, legacy_file=legacy)
+        migrated_ok = len(store.load()) == 3 and not os.path.exists(legacy)
+        print(f"   Eski dosya tasima: {'BASARILI' if migrated_ok else 'BASARISIZ'}")
+        
+        store.append([{"prompt": "yeni 1"}])
+        store.close()
+        # Yazma sırasında çökmeyi taklit et
+        with open(store.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"prompt": "yari')
+        
+        store = ChatJournalStore(base, max_entries=5, compact_after=100, legacy_file=legacy)
+        prompts = [e["prompt"] for e in store.load()]
+        torn_ok = prompts == ["eski 0", "eski 1", "eski 2", "yeni 1"]
+        print(f"   Yarim satir toleransi: {'BASARILI' if torn_ok else 'BASARISIZ'}")
+        
+        store.append([{"prompt": "yeni 2"}, {"prompt": "yeni 3"}])
+        store.compact()
+        store.close()
+        prompts = [e["prompt"] for e in ChatJournalStore(base, max_entries=5).load()]
+        compact_ok = prompts == ["eski 1", "eski 2", "yeni 1", "yeni 2", "yeni 3"]
+        print(f"   Sikistirma: {'BASARILI' if compact_ok else 'BASARISIZ'} ({len(prompts)} kayit)")
+    
+    return migrated_ok and torn_ok and compact_ok
+
+def test_sqlite_storage():
+    """JSON dosyalarının SQLite'a aktarılmasını ve SQLite arka ucunu test et"""
+    print("SQLite depolama test ediliyor...")
+    
+    from storage import JsonFileStorage, SQLiteStorage, open_storage
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = JsonFileStorage(tmp_dir)
+        source.save_document("config", {"storage_backend": "sqlite", "check_interval_minutes": 5})
+        source.save_schedules("scheduled_commands", [{"time": "09:00", "command": "/status"}])
+        source.save_schedules("scheduled_prompts", [{"id": 1, "prompt": "merhaba"}])
+        source.append_usage_report({"timestamp": "2024-01-01T10:00:00", "date": "2024-01-01"})
+        source.append_chat([{"prompt": f"soru {i}", "type": "manual", "success": True} for i in range(3)])
+        source.close()
+        
+        storage = open_storage(os.path.join(tmp_dir, "config.json"))
+        import_ok = (isinstance(storage, SQLiteStorage)
+                     and storage.load_document("config")["check_interval_minutes"] == 5
+                     and storage.load_schedules("scheduled_prompts")[0]["prompt"] == "merhaba"
+                     and len(storage.load_usage_log()["hourly_reports"]) == 1
+                     and [e["prompt"] for e in storage.load_chat()] == ["soru 0", "soru 1", "soru 2"])
+        print(f"   JSON iceri aktarma: {'BASARILI' if import_ok else 'BASARISIZ'}")
+        
+        storage.append_chat([{"prompt": "soru 3", "type": "batch", "success": False}])
+        storage.save_schedules("scheduled_commands", [{"time": "10:00", "command": "/usage"}])
+        for hour in range(5):
+            storage.append_usage_report({"timestamp": f"2024-01-01T1{hour}:30:00"}, keep=3)
+        storage.close()
+        
+        storage = open_storage(os.path.join(tmp_dir, "config.json"))
+        chat = storage.load_chat(limit=2)
+        reports = storage.load_usage_log()["hourly_reports"]
+        reopen_ok = ([e["prompt"] for e in chat] == ["soru 2", "soru 3"]
+                     and storage.load_schedules("scheduled_commands")[0]["command"] == "/usage"
+                     and len(reports) == 3 and reports[-1]["timestamp"] == "2024-01-01T14:30:00")
+        print(f"   Yeniden acma: {'BASARILI' if reopen_ok else 'BASARISIZ'}")
+        storage.close()
+    
+    return import_ok and reopen_ok
+
+def test_chat_search_index():
+    """Sohbet arama indeksinin önek, ifade ve filtre sorgularını test et"""
+    print("Sohbet arama indeksi test ediliyor...")
+    
+    from chat_search import ChatSearchIndex
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = ChatSearchIndex(os.path.join(tmp_dir, "chat_search.db"))
+        index.add([
+            {"timestamp": "2024-01-01T10:00:00", "type": "manual", "prompt": "Sunucu ayarları",
+             "response": "Sunucu yapılandırması tamamlandı"},
+            {"timestamp": "2024-01-02T10:00:00", "type": "batch", "prompt": "Test çalıştır",
+             "response": "Birim testleri başarılı"},
+            {"timestamp": "2024-01-03T10:00:00", "type": "batch", "prompt": "Sunucu logları",
+             "response": "Yapılandırma hatası bulundu"},
+        ])
+        
+        def prompts(query):
+            return [hit["prompt"] for hit in index.search(query)["hits"]]
+        
+        prefix_ok = sorted(prompts("sunu")) == ["Sunucu ayarları", "Sunucu logları"]
+        phrase_ok = prompts('"sunucu yapılandırması"') == ["Sunucu ayarları"]
+        filter_ok = (prompts("yapılandırma type:batch") == ["Sunucu logları"]
+                     and prompts("sunucu until:2024-01-01") == ["Sunucu ayarları"]
+                     and prompts("type:batch since:2024-01-02") == ["Sunucu logları", "Test çalıştır"])
+        snippet_ok = "[" in index.search("testleri")["hits"][0]["response_snippet"]
+        print(f"   Onek arama: {'BASARILI' if prefix_ok else 'BASARISIZ'}")
+        print(f"   Ifade arama: {'BASARILI' if phrase_ok else 'BASARISIZ'}")
+        print(f"   Tur/tarih filtresi: {'BASARILI' if filter_ok else 'BASARISIZ'}")
+        print(f"   Snippet: {'BASARILI' if snippet_ok else 'BASARISIZ'}")
+        
+        index.rebuild([])
+        rebuild_ok = index.count() == 0 and prompts("sunucu") == []
+        print(f"   Yeniden kurma: {'BASARILI' if rebuild_ok else 'BASARISIZ'}")
+        index.close()
+    
+    return prefix_ok and phrase_ok and filter_ok and snippet_ok and rebuild_ok
+
+def test_write_behind():
+    """Geciktirmeli yazıcının birleştirme, debounce ve eşik davranışını test et"""
+    print("Geciktirmeli yazma test ediliyor...")
+    
+    from write_behind import WriteBehindWriter
+    
+    writes = []
+    writer = WriteBehindWriter(debounce_seconds=0.2, max_delay_seconds=1, max_pending=50)
+    
+    def write_a():
+        writes.append("a")
+    
+    def write_b():
+        writes.append("b")
+    
+    for _ in range(10):
+        writer.mark_dirty(write_a)
+    writer.mark_dirty(write_b)
+    deferred_ok = writes == []
+    time.sleep(0.5)
+    debounce_ok = sorted(writes) == ["a", "b"]
+    print(f"   Ertelenmis yazim: {'BASARILI' if deferred_ok else 'BASARISIZ'}")
+    print(f"   Debounce sonrasi tek yazim: {'BASARILI' if debounce_ok else 'BASARISIZ'} {writes}")
+    
+    stats = writer.get_stats()
+    ratio_ok = stats["marks"] == 11 and stats["writes"] == 2 and stats["coalescing_ratio"] == 5.5
+    print(f"   Birlestirme orani: {'BASARILI' if ratio_ok else 'BASARISIZ'} ({stats['coalescing_ratio']})")
+    
+    # İlk turdan sonra boşta bekleyen thread, eşiğe ulaşmayan tek işaretle de uyanmalı
+    writer.mark_dirty(write_b)
+    time.sleep(0.5)
+    second_cycle_ok = writes.count("b") == 2
+    print(f"   Ikinci debounce turu: {'BASARILI' if second_cycle_ok else 'BASARISIZ'} {writes}")
+    
+    # Eşik aşılınca debounce beklenmeden yazılır
+    writer.configure(debounce_seconds=5, max_delay_seconds=10, max_pending=3)
+    for _ in range(3):
+        writer.mark_dirty(write_a)
+    time.sleep(0.2)
+    threshold_ok = writes.count("a") == 2
+    print(f"   Esik tetiklemesi: {'BASARILI' if threshold_ok else 'BASARISIZ'}")
+    
+    # Kapanışta bekleyenler yazılır
+    writer.mark_dirty(write_b)
+    writer.close()
+    close_ok = writes.count("b") == 3 and writer.get_stats()["pending"] == 0
+    print(f"   Kapanista yazim: {'BASARILI' if close_ok else 'BASARISIZ'}")
+    
+    return deferred_ok and debounce_ok and ratio_ok and second_cycle_ok and threshold_ok and close_ok
+
+def test_durable_io():
+    """Atomik yazım ve grup commit davranışını test et"""
+    print("Dayanikli yazma test ediliyor...")
+    
+    import durable_io
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "config.json")
+        durable_io.atomic_write_json(path, {"surum": 1})
+        
+        # Serileştirme hatası mevcut dosyayı bozmamalı
+        try:
+            durable_io.atomic_write_json(path, {"hatali": object()})
+        except TypeError:
+            pass
+        with open(path, 'r', encoding='utf-8') as f:
+            intact_ok = json.load(f) == {"surum": 1}
+        print(f"   Hata sonrasi eski dosya korunur: {'BASARILI' if intact_ok else 'BASARISIZ'}")
+        
+        cycles_before = durable_io.get_stats()["fsync_cycles"]
+        with durable_io.group_commit():
+            for i in range(3):
+                durable_io.atomic_write_json(os.path.join(tmp_dir, f"veri_{i}.json"), {"i": i})
+            durable_io.atomic_write_json(path, {"surum": 2})
+            durable_io.atomic_write_json(path, {"surum": 3})
+            with open(path, 'r', encoding='utf-8') as f:
+                deferred_ok = json.load(f) == {"surum": 1}
+        with open(path, 'r', encoding='utf-8') as f:
+            committed_ok = json.load(f) == {"surum": 3}
+        single_cycle_ok = durable_io.get_stats()["fsync_cycles"] == cycles_before + 1
+        no_temp_ok = not [name for name in os.listdir(tmp_dir) if ".tmp." in name]
+        
+        group_ok = deferred_ok and committed_ok and single_cycle_ok and no_temp_ok
+        print(f"   Grup commit (tek fsync turu): {'BASARILI' if group_ok else 'BASARISIZ'}")
+    
+    return intact_ok and group_ok
+
+def test_chat_archive():
+    """Sohbet arşivinin bloklu yazım ve aralık okumasını test et"""
+    print("Sohbet arsivi test ediliyor...")
+    
+    from chat_archive import ChatArchive
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = ChatArchive(os.path.join(tmp_dir, "chat_archive"), block_entries=50)
+        entries = [{"timestamp": f"2024-0{1 + i // 150}-{1 + (i % 150) // 6:02d}T{i % 6:02d}:00:00",
+                    "prompt": f"soru {i}"} for i in range(300)]
+        archive.archive(entries[:200])
+        archive.archive(entries[200:])
+        
+        stats = archive.get_stats()
+        layout_ok = stats["segments"] == 2 and stats["entries"] == 300 and stats["blocks"] == 6
+        print(f"   Aylik segment/blok: {'BASARILI' if layout_ok else 'BASARISIZ'} {stats['segments']} segment, {stats['blocks']} blok")
+        
+        # Sadece aralığa düşen bloklar açılır
+        opened = []
+        read_block = archive.read_block
+        archive.read_block = lambda partition, block: opened.append(block) or read_block(partition, block)
+        ranged = list(archive.iter_entries(since="2024-02-03", until="2024-02-04T99"))
+        range_ok = ([e["prompt"] for e in ranged] == [f"soru {i}" for i in range(162, 174)]
+                    and len(opened) == 1)
+        print(f"   Aralik okuma: {'BASARILI' if range_ok else 'BASARISIZ'} ({len(ranged)} kayit, {len(opened)} blok)")
+        archive.read_block = read_block
+        
+        newest = next(archive.iter_entries(reverse=True))
+        reverse_ok = newest["prompt"] == "soru 299"
+        print(f"   Ters okuma: {'BASARILI' if reverse_ok else 'BASARISIZ'}")
+        
+        # İndekse girmemiş yarım blok (çökme) sonraki yazımları bozmamalı
+        with open(archive.segment_path("2024-02"), 'ab') as f:
+            f.write(b"yarim blok")
+        archive.archive([{"timestamp": "2024-02-28T00:00:00", "prompt": "son"}])
+        reopened = ChatArchive(os.path.join(tmp_dir, "chat_archive"), block_entries=50)
+        crash_ok = reopened.count() == 301 and next(reopened.iter_entries(reverse=True))["prompt"] == "son"
+        print(f"   Yarim blok toleransi: {'BASARILI' if crash_ok else 'BASARISIZ'}")
+        
+        # Yeniden açılışta depodan gelen, arşive zaten taşınmış kayıtlar ayıklanır
+        hot = [{"timestamp": "2024-02-28T00:00:00", "prompt": "son"},
+               {"timestamp": "2024-03-01T00:00:00", "prompt": "yeni 1"},
+               {"timestamp": "2024-03-01T00:01:00", "prompt": "yeni 2"}]
+        tail_ok = ([e["prompt"] for e in reopened.unarchived_tail(entries[-2:] + hot)] == ["yeni 1", "yeni 2"]
+                   and reopened.unarchived_tail(hot[1:]) == hot[1:])
+        print(f"   Arsivlenmis kayitlari ayiklama: {'BASARILI' if tail_ok else 'BASARISIZ'}")
+    
+    return layout_ok and range_ok and reverse_ok and crash_ok and tail_ok
+
+def test_token_checkpoint():
+    """Token checkpoint'inin yalnızca yeni baytları okumasını ve tam taramayla tutarlılığını test et"""
+    print("Token checkpoint test ediliyor...")
+    from token_tracker import TokenTracker
+    from event_log import EventLog
+    from write_behind import get_writer
+    
+    class Monitor:
+        sessions = {}
+        def add_alert(self, *args, **kwargs):
+            pass
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        token_dir = os.path.join(tmp_dir, "tokens")
+        log = EventLog(os.path.join(tmp_dir, "events"))
+        tracker = TokenTracker(Monitor(), token_dir, log)
+        tracker.load_token_data()
+        for i in range(30):
+            tracker.track_token_usage(f"session_{i % 3}", f"mesaj {i} " * (i + 1), "user_prompt")
+        get_writer().flush()
+        
+        # Başka yazıcılar günlüğe olay ekledi; yarım kalmış bir satır da var
+        now = datetime.now().isoformat()
+        _, before = log.append("prompt", {"timestamp": now, "session_id": "session_x",
+                                          "type": "user_prompt", "content": "merhaba"})
+        extra = {"timestamp": now, "session_id": "session_x",
+                 "message_type": "claude_response", "estimated_tokens": 7, "explicit_tokens": 5}
+        segment, after = log.append("token_usage", extra)
+        log.close()
+        with open(os.path.join(log.directory, segment), 'a', encoding='utf-8') as f:
+            f.write('{"timestamp": "yarim')
+        
+        reopened = TokenTracker(Monitor(), token_dir, log)
+        reopened.load_token_data()
+        incremental_ok = (not reopened.load_stats["rescan"] and reopened.load_stats["entries"] == 1
+                          and reopened.load_stats["bytes_parsed"] == after - tracker.file_offsets[segment])
+        print(f"   Sadece yeni baytlar: {'BASARILI' if incremental_ok else 'BASARISIZ'} {reopened.load_stats}")
+        
+        os.remove(reopened.checkpoint_file)
+        full = TokenTracker(Monitor(), token_dir, log)
+        full.load_token_data()
+        same_ok = (full.load_stats["rescan"] and full.session_tokens == reopened.session_tokens
+                   and full.daily_limits == reopened.daily_limits
+                   and full.session_tokens["session_x"]["total_explicit"] == 5
+                   and sum(s["message_count"] for s in full.session_tokens.values()) == 31
+                   and len(full.token_estimates) == 31)
+        print(f"   Tam tarama ile ayni toplamlar: {'BASARILI' if same_ok else 'BASARISIZ'}")
+        
+        # Periyot özetleri saat/gün rollup'larından gelir
+        today = datetime.now().strftime('%Y-%m-%d')
+        day_summary = full.usage_since(today)
+        hour_summary = full.usage_since(today, full.hourly_usage)
+        rollup_ok = (day_summary['message_count'] == 31 and day_summary['sessions']['session_x'] == 7
+                     and day_summary['message_types'] == {"user_prompt": 30, "claude_response": 1}
+                     and hour_summary['estimated_tokens'] == day_summary['estimated_tokens']
+                     and full.usage_since("9999")['message_count'] == 0)
+        print(f"   Saat/gun rollup ozetleri: {'BASARILI' if rollup_ok else 'BASARISIZ'}")
+        
+        # Saatlik kovalar yalnızca son günler için tutulur; eskiler checkpoint'e taşınmaz
+        from datetime import timedelta
+        old_stamp = (datetime.now() - timedelta(days=5)).isoformat()
+        full.apply_token_entry({"session_id": "eski", "timestamp": old_stamp, "estimated_tokens": 3})
+        skipped_ok = old_stamp[:10] in full.daily_limits and old_stamp[:13] not in full.hourly_usage
+        full.hourly_usage[old_stamp[:13]] = {"estimated_tokens": 3, "explicit_tokens": 0, "message_count": 1,
+                                             "message_types": {}, "sessions": {"eski": 3}}
+        full.write_checkpoint()
+        pruned = TokenTracker(Monitor(), token_dir, log)
+        pruned.load_token_data()
+        prune_ok = (skipped_ok and old_stamp[:10] in pruned.daily_limits and old_stamp[:13] not in pruned.hourly_usage
+                    and pruned.usage_since(today, pruned.hourly_usage)['message_count'] == 31)
+        print(f"   Eski saatlik kovalar: {'BASARILI' if prune_ok else 'BASARISIZ'}")
+    
+    return incremental_ok and same_ok and rollup_ok and prune_ok
+
+def test_incremental_backup():
+    """Artımlı yedeklemenin delta yazımını, zamana göre geri yüklemeyi ve saklamayı test et"""
+    print("Artimli yedekleme test ediliyor...")
+    from datetime import timedelta
+    from backup_engine import IncrementalBackup
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = datetime(2024, 1, 1, 12, 0, 0)
+        engine = IncrementalBackup(tmp_dir, full_interval_hours=1, keep_chains=2, max_age_days=30)
+        state = {"sessions": {f"s{i}": {"status": "active", "start_time": start} for i in range(50)},
+                 "prompt_logs": [{"text": f"prompt {i}" * 20} for i in range(200)], "alerts": []}
+        base = engine.backup(state, start)
+        
+        state["prompt_logs"].append({"text": "yeni prompt"})
+        state["sessions"]["s3"]["status"] = "closed"
+        delta = engine.backup(state, start + timedelta(minutes=5))
+        unchanged = engine.backup(state, start + timedelta(minutes=10))
+        state["alerts"].append({"type": "limit"})
+        del state["sessions"]["s4"]
+        engine.backup(state, start + timedelta(minutes=15))
+        size_ok = (base["kind"] == "base" and delta["kind"] == "delta" and unchanged["kind"] == "none"
+                   and delta["bytes"] * 20 < base["bytes"])
+        print(f"   Sadece degisiklikler yazildi: {'BASARILI' if size_ok else 'BASARISIZ'} ({base['bytes']} / {delta['bytes']} bayt)")
+        
+        # Yeniden başlatılan motor aynı zinciri sürdürür, istenen ana geri yükler
+        engine = IncrementalBackup(tmp_dir, full_interval_hours=1, keep_chains=2, max_age_days=30)
+        resumed = engine.backup(state, start + timedelta(minutes=20))
+        mid = engine.restore(start + timedelta(minutes=7))
+        latest = engine.restore()
+        restore_ok = (resumed["kind"] == "none" and len(mid["prompt_logs"]) == 201 and mid["alerts"] == []
+                      and mid["sessions"]["s3"]["status"] == "closed" and "s4" in mid["sessions"]
+                      and "s4" not in latest["sessions"] and latest["alerts"] == [{"type": "limit"}])
+        print(f"   Zamana gore geri yukleme: {'BASARILI' if restore_ok else 'BASARISIZ'}")
+        
+        # Her saat yeni taban; en yeni 2 zincir kalır
+        for hour in range(1, 4):
+            state["prompt_logs"].append({"text": f"saat {hour}"})
+            engine.backup(state, start + timedelta(hours=hour))
+        chains = engine.chains()
+        retention_ok = (len(chains) == 2 and chains[0]["time"] == start + timedelta(hours=2)
+                        and len(engine.restore()["prompt_logs"]) == 204)
+        print(f"   Saklama politikasi: {'BASARILI' if retention_ok else 'BASARISIZ'}")
+        
+        # Yarım satırla biten delta dosyası devam ettirilirken sonraki deltalar kaybolmamalı
+        state["prompt_logs"].append({"text": "delta 1"})
+        engine.backup(state, start + timedelta(hours=3, minutes=5))
+        with open(chains[-1]["deltas"], 'a', encoding='utf-8') as f:
+            f.write('{"append": {"prompt_logs": [{"te')
+        engine = IncrementalBackup(tmp_dir, full_interval_hours=1, keep_chains=2, max_age_days=30)
+        kinds = []
+        for minute in (10, 15):
+            state["prompt_logs"].append({"text": f"dakika {minute}"})
+            kinds.append(engine.backup(state, start + timedelta(hours=3, minutes=minute))["kind"])
+        restored = [item["text"] for item in engine.restore()["prompt_logs"][-3:]]
+        torn_ok = kinds == ["delta", "delta"] and restored == ["delta 1", "dakika 10", "dakika 15"]
+        print(f"   Yarim delta satiri: {'BASARILI' if torn_ok else 'BASARISIZ'} {restored}")
+    
+    return size_ok and restore_ok and retention_ok and torn_ok
+
+def test_event_log():
+    """Olay günlüğünün segment rotasyonunu, seyrek indeksle aralık sorgusunu ve kurtarmayı test et"""
+    print("Olay gunlugu test ediliyor...")
+    from datetime import timedelta
+    from event_log import EventLog, migrate_legacy_logs
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log = EventLog(os.path.join(tmp_dir, "events"), segment_max_bytes=20000, index_interval=16)
+        start = datetime(2024, 1, 1)
+        for i in range(600):
+            log.append("limit_warning" if i % 3 == 0 else "prompt", {
+                "timestamp": start + timedelta(minutes=10 * i),
+                "session_id": f"s{i % 2}", "type": "warning_80", "content": "x" * 40, "message": f"olay {i}"})
+        
+        typed_ok = False
+        try:
+            log.append("limit_warning", {"timestamp": start.isoformat(), "session_id": "s0"})
+        except ValueError:
+            typed_ok = True
+        
+        # s0'ın 2. güne ait limit uyarıları: ilgisiz segmentler ve indeks öncesi baytlar okunmaz
+        read_from = []
+        read_segment = log.read_segment
+        log.read_segment = lambda segment, offset=0, end=None, event_type=None: \
+            read_from.append((segment, offset)) or read_segment(segment, offset, end, event_type)
+        hits = list(log.query("limit_warning", "s0", since=start + timedelta(days=2), until=start + timedelta(days=3)))
+        log.read_segment = read_segment
+        expected = [f"olay {i}" for i in range(600) if i % 6 == 0 and 288 <= i <= 432]
+        query_ok = ([h["message"] for h in hits] == expected and len(log.segments()) > 3
+                    and len(read_from) < len(log.segments()) and any(offset > 0 for _, offset in read_from))
+        print(f"   Tipli kayit ve aralik sorgusu: {'BASARILI' if typed_ok and query_ok else 'BASARISIZ'} "
+              f"({len(hits)} kayit, {len(read_from)}/{len(log.segments())} segment)")
+        
+        # Çökme: manifest yazılmadan kalan yarım satır açılışta kırpılır
+        active = log.segments()[-1]
+        log.close()
+        with open(os.path.join(log.directory, active), 'a', encoding='utf-8') as f:
+            f.write('{"event": "prompt", "timesta')
+        reopened = EventLog(os.path.join(tmp_dir, "events"), segment_max_bytes=20000, index_interval=16)
+        reopened.append("prompt", {"timestamp": start + timedelta(days=10), "session_id": "s9",
+                                   "type": "user_prompt", "content": "son"})
+        recovered_ok = (reopened.get_stats()["events"] == 601
+                        and [r["content"] for r in reopened.query(session_id="s9")] == ["son"])
+        
+        # Eski günlük dosyaları tek seferde aktarılır
+        with open(os.path.join(tmp_dir, "confirmations_20231231.json"), 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"timestamp": "2023-12-31T10:00:00", "session_id": "s0",
+                                "message": "devam?", "status": "pending"}) + "\n")
+            # Zamanı çözülemeyen satır aktarımı (ve uygulama açılışını) durdurmamalı
+            f.write(json.dumps({"timestamp": "15/01/2024 10:00", "session_id": "s0",
+                                "message": "bozuk", "status": "pending"}) + "\n")
+        migrated = migrate_legacy_logs(reopened, tmp_dir)
+        reopened.append("prompt", {"timestamp": start + timedelta(days=10, minutes=1), "session_id": "s9",
+                                   "type": "user_prompt", "content": "aktarim sonrasi"})
+        migrate_ok = (migrated == 2 and os.path.exists(os.path.join(tmp_dir, "confirmations_20231231.json.migrated"))
+                      and [r["message"] for r in reopened.query("confirmation")] == ["devam?"]
+                      and [r["content"] for r in reopened.query(session_id="s9")] == ["son", "aktarim sonrasi"])
+        reopened.close()
+        print(f"   Kurtarma ve eski gunluk aktarimi: {'BASARILI' if recovered_ok and migrate_ok else 'BASARISIZ'}")
+    
+    return typed_ok and query_ok and recovered_ok and migrate_ok
+
+def test_jsonl_reader():
+    """mmap JSONL okuyucunun sondan okumasını ve satır tablosu önbelleğini test et"""
+    print("JSONL okuyucu test ediliyor...")
+    from jsonl_reader import JsonlReader
+    from event_log import EventLog
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "log.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(1000):
+                f.write(json.dumps({"event": "prompt" if i % 2 else "token_usage", "n": i}) + "\n")
+            f.write('{"event": "prompt", "n": 10')  # yarım son satır
+        
+        with JsonlReader(path) as reader:
+            tail = reader.tail(200)
+            reverse = [r["n"] for r in reader.iter_reverse(b'"token_usage"')][:3]
+            read_ok = (len(reader) == 1000 and [r["n"] for r in tail] == list(range(800, 1000))
+                       and reverse == [998, 996, 994])
+        print(f"   Son kayitlar ve ters okuma: {'BASARILI' if read_ok else 'BASARISIZ'}")
+        
+        # Dosya büyüdüğünde tablo yeniden çıkarılmaz, yalnızca yeni satırlar eklenir
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('01}\n' + json.dumps({"event": "prompt", "n": 1002}) + "\n")
+        with JsonlReader(path) as reader:
+            cache_ok = len(reader) == 1002 and [r["n"] for r in reader.tail(2)] == [1001, 1002]
+        with open(path + ".lines", 'rb') as f:
+            cache_ok = cache_ok and len(f.read()) == 32 + 8 * 1002
+        print(f"   Satir tablosu onbellegi: {'BASARILI' if cache_ok else 'BASARISIZ'}")
+        
+        log = EventLog(os.path.join(tmp_dir, "events"), segment_max_bytes=20000)
+        for i in range(500):
+            log.append("prompt", {"timestamp": datetime(2024, 1, 1).isoformat(), "session_id": f"s{i % 2}",
+                                  "type": "user_prompt", "content": f"p{i}"})
+        recent = log.recent(5, "prompt", session_id="s1")
+        log.close()
+        recent_ok = [r["content"] for r in recent] == ["p491", "p493", "p495", "p497", "p499"]
+        print(f"   Olay gunlugu son kayitlari: {'BASARILI' if recent_ok else 'BASARISIZ'}")
+    
+    return read_ok and cache_ok and recent_ok
+
+def test_retention_service():
+    """Saklama servisinin sınıf politikalarını, aylık arşivlemeyi ve token checkpoint tutarlılığını test et"""
+    print("Saklama servisi test ediliyor...")
+    import zipfile
+    from datetime import timedelta
+    from event_log import EventLog
+    from retention_service import RetentionService
+    from token_tracker import TokenTracker
+    from write_behind import get_writer
+    
+    class Monitor:
+        sessions = {}
+        def add_alert(self, *args, **kwargs):
+            pass
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = os.path.join(tmp_dir, "claude_session_data")
+        backups = os.path.join(data_dir, "backups")
+        os.makedirs(backups)
+        now = datetime(2024, 6, 15, 12, 0)
+        for day in range(10):
+            stamp = (now - timedelta(days=day)).strftime('%Y%m%d_%H%M%S_%f')
+            with open(os.path.join(backups, f"session_backup_{stamp}.json"), 'w', encoding='utf-8') as f:
+                f.write("{}")
+        for day in (1, 2, 3, 20):
+            with open(os.path.join(data_dir, f"confirmations_{(now - timedelta(days=day)).strftime('%Y%m%d')}.json.migrated"),
+                      'w', encoding='utf-8') as f:
+                f.write(json.dumps({"message": "devam?"}) + "\n")
+        
+        # Eski token kayıtları ayrı bir segmentte, checkpoint bunları da kapsıyor
+        log = EventLog(os.path.join(data_dir, "events"))
+        old = now - timedelta(days=120)
+        old_segment = log.import_records("token_usage", [
+            {"timestamp": (old + timedelta(minutes=i)).isoformat(), "session_id": "eski",
+             "message_type": "user_prompt", "estimated_tokens": 10} for i in range(5)])
+        tracker = TokenTracker(Monitor(), os.path.join(data_dir, "tokens"), log)
+        tracker.load_token_data()
+        tracker.track_token_usage("yeni", "merhaba dunya", "user_prompt")
+        get_writer().flush()
+        
+        service = RetentionService(data_dir, export_dir=tmp_dir, event_log=log, pause_seconds=0)
+        report = service.run_once(now)
+        remaining = sorted(os.listdir(backups))
+        archive = os.path.join(data_dir, "archive", f"daily_logs_{(now - timedelta(days=20)).strftime('%Y-%m')}.zip")
+        policy_ok = (len(remaining) == 7 and remaining[-1].startswith(f"session_backup_{now.strftime('%Y%m%d')}")
+                     and report["classes"]["daily_logs"]["removed"] == 1 and os.path.exists(archive)
+                     and zipfile.ZipFile(archive).namelist() == [f"confirmations_{(now - timedelta(days=20)).strftime('%Y%m%d')}.json.migrated"])
+        print(f"   Sinif politikalari ve aylik arsiv: {'BASARILI' if policy_ok else 'BASARISIZ'}")
+        
+        # Segment yan dosyalarıyla kalktı; checkpoint yeniden taranmadan eski toplamları korur
+        events_dir = os.path.join(data_dir, "events")
+        reopened = TokenTracker(Monitor(), os.path.join(data_dir, "tokens"), log)
+        reopened.load_token_data()
+        events_ok = (old_segment not in log.segments() and old_segment not in log.manifest
+                     and not any(name.startswith(old_segment[:-len(".jsonl")]) for name in os.listdir(events_dir))
+                     and not reopened.load_stats["rescan"]
+                     and reopened.session_tokens["eski"]["total_estimated"] == 50)
+        print(f"   Olay segmenti ve token checkpoint'i: {'BASARILI' if events_ok else 'BASARISIZ'}")
+        
+        stats = service.get_stats()
+        stats_ok = (stats["runs"] == 1 and stats["last_reclaimed_bytes"] == report["reclaimed_bytes"]
+                    and stats["removed_files"] == report["removed_files"] == 3 + 1 + 2
+                    and stats["last_duration_ms"] is not None)
+        print(f"   Rapor istatistikleri: {'BASARILI' if stats_ok else 'BASARISIZ'}")
+        
+        # Günlüğün sahibi olmayan süreç yazılmakta olan segmente ve manifeste dokunmaz
+        active = os.path.join(events_dir, log.segments()[-1])
+        with open(active, 'ab') as f:
+            f.write(b'{"timestamp": "yazilmakta')
+        manifest_file = os.path.join(events_dir, "segments.json")
+        with open(manifest_file, 'rb') as f:
+            manifest_before = f.read()
+        size_before = os.path.getsize(active)
+        other = RetentionService(data_dir, export_dir=tmp_dir, pause_seconds=0, include_events=False)
+        other_report = other.run_once(now)
+        with open(manifest_file, 'rb') as f:
+            foreign_ok = ("events" not in other_report["classes"] and os.path.getsize(active) == size_before
+                          and f.read() == manifest_before)
+        
+        # Başka bir sürecin çalıştırması sürerken tur atlanır
+        with open(other.lock_file, 'w') as f:
+            f.write("12345")
+        locked_report = other.run_once(now)
+        os.remove(other.lock_file)
+        lock_ok = locked_report.get("skipped") is True and other.get_stats()["runs"] == 1
+        print(f"   Surecler arasi ayrim: {'BASARILI' if foreign_ok and lock_ok else 'BASARISIZ'}")
+        log.close()
+    
+    return policy_ok and events_ok and stats_ok and foreign_ok and lock_ok
+
+def test_record_codec():
+    """İkili kayıt biçiminin kayıpsızlığını, dönüştürücüleri ve olay günlüğünde kullanımını test et"""
+    print("Kayit kodlayicisi test ediliyor...")
+    from datetime import timedelta
+    from event_log import EventLog
+    from record_codec import convert_file, iter_file
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = datetime(2024, 3, 1, 9, 30)
+        records = []
+        for i in range(300):
+            records.append({"timestamp": (start + timedelta(seconds=i, microseconds=i * 7)).isoformat(),
+                            "session_id": f"s{i % 3}", "message_type": "user_prompt", "text_length": i * 40,
+                            "estimated_tokens": i * 10, "explicit_tokens": None if i % 2 else i,
+                            "text_preview": f"Türkçe önizleme {i} ğüşiöç", "event": "token_usage"})
+        records.append({"timestamp": "dun", "ratio": 0.25, "big": 2 ** 40, "flag": True, "extra": {"a": [1, 2]}})
+        jsonl_path = os.path.join(tmp_dir, "log.jsonl")
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        bin_path = os.path.join(tmp_dir, "log.bin")
+        back_path = os.path.join(tmp_dir, "back.jsonl")
+        converted = convert_file(jsonl_path, bin_path)
+        convert_file(bin_path, back_path)
+        with open(jsonl_path, 'rb') as a, open(back_path, 'rb') as b:
+            lossless_ok = converted == len(records) and list(iter_file(bin_path)) == records and a.read() == b.read()
+        smaller = os.path.getsize(bin_path) < os.path.getsize(jsonl_path) * 0.6
+        print(f"   Kayipsiz donusum: {'BASARILI' if lossless_ok and smaller else 'BASARISIZ'} "
+              f"({os.path.getsize(jsonl_path):,} -> {os.path.getsize(bin_path):,} bayt)")
+        
+        # İkili segmentler: indeksle ortadan okuma, yeniden açılışta devam, yarım çerçeve kurtarma
+        events_dir = os.path.join(tmp_dir, "events")
+        log = EventLog(events_dir, segment_max_bytes=4000, index_interval=8, codec="binary")
+        for i in range(200):
+            log.append("prompt", {"timestamp": start + timedelta(minutes=i), "session_id": f"s{i % 2}",
+                                  "type": "user_prompt", "content": f"prompt {i}"})
+        log.close()
+        with open(os.path.join(events_dir, log.segments()[-1]), 'ab') as f:
+            f.write(b"R\x40yarim")
+        log = EventLog(events_dir, segment_max_bytes=4000, index_interval=8, codec="binary")
+        log.append("limit_warning", {"timestamp": start + timedelta(minutes=300), "session_id": "s1",
+                                     "type": "warning_80", "message": "uyari"})
+        log.set_codec("jsonl")
+        log.append("prompt", {"timestamp": start + timedelta(minutes=301), "session_id": "s1",
+                              "type": "user_prompt", "content": "jsonl"})
+        hits = [r["content"] for r in log.query("prompt", "s1", since=start + timedelta(minutes=150))]
+        recent = [r["content"] for r in log.recent(3, "prompt")]
+        segments = log.segments()
+        log.close()
+        binary_ok = (hits == [f"prompt {i}" for i in range(151, 200, 2)] + ["jsonl"]
+                     and recent == ["prompt 198", "prompt 199", "jsonl"]
+                     and segments[-1].endswith(".jsonl") and all(name.endswith(".bin") for name in segments[:-1])
+                     and [r["message"] for r in log.query("limit_warning")] == ["uyari"])
+        print(f"   Ikili olay gunlugu segmentleri: {'BASARILI' if binary_ok else 'BASARISIZ'} ({len(segments)} segment)")
+    
+    return lossless_ok and smaller and binary_ok
+
+def test_pattern_engine():
+    """Ortak desen motorunun tek tek re.finditer ile aynı sonucu verdiğini ve ön filtreyi test et"""
+    print("Desen motoru test ediliyor...")
+    import re
+    from pattern_engine import PatternEngine
+    from token_tracker import TokenTracker
+    from event_log import EventLog
+    
+    class Monitor:
+        sessions = {}
+        def add_alert(self, *args, **kwargs):
+            pass
+    
+    groups = {
+        'onay': ([r'(?i)(yes|no).*\?', r'(?i)do you want.*\?', r'(?i)(1|2|3).*(?:option|choice|select)'],
+                 re.MULTILINE | re.DOTALL),
+        'zaman': ([r'(?i)until.*(\d{1,2}:\d{2}).*(?:limit|reset)', r'(\d+).*minutes?.*remaining'], re.IGNORECASE),
+        'metin': ({'token_usage': r'.*(token.*usage|usage.*token|tokens.*used).*',
+                   'user_prompt': r'(?:Human:|User:)\s*(.*?)(?=(?:Assistant:|Claude:|\n\n|$))'},
+                  re.IGNORECASE | re.DOTALL),
+    }
+    engine = PatternEngine()
+    for topic, (patterns, flags) in groups.items():
+        engine.register_group(topic, patterns, flags)
+    
+    texts = ["Do you want to continue? yes", "USER: merhaba\n\nAssistant: selam", "3 options, choice?",
+             "limit until 14:30, reset soon. 25 minutes remaining", "tokens used: 120, token usage ok",
+             "sıradan bir metin", ""]
+    same_ok = True
+    for text in texts:
+        expected = []
+        for topic, (patterns, flags) in groups.items():
+            items = patterns.items() if isinstance(patterns, dict) else enumerate(patterns)
+            for key, pattern in items:
+                expected += [(topic, str(key), m.span(), m.groups()) for m in re.finditer(pattern, text, flags)]
+        got = [(m.topic, m.key, m.match.span(), m.match.groups()) for m in engine.scan(text)]
+        same_ok = same_ok and got == expected
+    print(f"   finditer ile ayni sonuc: {'BASARILI' if same_ok else 'BASARISIZ'}")
+    
+    # Anahtar kelimesi geçmeyen metinde hiçbir desen çalışmaz; aboneler başka konunun taramasından beslenir
+    engine.stats.update(patterns_run=0, patterns_skipped=0)
+    engine.scan("tamamen alakasiz bir satir " * 100)
+    skipped_ok = engine.stats['patterns_run'] == 0 and engine.stats['patterns_skipped'] == 7
+    received = []
+    engine.subscribe('zaman', lambda matches, context: received.append((context, [m.value for m in matches])))
+    onay = engine.scan("until 9:15 limit. Do you want?", ('onay',), context="pencere-1")
+    dispatch_ok = ([m.key for m in onay] == ['1'] and received == [("pencere-1", ["9:15"])]
+                   and engine.stats['patterns_run'] == 2)
+    print(f"   On filtre ve aboneler: {'BASARILI' if skipped_ok and dispatch_ok else 'BASARISIZ'} {engine.get_stats()}")
+    
+    # Listeden çıkarılan desen konudan silinir; dedektör paylaşılan motorla eski sonucu verir
+    engine.register_group('onay', [r'(?i)do you want.*\?'], re.MULTILINE | re.DOTALL)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracker = TokenTracker(Monitor(), os.path.join(tmp_dir, "tokens"), EventLog(os.path.join(tmp_dir, "events")))
+        explicit = [tracker.extract_explicit_tokens(text) for text in
+                    ("Toplam: 1520 tokens used", "Tokens remaining: 800", "total tokens 42", "token yok")]
+        tracker.event_log.close()
+    detector_ok = (list(engine.patterns('onay')) == ['onay.0'] and explicit == [1520, 800, 42, None])
+    print(f"   Dedektor entegrasyonu: {'BASARILI' if detector_ok else 'BASARISIZ'} {explicit}")
+    
+    return same_ok and skipped_ok and dispatch_ok and detector_ok
+
+def test_config_service():
+    """config.json'un canlı yeniden yüklenmesini ve doğrulamayı test et"""
+    print("Ayar servisi test ediliyor...")
+    
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            manager = ClaudeSessionManager()
+            notified = []
+            manager.config_service.subscribe(lambda old, new, changed: notified.append(changed))
+            
+            immutable_ok = False
+            try:
+                manager.config["start_time"] = "09:00"
+            except TypeError:
+                immutable_ok = True
+            print(f"   Degistirilemez goruntu: {'BASARILI' if immutable_ok else 'BASARISIZ'}")
+            
+            # Zamanlama yeniden kurulumu ayar izleyicisinde değil zamanlayıcı thread'inde yapılır
+            import threading
+            manager.start_scheduler()
+            armed_by = []
+            arm_schedule = manager.arm_schedule
+            manager.arm_schedule = lambda: armed_by.append(threading.current_thread()) or arm_schedule()
+            
+            # Başka bir süreç dosyayı elle düzenliyor
+            with open("config.json", 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data["start_time"] = "09:30"
+            data["session_interval_hours"] = "6"
+            with open("config.json", 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            deadline = time.time() + 5
+            while not notified and time.time() < deadline:
+                time.sleep(0.05)
+            reload_ok = (manager.config["start_time"] == "09:30" and manager.config["session_interval_hours"] == 6
+                         and any("start_time" in changed for changed in notified))
+            print(f"   Elle duzenleme algilandi: {'BASARILI' if reload_ok else 'BASARISIZ'}")
+            while not armed_by and time.time() < deadline + 3:
+                time.sleep(0.05)
+            manager.stop_scheduler()
+            rearm_ok = armed_by == [manager.scheduler_thread]
+            print(f"   Zamanlayici thread'inde yeniden kurulum: {'BASARILI' if rearm_ok else 'BASARISIZ'}")
+            
+            # Geçersiz değer varsayılana döner, yarım yazılmış dosya önceki görüntüyü korur
+            manager.save_config({"start_time": "25:99"})
+            invalid_ok = manager.config["start_time"] == "08:00" and manager.config.errors
+            manager.config_service.stop()
+            with open("config.json", 'w', encoding='utf-8') as f:
+                f.write('{"start_time": ')
+            kept_ok = not manager.config_service.reload() and manager.config["session_interval_hours"] == 6
+            print(f"   Gecersiz deger reddedildi: {'BASARILI' if invalid_ok and kept_ok else 'BASARISIZ'}")
+            manager.shutdown()
+        finally:
+            os.chdir(original_dir)
+    
+    return immutable_ok and reload_ok and bool(invalid_ok) and kept_ok and rearm_ok
+
+def test_lazy_chat_history():
+    """Sohbet geçmişinin tembel yüklenmesini, sayfalamayı ve akışlı export'u test et"""
+    print("Tembel sohbet gecmisi test ediliyor...")
+    
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            with open("config.json", 'w', encoding='utf-8') as f:
+                json.dump({"chat_hot_entries": 5, "chat_archive_block_entries": 3}, f)
+            
+            # Çalışma dizinindeki eski arama indeksi veri dizinine taşınır
+            from chat_search import ChatSearchIndex
+            legacy = ChatSearchIndex("chat_search.db")
+            legacy.add([{"timestamp": "2024-01-01T00:00:00", "prompt": "eski indeks", "response": "", "type": "manual"}])
+            legacy.close()
+            
+            manager = ClaudeSessionManager()
+            index_ok = (not os.path.exists("chat_search.db")
+                        and os.path.exists(os.path.join("claude_session_data", "chat_search.db"))
+                        and len(manager.search_chat_history("eski")["hits"]) == 1)
+            print(f"   Arama indeksi veri dizininde: {'BASARILI' if index_ok else 'BASARISIZ'}")
+            lazy_ok = manager._chat_history is None
+            for i in range(20):
+                manager.add_chat_entry(f"soru {i}", f"yanit {i}")
+            print(f"   Acilista yukleme yok: {'BASARILI' if lazy_ok else 'BASARISIZ'}")
+            
+            first = manager.get_chat_page(0, 4)
+            crossing = manager.get_chat_page(6, 6)
+            page_ok = ([e["prompt"] for e in first["entries"]] == ["soru 19", "soru 18", "soru 17", "soru 16"]
+                       and [e["prompt"] for e in crossing["entries"]] == [f"soru {i}" for i in range(13, 7, -1)]
+                       and first["total"] == 20 and manager.chat_archive.count() > 0)
+            print(f"   Sayfalama (sicak + arsiv): {'BASARILI' if page_ok else 'BASARISIZ'}")
+            
+            count = manager.export_chat_history("export.txt")
+            with open("export.txt", 'r', encoding='utf-8') as f:
+                exported = [line for line in f if line.startswith("Prompt: ")]
+            export_ok = count == 20 and exported[0] == "Prompt: soru 0\n" and exported[-1] == "Prompt: soru 19\n"
+            print(f"   Akisli export: {'BASARILI' if export_ok else 'BASARISIZ'}")
+            manager.shutdown()
+            
+            # Yeniden açılışta arşive taşınmış kayıtlar tekrar arşivlenmemeli
+            manager = ClaudeSessionManager()
+            page = manager.get_chat_page(0, 50)
+            prompts = [e["prompt"] for e in page["entries"]]
+            reopen_ok = prompts == [f"soru {i}" for i in range(19, -1, -1)] and page["total"] == 20
+            print(f"   Yeniden acilis: {'BASARILI' if reopen_ok else 'BASARISIZ'}")
+            manager.shutdown()
+            
+            # Geçmiş hiç yüklenmeden yapılan eklemeler yeniden başlatmalar boyunca birikse de,
+            # bir bloktan büyük tek bir toplu ekleme gelse de kayıt kaybolmamalı
+            for run in range(8):
+                manager = ClaudeSessionManager()
+                manager.add_chat_entries([manager.make_chat_entry(f"soru {20 + 2 * run + i}", "yanit") for i in range(2)])
+                manager.shutdown()
+            manager = ClaudeSessionManager()
+            manager.add_chat_entries([manager.make_chat_entry(f"soru {36 + i}", "yanit") for i in range(10)])
+            manager.shutdown()
+            manager = ClaudeSessionManager()
+            page = manager.get_chat_page(0, 100)
+            prompts = [e["prompt"] for e in page["entries"]]
+            restart_ok = prompts == [f"soru {i}" for i in range(45, -1, -1)] and page["total"] == 46
+            print(f"   Yuklenmeden eklemeler: {'BASARILI' if restart_ok else 'BASARISIZ'} ({len(prompts)} kayit)")
+            
+            # Geçmişi temizlemek arşivi de siler; yeniden açılışta hiçbir kayıt dönmez
+            manager.clear_chat_history()
+            cleared = manager.get_chat_page(0, 100)["total"] == 0 and manager.export_chat_history("bos.txt") == 0
+            manager.shutdown()
+            manager = ClaudeSessionManager()
+            clear_ok = (cleared and manager.get_chat_page(0, 100)["total"] == 0
+                        and not manager.search_chat_history("soru")["hits"])
+            print(f"   Gecmisi temizleme: {'BASARILI' if clear_ok else 'BASARISIZ'}")
+            manager.shutdown()
+        finally:
+            os.chdir(original_dir)
+    
+    return index_ok and lazy_ok and page_ok and export_ok and reopen_ok and restart_ok and clear_ok
+
 def main():
     """Ana test fonksiyonu"""
     print("Claude Session Manager Ozellik Testi Baslatiliyor...\n")
@@ -167,6 +1319,29 @@ def main():
         ("Zamanlı Komutlar", test_scheduled_commands),
         ("Özel Komutlar", test_special_commands),
         ("Kullanım Loglama", test_usage_logging),
+        ("Worker Havuzu", test_worker_pool),
+        ("Akış Modu", test_streaming_output),
+        ("Yanıt Önbelleği", test_response_cache),
+        ("Toplu Gönderim", test_batch_submission),
+        ("Otomatik Yanıt Zinciri", test_auto_response_conversation),
+        ("Paralel Kod Çalıştırma", test_code_executor),
+        ("Python Fork Sunucusu", test_python_fork_server),
+        ("Sağlık Denetçisi", test_health_prober),
+        ("Sohbet Günlüğü", test_chat_journal_store),
+        ("SQLite Depolama", test_sqlite_storage),
+        ("Sohbet Arama İndeksi", test_chat_search_index),
+        ("Geciktirmeli Yazma", test_write_behind),
+        ("Dayanıklı Yazma", test_durable_io),
+        ("Sohbet Arşivi", test_chat_archive),
+        ("Tembel Sohbet Geçmişi", test_lazy_chat_history),
+        ("Ayar Servisi", test_config_service),
+        ("Token Checkpoint", test_token_checkpoint),
+        ("Artımlı Yedekleme", test_incremental_backup),
+        ("Olay Günlüğü", test_event_log),
+        ("JSONL Okuyucu", test_jsonl_reader),
+        ("Saklama Servisi", test_retention_service),
+        ("Kayıt Kodlayıcısı", test_record_codec),
+        ("Desen Motoru", test_pattern_engine),
     ]
     
     results = []
@@ -41,21 +41,17 @@ def test_claude_executable():
     """Claude komutunun çalışıp çalışmadığını kontrol et"""
     print("\nClaude executable kontrol ediliyor...")
     try:
-        result = subprocess.run(['claude', '--version'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            version = result.stdout.strip()
-            print(f"OK Claude Code bulundu - {version}")
+        from claude_health import ClaudeHealthProber
+        status = ClaudeHealthProber('claude').probe_now()
+        if status["available"]:
+            print(f"OK Claude Code bulundu - {status['version']} ({status['latency_ms']} ms)")
             return True
+        elif not status["present"]:
+            print("HATA Claude komutu bulunamadı - PATH'te tanımlı değil")
+            return False
         else:
-            print(f"HATA Claude komutu hata verdi: {result.stderr}")
+            print(f"HATA Claude komutu hata verdi: {status['error']}")
             return False
-    except subprocess.TimeoutExpired:
-        print("HATA Claude komutu zaman aşımına uğradı")
-        return False
-    except FileNotFoundError:
-        print("HATA Claude komutu bulunamadı - PATH'te tanımlı değil")
-        return False
     except Exception as e:
         print(f"HATA Claude komutu test edilemedi: {e}")
         return False
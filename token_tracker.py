@@ -1,5 +1,6 @@
 import re
 import json
+import copy
 import datetime
 import threading
 import time
@@ -7,13 +8,36 @@ import os
 from collections import defaultdict, deque
 import tkinter as tk
 from tkinter import ttk, messagebox
+from durable_io import atomic_write_json
+from write_behind import get_writer
+from event_log import get_event_log
+from pattern_engine import get_pattern_engine
+
+# Checkpoint biçimi değişirse eski checkpoint yok sayılır ve olay günlüğü baştan taranır
+CHECKPOINT_VERSION = 3
+
+# Saatlik kovalar yalnızca "bugün" dağılımı için okunur; daha eskileri tutulmaz
+HOURLY_RETENTION_DAYS = 2
 
 class TokenTracker:
-    def __init__(self, main_monitor):
+    def __init__(self, main_monitor, token_dir="claude_session_data/tokens", event_log=None):
         self.main_monitor = main_monitor
         self.token_usage = defaultdict(list)
         self.session_tokens = {}
         self.daily_limits = {}
+        self.hourly_usage = {}
+        self.hourly_cutoff = ""
+        
+        # Token kayıtları olay günlüğüne "token_usage" tipiyle yazılır.
+        # Checkpoint: oturum/gün toplamları + her günlük segmentinde işlenmiş bayt ofseti.
+        # Açılışta yalnızca ofsetten sonra eklenen satırlar okunur.
+        self.event_log = event_log or get_event_log()
+        self.token_dir = token_dir
+        self.checkpoint_file = os.path.join(token_dir, "checkpoint.json")
+        self.file_offsets = {}
+        self.loaded = False
+        self.data_lock = threading.RLock()
+        self.load_stats = {'files': 0, 'bytes_parsed': 0, 'entries': 0, 'rescan': False}
         
         # Token patterns - Claude'un token kullanımı hakkında verdiği bilgileri yakalamak için
         self.token_patterns = [
@@ -41,6 +65,8 @@ class TokenTracker:
             r'(?i)usage\s*limit:?\s*(\d+)',
             r'(?i)(\d+)\s*requests?\s*per\s*day',
         ]
+        self.pattern_engine = get_pattern_engine()
+        self.pattern_engine.register_group('token_count', self.token_patterns, re.IGNORECASE)
         
         self.token_estimates = deque(maxlen=1000)  # Son 1000 mesaj için token tahmini
         self.create_token_ui()
@@ -83,6 +109,11 @@ class TokenTracker:
         notebook.add(analytics_frame, text="Kullanım Analizi")
         self.create_usage_analytics_ui(analytics_frame)
         
+        # Son kayıtlar (günlük segmentleri sondan okunur)
+        recent_frame = ttk.Frame(notebook)
+        notebook.add(recent_frame, text="Son Kayıtlar")
+        self.create_recent_entries_ui(recent_frame)
+        
         self.update_token_dashboard()
     
     def create_session_token_ui(self, parent):
@@ -181,6 +212,43 @@ class TokenTracker:
         self.analytics_text.pack(side="left", fill="both", expand=True)
         analytics_scrollbar.pack(side="right", fill="y")
     
+    def create_recent_entries_ui(self, parent):
+        """Son token kayıtları UI'si"""
+        control_frame = ttk.Frame(parent)
+        control_frame.pack(fill="x", pady=(0, 10))
+        
+        ttk.Button(control_frame, text="Yenile", 
+                  command=self.show_recent_entries).pack(side="left")
+        
+        self.recent_tree = ttk.Treeview(parent, 
+                                       columns=("time", "session", "type", "tokens", "preview"), 
+                                       show="headings")
+        self.recent_tree.heading("time", text="Zaman")
+        self.recent_tree.heading("session", text="Session")
+        self.recent_tree.heading("type", text="Tip")
+        self.recent_tree.heading("tokens", text="Tahmini Token")
+        self.recent_tree.heading("preview", text="Önizleme")
+        
+        self.recent_tree.pack(fill="both", expand=True)
+        self.show_recent_entries()
+    
+    def recent_token_entries(self, limit=200):
+        """Son limit token kaydı (eskiden yeniye); tüm günlük okunmaz, yalnızca gösterilenler çözülür"""
+        return self.event_log.recent(limit, "token_usage")
+    
+    def show_recent_entries(self):
+        for item in self.recent_tree.get_children():
+            self.recent_tree.delete(item)
+        
+        for entry in reversed(self.recent_token_entries()):
+            self.recent_tree.insert('', 'end', values=(
+                entry['timestamp'][:19].replace('T', ' '),
+                entry['session_id'],
+                entry.get('message_type', ''),
+                f"{entry.get('estimated_tokens', 0):,}",
+                entry.get('text_preview', '')
+            ))
+    
     def track_token_usage(self, session_id, text, message_type):
         """Token kullanımını takip et"""
         # Explicit token bilgisi varsa yakala
@@ -202,6 +270,20 @@ class TokenTracker:
             'text_preview': text[:100] + "..." if len(text) > 100 else text
         }
         
+        with self.data_lock:
+            self.apply_token_entry(token_entry)
+            # Dosyaya kaydet (toplamlar ve ofset aynı kilit altında ilerler)
+            self.save_token_data(token_entry)
+        
+        return token_entry
+    
+    def apply_token_entry(self, entry):
+        """Kaydı oturum ve gün toplamlarına ekler (canlı takip ve dosyadan yükleme ortak yolu)"""
+        session_id = entry['session_id']
+        timestamp = entry['timestamp']
+        estimated_tokens = entry.get('estimated_tokens') or 0
+        explicit_tokens = entry.get('explicit_tokens')
+        
         # Session token'larını güncelle
         if session_id not in self.session_tokens:
             self.session_tokens[session_id] = {
@@ -209,8 +291,7 @@ class TokenTracker:
                 'total_explicit': 0,
                 'message_count': 0,
                 'start_time': timestamp,
-                'last_activity': timestamp,
-                'entries': []
+                'last_activity': timestamp
             }
         
         session_data = self.session_tokens[session_id]
@@ -218,43 +299,57 @@ class TokenTracker:
         if explicit_tokens:
             session_data['total_explicit'] += explicit_tokens
         session_data['message_count'] += 1
-        session_data['last_activity'] = timestamp
-        session_data['entries'].append(token_entry)
-        
-        # Günlük kullanım güncelle
-        today = timestamp.strftime('%Y-%m-%d')
-        if today not in self.daily_limits:
-            self.daily_limits[today] = {
-                'estimated_tokens': 0,
-                'explicit_tokens': 0,
-                'message_count': 0,
-                'sessions': set()
-            }
-        
-        daily_data = self.daily_limits[today]
-        daily_data['estimated_tokens'] += estimated_tokens
-        if explicit_tokens:
-            daily_data['explicit_tokens'] += explicit_tokens
-        daily_data['message_count'] += 1
-        daily_data['sessions'].add(session_id)
+        session_data['last_activity'] = max(session_data['last_activity'], timestamp)
+        
+        # Günlük ve saatlik özetleri (rollup) güncelle; periyot analizleri bunlardan okunur
+        message_type = entry.get('message_type') or 'unknown'
+        targets = [(self.daily_limits, timestamp[:10])]
+        hour = timestamp[:13]
+        if hour not in self.hourly_usage and hour >= self.hourly_cutoff:
+            # Yeni saat kovası açılırken saklama süresini aşanlar atılır
+            self.prune_hourly_usage()
+        if hour >= self.hourly_cutoff:
+            targets.append((self.hourly_usage, hour))
+        for rollups, key in targets:
+            if key not in rollups:
+                rollups[key] = {
+                    'estimated_tokens': 0,
+                    'explicit_tokens': 0,
+                    'message_count': 0,
+                    'message_types': {},
+                    'sessions': {}  # session_id -> tahmini token
+                }
+            
+            bucket = rollups[key]
+            bucket['estimated_tokens'] += estimated_tokens
+            if explicit_tokens:
+                bucket['explicit_tokens'] += explicit_tokens
+            bucket['message_count'] += 1
+            bucket['message_types'][message_type] = bucket['message_types'].get(message_type, 0) + 1
+            bucket['sessions'][session_id] = bucket['sessions'].get(session_id, 0) + estimated_tokens
         
         # Token estimate buffer'a ekle
-        self.token_estimates.append(token_entry)
-        
-        # Dosyaya kaydet
-        self.save_token_data(token_entry)
-        
-        return token_entry
+        self.token_estimates.append(entry)
+    
+    def prune_hourly_usage(self, now=None):
+        """HOURLY_RETENTION_DAYS günden eski saatlik kovaları atar (checkpoint'in büyümesini önler)"""
+        now = now or datetime.datetime.now()
+        self.hourly_cutoff = (now - datetime.timedelta(days=HOURLY_RETENTION_DAYS)).strftime('%Y-%m-%dT%H')
+        for hour in [hour for hour in self.hourly_usage if hour < self.hourly_cutoff]:
+            del self.hourly_usage[hour]
     
     def extract_explicit_tokens(self, text):
         """Claude'un verdiği explicit token bilgilerini çıkar"""
-        for pattern in self.token_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                try:
-                    return int(matches[0])
-                except (ValueError, IndexError):
-                    continue
+        tried = set()
+        for match in self.pattern_engine.scan(text, ('token_count',)):
+            # Eskisi gibi her desenin yalnızca ilk eşleşmesi denenir
+            if match.key in tried:
+                continue
+            tried.add(match.key)
+            try:
+                return int(match.value)
+            except ValueError:
+                continue
         return None
     
     def estimate_tokens_from_text(self, text):
@@ -325,38 +420,25 @@ kullanımı model ve içeriğe göre değişebilir."""
         else:  # tümü
             start_date = datetime.datetime.min
         
-        # Veri filtrele
-        relevant_entries = []
-        for session_data in self.session_tokens.values():
-            for entry in session_data['entries']:
-                entry_time = datetime.datetime.fromisoformat(entry['timestamp'])
-                if entry_time >= start_date:
-                    relevant_entries.append(entry)
+        # Periyot özeti gün rollup'larından toplanır (mesaj sayısından bağımsız)
+        start_key = start_date.strftime('%Y-%m-%d') if start_date != datetime.datetime.min else ""
+        summary = self.usage_since(start_key)
         
-        if not relevant_entries:
+        if not summary['message_count']:
             self.analytics_text.delete(1.0, tk.END)
             self.analytics_text.insert(1.0, "Seçilen periyot için veri bulunamadı.")
             return
         
         # Analiz yap
-        total_estimated = sum(e['estimated_tokens'] for e in relevant_entries)
-        total_explicit = sum(e['explicit_tokens'] for e in relevant_entries if e['explicit_tokens'])
-        total_messages = len(relevant_entries)
-        unique_sessions = len(set(e['session_id'] for e in relevant_entries))
+        total_estimated = summary['estimated_tokens']
+        total_explicit = summary['explicit_tokens']
+        total_messages = summary['message_count']
+        unique_sessions = len(summary['sessions'])
         
         avg_tokens_per_message = total_estimated / total_messages if total_messages > 0 else 0
         
-        # Mesaj tipi analizi
-        message_types = defaultdict(int)
-        for entry in relevant_entries:
-            message_types[entry['message_type']] += 1
-        
         # En aktif session'lar
-        session_usage = defaultdict(int)
-        for entry in relevant_entries:
-            session_usage[entry['session_id']] += entry['estimated_tokens']
-        
-        top_sessions = sorted(session_usage.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_sessions = sorted(summary['sessions'].items(), key=lambda x: x[1], reverse=True)[:5]
         
         analysis_result = f"""📈 KULLANIM ANALİZİ - {period.upper()}
 {'='*50}
@@ -371,7 +453,7 @@ kullanımı model ve içeriğe göre değişebilir."""
 📝 MESAJ TİPİ DAĞILIMI:
 """
         
-        for msg_type, count in message_types.items():
+        for msg_type, count in summary['message_types'].items():
             percentage = count / total_messages * 100 if total_messages > 0 else 0
             analysis_result += f"• {msg_type}: {count:,} (%{percentage:.1f})\n"
         
@@ -383,11 +465,7 @@ kullanımı model ve içeriğe göre değişebilir."""
             analysis_result += f"{i}. {session_id}: {tokens:,} token\n"
         
         # Günlük trend
-        daily_usage = defaultdict(int)
-        for entry in relevant_entries:
-            date = datetime.datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d')
-            daily_usage[date] += entry['estimated_tokens']
-        
+        daily_usage = summary['daily']
         if len(daily_usage) > 1:
             analysis_result += f"""
 📅 GÜNLİK TREND:
@@ -395,19 +473,54 @@ kullanımı model ve içeriğe göre değişebilir."""
             for date in sorted(daily_usage.keys())[-7:]:  # Son 7 gün
                 analysis_result += f"• {date}: {daily_usage[date]:,} token\n"
         
+        # Bugün için saatlik dağılım
+        if period == "bugün":
+            hourly = self.usage_since(start_date.strftime('%Y-%m-%dT%H'), self.hourly_usage)['daily']
+            analysis_result += f"""
+🕐 SAATLİK DAĞILIM:
+"""
+            for hour in sorted(hourly.keys()):
+                analysis_result += f"• {hour[11:13]}:00: {hourly[hour]:,} token\n"
+        
         self.analytics_text.delete(1.0, tk.END)
         self.analytics_text.insert(1.0, analysis_result)
     
+    def usage_since(self, start_key, rollups=None):
+        """start_key'den (gün: YYYY-MM-DD, saat: YYYY-MM-DDTHH) itibaren rollup'ları toplar
+        
+        Maliyet kova sayısıyla orantılıdır; 'daily' alanı kova başına tahmini token'dır.
+        """
+        rollups = self.daily_limits if rollups is None else rollups
+        summary = {
+            'estimated_tokens': 0,
+            'explicit_tokens': 0,
+            'message_count': 0,
+            'message_types': defaultdict(int),
+            'sessions': defaultdict(int),
+            'daily': {}
+        }
+        with self.data_lock:
+            for key, bucket in rollups.items():
+                if key < start_key:
+                    continue
+                summary['estimated_tokens'] += bucket['estimated_tokens']
+                summary['explicit_tokens'] += bucket['explicit_tokens']
+                summary['message_count'] += bucket['message_count']
+                for msg_type, count in bucket['message_types'].items():
+                    summary['message_types'][msg_type] += count
+                for session_id, tokens in bucket['sessions'].items():
+                    summary['sessions'][session_id] += tokens
+                summary['daily'][key] = bucket['estimated_tokens']
+        return summary
+    
     def check_daily_limits(self):
         """Günlük limitleri kontrol et"""
         today = datetime.datetime.now().strftime('%Y-%m-%d')
         
-        if today not in self.daily_limits:
+        estimated_tokens = self.usage_since(today)['estimated_tokens']
+        if not estimated_tokens:
             return
         
-        daily_data = self.daily_limits[today]
-        estimated_tokens = daily_data['estimated_tokens']
-        
         # Varsayılan günlük limitler (tahmin)
         WARNING_THRESHOLD = 50000  # 50K token
         CRITICAL_THRESHOLD = 80000  # 80K token
@@ -420,44 +533,101 @@ kullanımı model ve içeriğe göre değişebilir."""
                                       f"WARNING: Günlük token kullanımı {estimated_tokens:,} (Uyarı: {WARNING_THRESHOLD:,})")
     
     def save_token_data(self, token_entry):
-        """Token verisini dosyaya kaydet"""
-        date = datetime.datetime.now().strftime('%Y%m%d')
-        token_file = f"claude_session_data/tokens/token_usage_{date}.json"
-        
-        os.makedirs(os.path.dirname(token_file), exist_ok=True)
-        
-        with open(token_file, 'a', encoding='utf-8') as f:
-            json.dump(token_entry, f, ensure_ascii=False)
-            f.write('\n')
+        """Token verisini olay günlüğüne kaydet"""
+        with self.data_lock:
+            segment, end = self.event_log.append("token_usage", token_entry)
+            if not self.loaded:
+                # Toplamlar henüz günlükten yüklenmedi; load_token_data bu kaydı da okuyacak
+                return
+            # Bu kayıt toplamlara zaten eklendi; yeniden açılışta tekrar okunmasın.
+            # Aradaki baytlar başka tip olaylardır (token kayıtlarını yalnızca bu kilit altında yazarız)
+            self.file_offsets[segment] = end
+        get_writer().mark_dirty(self.write_checkpoint)
+    
+    def write_checkpoint(self):
+        """Toplamları ve dosya ofsetlerini tek seferde (atomik) diske yaz"""
+        with self.data_lock:
+            checkpoint = {
+                'version': CHECKPOINT_VERSION,
+                'files': dict(self.file_offsets),
+                'sessions': {sid: dict(data) for sid, data in self.session_tokens.items()},
+                'daily': copy.deepcopy(self.daily_limits),
+                'hourly': copy.deepcopy(self.hourly_usage),
+                'updated': datetime.datetime.now().isoformat()
+            }
+        os.makedirs(self.token_dir, exist_ok=True)
+        atomic_write_json(self.checkpoint_file, checkpoint)
+    
+    def read_checkpoint(self):
+        if not os.path.exists(self.checkpoint_file):
+            return None
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Token checkpoint okunamadı, dosyalar baştan taranacak: {e}")
+            return None
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            return None
+        return checkpoint
     
     def load_token_data(self):
-        """Token verilerini yükle"""
-        token_dir = "claude_session_data/tokens"
-        if not os.path.exists(token_dir):
-            return
+        """Token verilerini yükle: checkpoint toplamları + checkpoint'ten sonra eklenen satırlar"""
+        segments = self.event_log.segments()
+        checkpoint = self.read_checkpoint()
+        
+        # Checkpoint'teki bir segment silinmiş veya kısalmışsa toplamlar güvenilmez: baştan tara
+        if checkpoint is not None:
+            retired = self.event_log.retired_segments()
+            for segment, offset in list(checkpoint['files'].items()):
+                if segment not in segments and segment in retired:
+                    # Saklama servisi kaldırdı: kayıtları toplamlarda zaten var, yalnızca ofset unutulur
+                    del checkpoint['files'][segment]
+                    continue
+                if segment not in segments or self.event_log.segment_size(segment) < offset:
+                    checkpoint = None
+                    break
+        
+        with self.data_lock:
+            self.session_tokens = {}
+            self.daily_limits = {}
+            self.hourly_usage = {}
+            self.file_offsets = {}
+            if checkpoint is not None:
+                self.session_tokens = checkpoint['sessions']
+                self.daily_limits = checkpoint['daily']
+                self.hourly_usage = checkpoint['hourly']
+                self.file_offsets = dict(checkpoint['files'])
+            self.prune_hourly_usage()
+            self.load_stats = {'files': 0, 'bytes_parsed': 0, 'entries': 0,
+                               'rescan': checkpoint is None}
+            
+            for segment in segments:
+                self.read_new_entries(segment)
+            self.loaded = True
         
-        for filename in os.listdir(token_dir):
-            if filename.startswith('token_usage_') and filename.endswith('.json'):
-                file_path = os.path.join(token_dir, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            if line.strip():
-                                entry = json.loads(line)
-                                # Restore session data
-                                session_id = entry['session_id']
-                                if session_id not in self.session_tokens:
-                                    self.session_tokens[session_id] = {
-                                        'total_estimated': 0,
-                                        'total_explicit': 0,
-                                        'message_count': 0,
-                                        'entries': []
-                                    }
-                                
-                                self.session_tokens[session_id]['entries'].append(entry)
-                                self.token_estimates.append(entry)
-                except Exception as e:
-                    print(f"Token data load error: {e}")
+        if self.load_stats['bytes_parsed']:
+            self.write_checkpoint()
+    
+    def read_new_entries(self, segment):
+        """Segmentin checkpoint ofsetinden sonraki token kayıtlarını toplamlara ekler"""
+        offset = self.file_offsets.get(segment, 0)
+        end = offset
+        try:
+            # Diğer tip olaylar çözülmeden atlanır
+            for record, end in self.event_log.read_segment(segment, offset, event_type='token_usage'):
+                self.apply_token_entry(record)
+                self.load_stats['entries'] += 1
+            # Sondaki baytlar başka tip olaylardır (token kayıtları yalnızca bu kilit altında yazılır)
+            end = max(end, self.event_log.segment_size(segment))
+        except OSError as e:
+            print(f"Token data load error: {e}")
+        
+        if end == offset:
+            return
+        self.file_offsets[segment] = end
+        self.load_stats['files'] += 1
+        self.load_stats['bytes_parsed'] += end - offset
     
     def update_token_dashboard(self):
         """Token dashboard'unu güncelle"""
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Geciktirmeli Yazma (Write-Behind) Katmanı
+save_* çağrıları veriyi hemen diske yazmak yerine ilgili kaydı "kirli" olarak işaretler.
+Tek bir arka plan yazıcı thread'i, son işaretlemeden sonra debounce süresi dolunca
+(veya bekleyen işaret sayısı eşiği aşınca) her kirli kaydı bir kez yazar. Böylece art arda
+gelen kaydetme istekleri tek yazıma indirgenir ve Tk / scheduler thread'i diski beklemez.
+
+Kapanışta (on_closing) ve yorumlayıcı çıkışında (atexit) bekleyen her şey yazılır.
+Bir turdaki dosya yazımları durable_io.group_commit ile tek fsync turunda kalıcı hale gelir.
+"""
+
+import atexit
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from durable_io import group_commit
+
+
+class WriteBehindWriter:
+    """Kirli kayıtları debounce/eşik ile tek arka plan thread'inden yazan yazıcı"""
+
+    def __init__(self, debounce_seconds: float = 2.0, max_delay_seconds: float = 10.0,
+                 max_pending: int = 20):
+        self.debounce_seconds = debounce_seconds
+        # Sürekli işaretlenen kayıt debounce yüzünden hiç yazılmamazlık etmesin
+        self.max_delay_seconds = max(debounce_seconds, max_delay_seconds)
+        self.max_pending = max_pending
+
+        # yazma fonksiyonu -> ilk işaretlenme zamanı
+        self._dirty: Dict[Callable[[], None], float] = {}
+        self._last_mark = 0.0
+        self._pending_marks = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+        self.stats = {
+            "marks": 0,
+            "writes": 0,
+            "flushes": 0,
+            "errors": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+        atexit.register(self.close)
+
+    def configure(self, debounce_seconds: Optional[float] = None, max_delay_seconds: Optional[float] = None,
+                  max_pending: Optional[int] = None):
+        with self._lock:
+            if debounce_seconds is not None:
+                self.debounce_seconds = debounce_seconds
+            if max_delay_seconds is not None:
+                self.max_delay_seconds = max(self.debounce_seconds, max_delay_seconds)
+            if max_pending is not None:
+                self.max_pending = max_pending
+        self._wake.set()
+
+    def mark_dirty(self, write: Callable[[], None]):
+        """write fonksiyonunu bir sonraki yazım turuna ekler (aynı fonksiyon tek kez yazılır)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._stopped:
+                immediate = True
+            else:
+                immediate = False
+                was_idle = not self._dirty
+                self._dirty.setdefault(write, now)
+                self._last_mark = now
+                self._pending_marks += 1
+                self.stats["marks"] += 1
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+                # Boş kuyrukta thread süresiz bekler; ilk işaret yeni son tarihi hesaplatır
+                if was_idle or self._pending_marks >= self.max_pending:
+                    self._wake.set()
+        if immediate:
+            # Kapanıştan sonra gelen kaydetmeler doğrudan yazılır
+            self._write_one(write)
+
+    def _next_flush_at(self) -> Optional[float]:
+        if not self._dirty:
+            return None
+        if self._pending_marks >= self.max_pending:
+            return 0.0
+        oldest = min(self._dirty.values())
+        return min(self._last_mark + self.debounce_seconds, oldest + self.max_delay_seconds)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                flush_at = self._next_flush_at()
+            timeout = None if flush_at is None else max(0.0, flush_at - time.monotonic())
+            if timeout is None or timeout > 0:
+                self._wake.wait(timeout)
+                self._wake.clear()
+                continue
+            self.flush()
+
+    def flush(self):
+        """Tüm kirli kayıtları hemen yazar"""
+        with self._write_lock:
+            with self._lock:
+                writes = list(self._dirty)
+                self._dirty.clear()
+                self._pending_marks = 0
+            if not writes:
+                return
+
+            started = time.perf_counter()
+            # Turdaki tüm dosya yazımları tek fsync turunda diske indirilir
+            try:
+                with group_commit():
+                    for write in writes:
+                        self._write_one(write)
+            except OSError as e:
+                with self._lock:
+                    self.stats["errors"] += 1
+                print(f"Geciktirmeli yazma commit hatası: {str(e)}")
+            elapsed = (time.perf_counter() - started) * 1000
+
+            with self._lock:
+                self.stats["flushes"] += 1
+                self.stats["last_flush_ms"] = round(elapsed, 2)
+                self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed), 2)
+                self.stats["total_flush_ms"] += elapsed
+
+    def _write_one(self, write: Callable[[], None]):
+        try:
+            write()
+            with self._lock:
+                self.stats["writes"] += 1
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            print(f"Geciktirmeli yazma hatası ({getattr(write, '__qualname__', write)}): {str(e)}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["pending"] = len(self._dirty)
+        # Birleştirme oranı: kaç kaydetme isteği bir disk yazımına indirgendi
+        stats["coalescing_ratio"] = round(stats["marks"] / stats["writes"], 2) if stats["writes"] else None
+        stats["avg_flush_ms"] = round(stats["total_flush_ms"] / stats["flushes"], 2) if stats["flushes"] else 0.0
+        stats["total_flush_ms"] = round(stats["total_flush_ms"], 2)
+        return stats
+
+    def close(self):
+        """Bekleyenleri yazar ve yazıcıyı durdurur; sonraki kaydetmeler senkron yazılır"""
+        self.flush()
+        with self._lock:
+            self._stopped = True
+        self._wake.set()
+
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+
+def get_writer() -> WriteBehindWriter:
+    """Uygulama genelinde paylaşılan yazıcı"""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = WriteBehindWriter()
+        return _default_writer